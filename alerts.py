@@ -0,0 +1,261 @@
+"""Regras de alerta avaliadas a cada amostra, na thread do coletor.
+
+Uma regra compara uma métrica (o valor da amostra ou um agregado da janela
+deslizante) com um limite e dispara quando a condição se mantém por `for`
+segundos. Regras de processo valem para qualquer processo com o nome dado
+("RSS de algum java > 8GB por 60 s"). Cada regra custa O(1) por amostra:
+as janelas mantêm soma corrente e filas monotônicas de mínimo/máximo e são
+compartilhadas entre regras com a mesma métrica, agregado e duração.
+
+Formato (JSON, uma lista de objetos; ver DEFAULT_RULES):
+  name       nome exibido (obrigatório)
+  metric     chave da amostra ('cpu', 'memory', 'disk', 'network', 'disk_read', 'net_recv',
+             'process_count', 'cpu_temp', 'core_max'...) ou, com `process`, uma de PROCESS_METRICS
+  op         '>', '>=', '<' ou '<='
+  value      limite; aceita sufixos KB/MB/GB/TB ("8GB")
+  for        segundos que a condição precisa durar (padrão 0)
+  aggregate  'avg', 'min', 'max' ou 'rate' (variação por segundo) sobre `window` segundos
+  window     duração da janela do agregado
+  process    nome exato do processo (regras de processo usam o valor atual de cada PID)
+  severity   'info', 'warning' ou 'critical' (padrão 'warning')
+"""
+import json
+import operator
+from collections import deque
+
+import numpy as np
+
+OPERATORS = {'>': operator.gt, '>=': operator.ge, '<': operator.lt, '<=': operator.le}
+SEVERITIES = ('info', 'warning', 'critical')
+AGGREGATES = ('avg', 'min', 'max', 'rate')
+PROCESS_METRICS = ('cpu', 'mem_pct', 'rss', 'threads')
+UNITS = {'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3, 'TB': 1024 ** 4}
+
+# Eventos guardados por motor (disparos e resoluções)
+HISTORY_LIMIT = 500
+
+# As mesmas faixas do antigo status fixo do Dashboard
+DEFAULT_RULES = (
+    {'name': 'CPU crítica', 'metric': 'cpu', 'op': '>', 'value': 90, 'severity': 'critical'},
+    {'name': 'Memória crítica', 'metric': 'memory', 'op': '>', 'value': 90, 'severity': 'critical'},
+    {'name': 'CPU alta', 'metric': 'cpu', 'op': '>', 'value': 75, 'severity': 'warning'},
+    {'name': 'Memória alta', 'metric': 'memory', 'op': '>', 'value': 75, 'severity': 'warning'},
+)
+
+
+def parse_quantity(value):
+    """Número ou texto com sufixo de unidade ("8GB", "512 MB") -> float"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip().upper()
+    for suffix, scale in UNITS.items():
+        if text.endswith(suffix):
+            return float(text[:-len(suffix)]) * scale
+    return float(text)
+
+
+def format_value(metric, value):
+    if metric == 'rss':
+        unit = 'GB' if value >= UNITS['GB'] else 'MB'
+        return f"{value / UNITS[unit]:.1f} {unit}"
+    return f"{value:.1f}"
+
+
+def core_max(metrics):
+    cores = metrics.get('cores')
+    return max(cores) if cores is not None and len(cores) else None
+
+
+# Métricas calculadas a partir da amostra
+DERIVED = {'core_max': core_max}
+
+
+def load_rules(path):
+    """Lê e valida um arquivo de regras; ValueError com a regra inválida"""
+    with open(path, encoding='utf-8') as f:
+        specs = json.load(f)
+    if not isinstance(specs, list):
+        raise ValueError("o arquivo de regras deve conter uma lista JSON")
+    for spec in specs:
+        Rule(spec)
+    return specs
+
+
+class SlidingWindow:
+    """Agregado dos últimos `seconds` segundos de uma métrica, O(1) amortizado por amostra"""
+
+    def __init__(self, aggregate, seconds):
+        self.aggregate = aggregate
+        self.seconds = seconds
+        self.samples = deque()   # (tempo, valor)
+        self.extremes = deque()  # min/max: candidatos em ordem monotônica
+        self.total = 0.0
+        self._better = operator.ge if aggregate == 'max' else operator.le
+
+    def add(self, ts, value):
+        samples = self.samples
+        samples.append((ts, value))
+        if self.aggregate == 'avg':
+            self.total += value
+        elif self.aggregate in ('min', 'max'):
+            extremes = self.extremes
+            while extremes and self._better(value, extremes[-1][1]):
+                extremes.pop()
+            extremes.append((ts, value))
+
+        start = ts - self.seconds
+        while samples[0][0] < start:
+            _, old = samples.popleft()
+            if self.aggregate == 'avg':
+                self.total -= old
+        while self.extremes and self.extremes[0][0] < start:
+            self.extremes.popleft()
+
+    def value(self):
+        samples = self.samples
+        if self.aggregate == 'avg':
+            return self.total / len(samples)
+        if self.aggregate == 'rate':
+            (t0, v0), (t1, v1) = samples[0], samples[-1]
+            return (v1 - v0) / (t1 - t0) if t1 > t0 else 0.0
+        return self.extremes[0][1]
+
+
+class Rule:
+    """Uma regra validada e seu estado (desde quando a condição vale, se está disparada)"""
+
+    def __init__(self, spec):
+        try:
+            self.name = str(spec['name'])
+            self.metric = spec['metric']
+            self.test = OPERATORS[spec.get('op', '>')]
+            self.op = spec.get('op', '>')
+            self.threshold = parse_quantity(spec['value'])
+            self.sustain = float(spec.get('for', 0))
+            self.severity = spec.get('severity', 'warning')
+            self.process = spec.get('process')
+            self.aggregate = spec.get('aggregate')
+            self.seconds = float(spec.get('window', 0))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"regra inválida {spec!r}: {e!r}") from None
+        if self.severity not in SEVERITIES:
+            raise ValueError(f"regra {self.name!r}: severidade deve ser uma de {SEVERITIES}")
+        if self.aggregate is not None and (self.aggregate not in AGGREGATES or self.seconds <= 0):
+            raise ValueError(f"regra {self.name!r}: aggregate deve ser um de {AGGREGATES}, com window > 0")
+        if self.process is not None and (self.metric not in PROCESS_METRICS or self.aggregate):
+            raise ValueError(f"regra {self.name!r}: regras de processo usam {PROCESS_METRICS}, sem aggregate")
+        self.window = None
+        self.reset()
+
+    def reset(self):
+        self.since = None
+        self.firing = False
+        self.pids = {}  # regras de processo: PID -> desde quando a condição vale
+
+    def describe(self):
+        subject = self.metric if self.process is None else f"{self.metric} de {self.process}"
+        if self.aggregate:
+            subject = f"{self.aggregate}({subject}, {self.seconds:g} s)"
+        text = f"{subject} {self.op} {format_value(self.metric, self.threshold)}"
+        return f"{text} por {self.sustain:g} s" if self.sustain else text
+
+
+class AlertEngine:
+    """Avalia as regras sobre as amostras ('metrics') e tabelas de processos e guarda o histórico.
+
+    `observe_*` devolvem os eventos novos (disparo ou resolução); `active`
+    tem o evento de disparo de cada regra disparada e `history` os últimos
+    HISTORY_LIMIT eventos. `host` identifica o motor nos eventos (None = local).
+    """
+
+    def __init__(self, rules=DEFAULT_RULES, host=None):
+        self.host = host
+        self.rules = [Rule(spec) for spec in rules]
+        self.windows = {}    # (métrica, agregado, janela) -> SlidingWindow compartilhada
+        self.by_metric = {}  # métrica -> regras da amostra
+        self.process_rules = []
+        for rule in self.rules:
+            if rule.process is not None:
+                self.process_rules.append(rule)
+                continue
+            if rule.aggregate:
+                key = (rule.metric, rule.aggregate, rule.seconds)
+                rule.window = self.windows.setdefault(key, SlidingWindow(rule.aggregate, rule.seconds))
+            self.by_metric.setdefault(rule.metric, []).append(rule)
+        self.metric_windows = {metric: [w for (m, _, _), w in self.windows.items() if m == metric]
+                               for metric in self.by_metric}
+        self.active = {}
+        self.history = deque(maxlen=HISTORY_LIMIT)
+
+    def reset(self):
+        """Esquece estados e janelas (ex.: busca na reprodução); o histórico é mantido"""
+        for rule in self.rules:
+            rule.reset()
+        for window in self.windows.values():
+            window.samples.clear()
+            window.extremes.clear()
+            window.total = 0.0
+        self.active.clear()
+
+    def observe_metrics(self, ts, metrics):
+        events = []
+        for metric, rules in self.by_metric.items():
+            value = DERIVED[metric](metrics) if metric in DERIVED else metrics.get(metric)
+            if value is None or value != value:
+                continue  # métrica ausente ou NaN (ex.: sem sensor de temperatura)
+            for window in self.metric_windows[metric]:
+                window.add(ts, value)
+            for rule in rules:
+                current = rule.window.value() if rule.window is not None else value
+                if rule.test(current, rule.threshold):
+                    if rule.since is None:
+                        rule.since = ts
+                    self._update(rule, ts, ts - rule.since >= rule.sustain, current, '', events)
+                else:
+                    rule.since = None
+                    self._update(rule, ts, False, current, '', events)
+        return events
+
+    def observe_processes(self, ts, store):
+        """Regras de processo sobre um ProcessStore: dispara se algum PID cumpre a condição por `for` segundos"""
+        events = []
+        if not self.process_rules:
+            return events
+        columns = store.columns
+        names = store.strings['name']
+        for rule in self.process_rules:
+            ids = np.flatnonzero(names == rule.process)
+            values = columns[rule.metric]
+            matches = np.flatnonzero(np.isin(columns['name'], ids) & rule.test(values, rule.threshold))
+            since = {}
+            worst = None
+            for i in matches.tolist():
+                pid = int(columns['pid'][i])
+                since[pid] = rule.pids.get(pid, ts)
+                if ts - since[pid] >= rule.sustain and (worst is None or values[worst] < values[i]):
+                    worst = i
+            rule.pids = since
+            if worst is not None:
+                self._update(rule, ts, True, float(values[worst]), f" (PID {int(columns['pid'][worst])})", events)
+            else:
+                self._update(rule, ts, False, 0.0, '', events)
+        return events
+
+    def _update(self, rule, ts, firing, value, detail, events):
+        if firing == rule.firing:
+            return
+        rule.firing = firing
+        event = {'time': ts, 'host': self.host, 'rule': rule.name, 'severity': rule.severity,
+                 'state': 'firing' if firing else 'resolved', 'value': float(value),
+                 'message': f"{rule.describe()}: {format_value(rule.metric, value)}{detail}" if firing
+                 else rule.describe()}
+        if firing:
+            self.active[rule] = event
+        else:
+            self.active.pop(rule, None)
+        self.history.append(event)
+        events.append(event)
+
+    def message(self, events):
+        """Conteúdo da mensagem 'alerts': eventos novos e alertas ativos deste motor"""
+        return {'host': self.host, 'events': events, 'active': list(self.active.values())}
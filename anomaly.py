@@ -0,0 +1,165 @@
+"""Detecção de anomalias online sobre as séries do coletor, sem limites fixos.
+
+CPU, memória, taxas de IO de disco e rede e cada núcleo são canais de um
+único vetor, então cada amostra custa algumas operações NumPy sobre
+len(SERIES) + núcleos valores: O(1) por série. Por canal são mantidas:
+
+- média e variância EWMA (comportamento recente, constante EWMA_SECONDS);
+- mediana e MAD estimadas por aproximação estocástica (passos
+  proporcionais ao MAD), base do z-score robusto, imune a picos isolados;
+- média e variância por hora do dia (constante SEASON_SECONDS), usadas a
+  partir do segundo dia em que a hora é vista.
+
+Uma amostra é anômala quando se afasta mais de Z_LIMIT desvios de todas as
+referências disponíveis ao mesmo tempo. NOISE_FLOOR é só o menor desvio
+considerado, para séries quase constantes (disco parado) não dispararem
+com variações mínimas. As atualizações usam a amostra limitada a Z_LIMIT
+desvios, então um pico não infla as estatísticas, mas uma mudança de
+patamar duradoura é absorvida em poucos minutos.
+"""
+import math
+import time
+from collections import deque
+
+import numpy as np
+
+# Séries escalares da amostra ('metrics'); os núcleos vêm depois, um canal por núcleo
+SERIES = ('cpu', 'memory', 'disk_read', 'disk_write', 'net_sent', 'net_recv')
+
+# Menor desvio considerado por série, nas unidades da amostra (% ou KB/s)
+NOISE_FLOOR = {'cpu': 1.0, 'memory': 0.25, 'disk_read': 8.0, 'disk_write': 8.0,
+               'net_sent': 4.0, 'net_recv': 4.0, 'cores': 2.0}
+
+# Desvios (z-score) a partir dos quais uma amostra é anômala
+Z_LIMIT = 5.0
+# Constantes de tempo (s) das médias EWMA, da mediana/MAD e da linha de base por hora
+EWMA_SECONDS = 60.0
+ROBUST_SECONDS = 30.0
+SEASON_SECONDS = 3600.0
+# Amostras antes de sinalizar qualquer coisa
+WARMUP = 60
+# 1,4826 * MAD estima o desvio padrão de uma distribuição normal
+MAD_SCALE = 1.4826
+
+# Anomalias guardadas por detector
+EVENT_LIMIT = 2000
+
+
+class AnomalyDetector:
+    """Estatísticas em fluxo por canal; `events` é a tupla publicada das anomalias recentes.
+
+    Cada evento é (tempo, série, canal, valor, z-score); `canal` é o índice
+    do núcleo para a série 'cores' e 0 nas demais. Só a thread do coletor
+    chama `observe`; a tupla é trocada por referência, como o Snapshot.
+    """
+
+    def __init__(self, core_count):
+        self.core_count = core_count
+        channels = len(SERIES) + core_count
+        self.floor = np.array([NOISE_FLOOR[name] for name in SERIES] + [NOISE_FLOOR['cores']] * core_count)
+        self.mean = np.zeros(channels)
+        self.var = np.zeros(channels)
+        self.median = np.zeros(channels)
+        self.mad = np.zeros(channels)
+        # Linha de base sazonal: uma linha por hora do dia e o dia em que a hora foi vista pela primeira vez
+        self.season_mean = np.zeros((24, channels))
+        self.season_var = np.zeros((24, channels))
+        self.season_day = np.full(24, -1)
+        self._x = np.zeros(channels)
+        self.reset()
+
+    def reset(self):
+        """Recomeça do zero (ex.: busca na reprodução)"""
+        self.count = 0
+        self.last_time = None
+        self.season_day[:] = -1
+        self._events = deque(maxlen=EVENT_LIMIT)
+        self.events = ()
+
+    def observe(self, ts, metrics):
+        """Atualiza as estatísticas com uma amostra; devolve as anomalias novas"""
+        x = self._x
+        for i, name in enumerate(SERIES):
+            x[i] = metrics[name]
+        cores = np.asarray(metrics['cores'], dtype=np.float64)
+        n = min(len(cores), self.core_count)
+        x[len(SERIES):len(SERIES) + n] = cores[:n]
+        np.nan_to_num(x, copy=False)
+
+        local = time.localtime(ts)
+        hour = local.tm_hour
+        day = int((ts + local.tm_gmtoff) // 86400)
+        self.count += 1
+        if self.count == 1:
+            self.mean[:] = self.median[:] = x
+            self.var[:] = self.mad[:] = 0.0
+            self.last_time = ts
+            self._seed_season(hour, day, x)
+            return []
+
+        dt = min(max(ts - self.last_time, 0.0), EWMA_SECONDS)
+        self.last_time = ts
+        floor = self.floor
+
+        # Desvios em relação às referências antes da atualização
+        scale = np.maximum(np.sqrt(self.var), floor)
+        z = (x - self.mean) / scale
+        score = np.abs(z)
+        np.minimum(score, np.abs(x - self.median) / np.maximum(MAD_SCALE * self.mad, floor), out=score)
+        season_ready = 0 <= self.season_day[hour] < day
+        if season_ready:
+            season_scale = np.maximum(np.sqrt(self.season_var[hour]), floor)
+            np.minimum(score, np.abs(x - self.season_mean[hour]) / season_scale, out=score)
+
+        # EWMA com a amostra limitada a Z_LIMIT desvios
+        alpha = 1.0 - math.exp(-dt / EWMA_SECONDS)
+        diff = np.clip(x - self.mean, -Z_LIMIT * scale, Z_LIMIT * scale)
+        self.mean += alpha * diff
+        self.var = (1.0 - alpha) * (self.var + alpha * diff * diff)
+
+        # Mediana e MAD: um passo proporcional ao MAD na direção da amostra
+        rate = dt / ROBUST_SECONDS
+        step = rate * np.maximum(self.mad, floor)
+        deviation = np.abs(x - self.median)
+        self.median += step * np.sign(x - self.median)
+        self.mad += step * np.sign(deviation - self.mad)
+
+        # Linha de base da hora atual
+        if self.season_day[hour] < 0:
+            self._seed_season(hour, day, x)
+        else:
+            season_scale = np.maximum(np.sqrt(self.season_var[hour]), floor)
+            beta = 1.0 - math.exp(-dt / SEASON_SECONDS)
+            diff = np.clip(x - self.season_mean[hour], -Z_LIMIT * season_scale, Z_LIMIT * season_scale)
+            self.season_mean[hour] += beta * diff
+            self.season_var[hour] = (1.0 - beta) * (self.season_var[hour] + beta * diff * diff)
+
+        if self.count <= WARMUP:
+            return []
+        anomalous = np.flatnonzero(score > Z_LIMIT)
+        if not anomalous.size:
+            return []
+        events = []
+        ts = float(ts)
+        for i in anomalous.tolist():
+            series, channel = (SERIES[i], 0) if i < len(SERIES) else ('cores', i - len(SERIES))
+            events.append((ts, series, channel, float(x[i]), float(np.copysign(score[i], z[i]))))
+        self._events.extend(events)
+        self.events = tuple(self._events)
+        return events
+
+    def _seed_season(self, hour, day, x):
+        self.season_mean[hour] = x
+        self.season_var[hour] = 0.0
+        self.season_day[hour] = day
+
+
+def anomaly_points(events, series, since):
+    """(tempos, canais, valores) das anomalias de `series` (nome ou tupla de nomes) desde `since`"""
+    if isinstance(series, str):
+        series = (series,)
+    points = [(ts, channel, value) for ts, name, channel, value, _ in events if ts >= since and name in series]
+    if not points:
+        return np.zeros(0), np.zeros(0, dtype=np.intp), np.zeros(0)
+    times, channels, values = zip(*points)
+    return np.array(times), np.array(channels, dtype=np.intp), np.array(values)
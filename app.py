@@ -1,44 +1,215 @@
-import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
-import psutil
-import threading
 import time
-from datetime import datetime
-import platform
-import socket
+
+# Referência para medir o tempo de inicialização (--startup-profile)
+_T0 = time.perf_counter()
+
+import argparse
+import os
 import queue
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
-import numpy as np
 import sys
-import gc
-import os
-import ctypes
-import subprocess
-import webbrowser
-from ctypes import wintypes
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+
+class StartupProfiler:
+    """Registra tempos de importação e marcos da inicialização até o primeiro frame"""
+
+    def __init__(self, t0):
+        self.t0 = t0
+        self.imports = []
+        self.marks = []
+        self.reported = False
+
+    @contextmanager
+    def importing(self, name):
+        start = time.perf_counter()
+        yield
+        self.imports.append((name, time.perf_counter() - start))
+
+    def mark(self, label):
+        self.marks.append((label, time.perf_counter() - self.t0))
+
+    def report(self, stream=None):
+        stream = stream or sys.stderr
+        stream.write("=== Perfil de inicialização ===\n")
+        for name, elapsed in self.imports:
+            stream.write(f"import {name:<28} {elapsed * 1000:8.1f} ms\n")
+        for label, elapsed in self.marks:
+            stream.write(f"{label:<35} {elapsed * 1000:8.1f} ms\n")
+        stream.flush()
+        self.reported = True
+
+
+PROFILER = StartupProfiler(_T0)
+
+
+def interval_arg(value):
+    """Valida o intervalo de coleta passado na linha de comando"""
+    interval = float(value)
+    if not 0.1 <= interval <= 10:
+        raise argparse.ArgumentTypeError("o intervalo deve estar entre 0.1 e 10 segundos")
+    return interval
+
+
+def exporter_arg(value):
+    """Valida o endereço do exportador: PORTA ou HOST:PORTA"""
+    host, _, port = value.rpartition(':')
+    if not port.isdigit() or not 0 < int(port) < 65536:
+        raise argparse.ArgumentTypeError("use PORTA ou HOST:PORTA (ex.: 9105 ou 0.0.0.0:9105)")
+    return host or '127.0.0.1', int(port)
+
 
-# Configuração para evitar problemas com Matplotlib em threads
-plt.style.use('fast')
+def socket_arg(value):
+    """Endereço da frota: unix:CAMINHO (socket Unix) ou [HOST:]PORTA (TCP)"""
+    if value.startswith('unix:'):
+        return value[len('unix:'):]
+    return exporter_arg(value)
 
-# Constantes para limpeza de memória no Windows (se disponível)
-if sys.platform == 'win32':
+
+def alerts_arg(path):
+    """Carrega e valida o arquivo de regras de alerta (JSON, ver alerts.py)"""
+    from alerts import load_rules
+    try:
+        return load_rules(path)
+    except (OSError, ValueError) as e:
+        raise argparse.ArgumentTypeError(f"regras de alerta inválidas em {path}: {e}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Monitor de Sistema Ultimate")
+    parser.add_argument('--headless', action='store_true',
+                        help="Executa apenas o coletor, sem interface gráfica")
+    parser.add_argument('--output', metavar='ARQUIVO',
+                        help="Arquivo JSON Lines de saída no modo headless (padrão ou '-': stdout)")
+    parser.add_argument('--processes', action='store_true',
+                        help="Inclui a lista de processos na saída headless")
+    parser.add_argument('--sys-info', action='store_true',
+                        help="Inclui as informações do sistema na saída headless")
+    parser.add_argument('--interval', type=interval_arg, default=1.0, metavar='SEGUNDOS',
+                        help="Intervalo de coleta, de 0.1 a 10 segundos (padrão: 1)")
+    parser.add_argument('--record', metavar='ARQUIVO',
+                        help="Grava todas as amostras em um arquivo binário compacto (interface ou headless)")
+    parser.add_argument('--record-processes', type=int, nargs='?', const=50, default=0, metavar='N',
+                        help="Inclui na gravação os N processos de maior CPU a cada varredura (padrão: 50)")
+    parser.add_argument('--exporter', type=exporter_arg, metavar='[HOST:]PORTA',
+                        help="Serve /metrics no formato OpenMetrics (Prometheus); sem host, só na máquina local")
+    parser.add_argument('--exporter-top', type=int, default=10, metavar='N',
+                        help="Processos de maior CPU exportados com métricas próprias (padrão: 10)")
+    parser.add_argument('--agent', type=socket_arg, metavar='[HOST:]PORTA|unix:CAMINHO',
+                        help="Envia as amostras deste host a um agregador da frota (interface ou headless)")
+    parser.add_argument('--aggregate', type=socket_arg, metavar='[HOST:]PORTA|unix:CAMINHO',
+                        help="Recebe os agentes da frota e mostra o resumo de todos os hosts no Dashboard")
+    parser.add_argument('--alerts', type=alerts_arg, metavar='ARQUIVO',
+                        help="Regras de alerta em JSON (padrão: CPU/memória acima de 75%% e 90%%)")
+    parser.add_argument('--replay', metavar='ARQUIVO',
+                        help="Abre uma gravação (--record) em modo de reprodução, com barra de busca e velocidade")
+    parser.add_argument('--process-backend', choices=('auto', 'procfs', 'psutil'), default='auto',
+                        help="Backend de coleta de processos (procfs: leitura direta do /proc no Linux)")
+    parser.add_argument('--startup-profile', action='store_true',
+                        help="Mostra tempos de importação e o tempo até o primeiro frame")
+    return parser.parse_args(argv)
+
+
+# Módulos pesados carregados sob demanda; o modo headless nunca importa Tk nem Matplotlib
+tk = ttk = messagebox = scrolledtext = None
+np = psutil = None
+plt = Figure = FigureCanvasTkAgg = BlitManager = GROUPINGS = core_groups = None
+decimate_band = decimate_columns = pixel_width = channel_median = anomaly_points = None
+SystemCollector = HISTORY_SIZE = TreeviewSync = RefreshScheduler = BoundedQueue = None
+ReplayCollector = SPEEDS = None
+
+
+def import_gui():
+    """Importa Tk e o coletor (necessários para a janela e o Dashboard)"""
+    global tk, ttk, messagebox, scrolledtext, np, psutil, SystemCollector, HISTORY_SIZE, TreeviewSync
+    global RefreshScheduler, BoundedQueue, ReplayCollector, SPEEDS
+    with PROFILER.importing('tkinter'):
+        import tkinter as tk
+        from tkinter import ttk, messagebox, scrolledtext
+    with PROFILER.importing('numpy'):
+        import numpy as np
+    with PROFILER.importing('psutil'):
+        import psutil
+    with PROFILER.importing('collector'):
+        from collector import SystemCollector
+        from history import HISTORY_SIZE
+        from process_table import TreeviewSync
+        from scheduler import RefreshScheduler
+        from service import BoundedQueue
+        from replay import ReplayCollector, SPEEDS
+
+
+def import_matplotlib(dark_mode=True):
+    """Importa o Matplotlib na primeira aba de gráficos construída"""
+    global plt, Figure, FigureCanvasTkAgg, BlitManager, GROUPINGS, core_groups
+    global decimate_band, decimate_columns, pixel_width, channel_median, anomaly_points
+    if plt is not None:
+        return
+    with PROFILER.importing('matplotlib'):
+        import matplotlib.pyplot as plt
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+        from charts import BlitManager, channel_median, decimate_band, decimate_columns, pixel_width
+        from anomaly import anomaly_points
+        from topology import GROUPINGS, core_groups
+
+    # Configuração para evitar problemas com Matplotlib em threads
+    plt.style.use('fast')
+    if dark_mode:
+        plt.style.use('dark_background')
+
+
+def get_win32_memory_api():
+    """Funções para limpeza de memória no Windows (se disponível)"""
+    if sys.platform != 'win32':
+        return None, None
     try:
+        import ctypes
         kernel32 = ctypes.windll.kernel32
-        EmptyWorkingSet = kernel32.EmptyWorkingSet
-        SetProcessWorkingSetSize = kernel32.SetProcessWorkingSetSize
-    except:
-        EmptyWorkingSet = None
-        SetProcessWorkingSetSize = None
-else:
-    EmptyWorkingSet = None
-    SetProcessWorkingSetSize = None
+        return kernel32.EmptyWorkingSet, kernel32.SetProcessWorkingSetSize
+    except Exception:
+        return None, None
+
+
+# Coluna do ProcessStore usada ao ordenar por cada cabeçalho da tabela de processos
+PROCESS_SORT_KEYS = {
+    'PID': 'pid', 'Nome': 'name', 'CPU%': 'cpu', 'Memória%': 'mem_pct',
+    'Memória MB': 'rss', 'Threads': 'threads', 'Status': 'status', 'Usuário': 'user',
+}
+
+# Intervalos selecionáveis nos gráficos (rótulo -> segundos)
+CHART_RANGES = {
+    '1 min': 60,
+    '15 min': 900,
+    '1 h': 3600,
+    '6 h': 21600,
+    '24 h': 86400,
+    '7 dias': 604800,
+}
+
+# Modos do gráfico de núcleos; acima de CORE_LINES_LIMIT núcleos o padrão é o mapa de calor
+CORE_VIEWS = ('Linhas', 'Mapa de calor')
+CORE_LINES_LIMIT = 8
+
+# Resumo da frota no Dashboard: hosts exibidos (os mais carregados) e colunas ordenáveis
+LOCAL_HOST = 'Local'
+FLEET_ROWS = 15
+FLEET_COLUMNS = {'Host': 0, 'CPU%': 1, 'RAM%': 2, 'Disco%': 3, 'Rede KB/s': 4, 'Núcleos': 5, 'Última amostra': 6}
+
+# Histórico de alertas no Dashboard
+ALERT_ROWS = 200
+SEVERITY_TEXT = {'info': 'Info', 'warning': 'Atenção', 'critical': 'Crítico'}
+SEVERITY_STATUS = {'info': ("ℹ️ ", "blue"), 'warning': ("⚠️ Atenção: ", "orange"), 'critical': ("🔴 CRÍTICO: ", "red")}
 
 #gerencia interface grafica, coleta dados, processa e armazena dados, atualiza graficos, gerencia threads,
 class UltraOptimizedOSMonitor: # god class
-    def __init__(self):
+    def __init__(self, startup_profile=False, interval=1.0, process_backend='auto', record=None,
+                 record_processes=0, replay=None, exporter=None, exporter_top=10, agent=None, aggregate=None,
+                 alerts=None):
+        self.startup_profile = startup_profile
         self.window = tk.Tk()
+        PROFILER.mark('janela criada')
         self.window.title(" Monitor de Sistema Ultimate v3.5")
         self.window.geometry("1400x950")
 
@@ -50,46 +221,46 @@ class UltraOptimizedOSMonitor: # god class
         self.style = ttk.Style()
         self.setup_theme()
 
-        # Dados compartilhados via queue (thread-safe)
-        self.data_queue = queue.Queue()
+        # Dados compartilhados via fila limitada (thread-safe); se o loop do Tk
+        # atrasar, as mensagens mais antigas são descartadas
+        self.data_queue = BoundedQueue(256)
         self.is_running = True
 
         # Cache para armazenar processos para contexto
         self.current_process_context = None
 
-        # Cache de dados
-        self.cache = {
-            'cpu': 0, 'memory': 0, 'disk': 0, 'network': 0,
-            'process_count': 0, 'processes': [],
-            'cpu_history': [0] * 60,
-            'memory_history': [0] * 60,
-            'disk_history': [0] * 60,
-            'network_history': [0] * 60,
-            'cpu_cores': [],
-            'disk_io': {'read': [0] * 60, 'write': [0] * 60},
-            'network_io': {'sent': [0] * 60, 'recv': [0] * 60},
-            'temperature_history': [0] * 60,
-            'power_history': [0] * 60,
-            'last_process_update': 0,
-            'last_system_update': 0,
-            'memory_total_gb': 0,
-            'memory_used_gb': 0,
-            'memory_available_gb': 0,
-            'disk_total_gb': 0,
-            'disk_used_gb': 0,
-            'disk_free_gb': 0,
-            'memory_standby': 0,
-            'cache_size': 0,
-            'cpu_temperatures': [],
-            'battery_info': {}
-        }
+        # Coletor independente da interface, em sua própria thread. A interface só
+        # lê o que ele publica: mensagens da fila e collector.snapshot (imutável)
+        # Com `replay` o coletor é substituído pela reprodução de uma gravação (mesma interface)
+        self.replay = replay is not None
+        emit = lambda dtype, data: self.data_queue.put((dtype, data))
+        if self.replay:
+            self.collector = ReplayCollector(replay, emit=emit, alerts=alerts)
+            self.window.title(f"{self.window.title()} - Reprodução: {os.path.basename(replay)}")
+        else:
+            self.collector = SystemCollector(emit=emit, interval=interval, process_backend=process_backend,
+                                             record=record, record_processes=record_processes,
+                                             exporter=exporter, exporter_top=exporter_top,
+                                             agent=agent, aggregate=aggregate, alerts=alerts)
+        # Modo agregador: os gráficos e o Dashboard podem mostrar um host remoto (view_host)
+        self.fleet = getattr(self.collector, 'fleet', None)
+        self.view_host = None
 
         # Variáveis para ordenação
         self.sort_column = 'CPU%'
         self.sort_reverse = True
 
-        self.initialize_cpu_cores()
+        # Atualizações da interface: agenda central, última mensagem de cada tipo
+        # ainda não exibida e textos já mostrados (evita reescrever labels iguais)
+        self.scheduler = RefreshScheduler(self.window)
+        self.pending_data = {}
+        # Mensagens 'alerts' trazem eventos: todas são exibidas, não só a última
+        self.pending_alerts = []
+        self.active_alerts = {}  # host (None = local) -> eventos dos alertas disparados
+        self.shown_text = {}
+
         self.setup_ui()
+        PROFILER.mark('Dashboard construído')
         self.start_threaded_monitoring()
 
     def setup_theme(self):
@@ -136,14 +307,16 @@ class UltraOptimizedOSMonitor: # god class
             self.style.configure("TNotebook", background=bg_color)
             self.style.configure("TNotebook.Tab", background=field_bg, foreground=fg_color)
             self.style.map("TNotebook.Tab", background=[("selected", select_bg)])
-            plt.style.use('dark_background')
+            if plt is not None:
+                plt.style.use('dark_background')
         else:
             bg_color = "#f0f0f0"
             fg_color = "#000000"
             self.window.configure(bg=bg_color)
             self.style.theme_use('clam')
             self.style.configure(".", background=bg_color, foreground=fg_color)
-            plt.style.use('fast')
+            if plt is not None:
+                plt.style.use('fast')
 
     def toggle_theme(self):
         """Alterna entre temas"""
@@ -151,17 +324,15 @@ class UltraOptimizedOSMonitor: # god class
         self.apply_theme_colors()
         if hasattr(self, 'fig_basic'):
             self.fig_basic.patch.set_facecolor('#2d2d2d' if self.dark_mode else '#ffffff')
+            self.blit_basic.invalidate()
         if hasattr(self, 'fig_detailed'):
             self.fig_detailed.patch.set_facecolor('#2d2d2d' if self.dark_mode else '#ffffff')
+            self.blit_detailed.invalidate()
         if hasattr(self, 'fig_energy'):
             self.fig_energy.patch.set_facecolor('#2d2d2d' if self.dark_mode else '#ffffff')
 
         messagebox.showinfo("Tema", "Tema alterado!")
 
-    def initialize_cpu_cores(self):
-        core_count = psutil.cpu_count()
-        self.cache['cpu_cores'] = [[0] * 60 for _ in range(core_count)]
-
     def setup_ui(self):
         # Header
         header_frame = ttk.Frame(self.window)
@@ -178,26 +349,82 @@ class UltraOptimizedOSMonitor: # god class
         ttk.Button(control_frame, text=" Alternar Tema",
                    command=self.toggle_theme).pack(side=tk.LEFT, padx=5)
 
+        if self.replay:
+            self.setup_replay_bar()
+
         # Notebook
         self.notebook = ttk.Notebook(self.window)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
 
+        # Só o Dashboard e a aba Sistema são construídos agora; as demais abas
+        # (e suas Figures) são montadas na primeira vez que forem selecionadas
+        self.built_tabs = set()
+        self.pending_tabs = {}
+        self.tab_keys = {}
+
         self.setup_dashboard_tab()
-        self.setup_process_tab()
+        self.add_deferred_tab('processes', " Processos", self.setup_process_tab)
         self.setup_system_tab()
-        self.setup_charts_tab()
-        self.setup_detailed_charts_tab()  # Nova aba para gráficos detalhados
-        self.setup_energy_tab()  # Nova aba para consumo de energia
+        self.add_deferred_tab('charts', " Gráficos Básicos", self.setup_charts_tab)
+        self.add_deferred_tab('detailed', " Gráficos Detalhados", self.setup_detailed_charts_tab)
+        self.add_deferred_tab('energy', " Energia & Temperatura", self.setup_energy_tab)
+
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
+        self.window.bind('<Map>', self.on_window_map)
+
+        # Variáveis compartilhadas entre abas, criadas antes das abas que as exibem
+        self.chart_range_var = tk.StringVar(value='1 min')
+        self.filter_var = tk.StringVar()
+        self.setup_energy_vars()
+
+    def add_deferred_tab(self, key, text, builder):
+        """Adiciona uma aba vazia cujo conteúdo é construído na primeira seleção"""
+        frame = ttk.Frame(self.notebook)
+        self.notebook.add(frame, text=text)
+        self.pending_tabs[str(frame)] = (key, frame, builder)
+        self.tab_keys[str(frame)] = key
+
+    def on_tab_changed(self, event=None):
+        """Constrói a aba selecionada se ainda estiver pendente"""
+        pending = self.pending_tabs.pop(self.notebook.select(), None)
+        if pending:
+            key, frame, builder = pending
+            start = time.perf_counter()
+            self.built_tabs.add(key)
+            builder(frame)
+            if self.startup_profile:
+                print(f"Aba '{key}' construída em {(time.perf_counter() - start) * 1000:.1f} ms",
+                      file=sys.stderr)
+        # A aba que ficou visível recebe os dados pendentes e gráficos atualizados já
+        self.scheduler.wake()
+
+    def on_window_map(self, event):
+        """Janela restaurada: atualiza o que foi pulado enquanto estava minimizada"""
+        if event.widget is self.window:
+            self.scheduler.wake()
+
+    def visible_tab(self):
+        """Chave da aba selecionada ('dashboard', 'processes', 'charts'...)"""
+        return self.tab_keys.get(self.notebook.select())
+
+    def view_snapshot(self):
+        """Snapshot exibido no Dashboard e nos gráficos: o do host da frota escolhido ou o local"""
+        if self.view_host is not None:
+            host = self.fleet.hosts.get(self.view_host)
+            if host is not None:
+                return host.snapshot
+        return self.collector.snapshot
 
     def setup_dashboard_tab(self):
         dashboard_tab = ttk.Frame(self.notebook)
         self.notebook.add(dashboard_tab, text=" Dashboard")
+        self.tab_keys[str(dashboard_tab)] = 'dashboard'
 
         main_frame = ttk.Frame(dashboard_tab)
         main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
         # Métricas (Esquerda)
-        metrics_frame = ttk.LabelFrame(main_frame, text=" Métricas em Tempo Real", padding=15)
+        metrics_frame = self.metrics_frame = ttk.LabelFrame(main_frame, text=" Métricas em Tempo Real", padding=15)
         metrics_frame.grid(row=0, column=0, sticky="nsew", padx=(0, 10))
 
         self.cpu_var = tk.StringVar(value="0%")
@@ -258,10 +485,60 @@ class UltraOptimizedOSMonitor: # god class
         main_frame.columnconfigure(1, weight=3)
         main_frame.rowconfigure(0, weight=1)
 
-    def setup_process_tab(self):
-        process_tab = ttk.Frame(self.notebook)
-        self.notebook.add(process_tab, text=" Processos")
-
+        if self.fleet is not None:
+            self.setup_fleet_panel(main_frame)
+        self.setup_alerts_panel(main_frame)
+
+    def setup_alerts_panel(self, parent):
+        """Histórico de alertas (disparos e resoluções), mais recentes primeiro"""
+        frame = ttk.LabelFrame(parent, text=" Alertas", padding=10)
+        frame.grid(row=2, column=0, columnspan=2, sticky="nsew", pady=(10, 0))
+        parent.rowconfigure(2, weight=1)
+
+        columns = ('Hora', 'Host', 'Severidade', 'Regra', 'Estado', 'Detalhe')
+        self.alert_tree = ttk.Treeview(frame, columns=columns, show='headings', height=6)
+        for col, width in zip(columns, (80, 140, 80, 160, 90, 420)):
+            self.alert_tree.heading(col, text=col)
+            self.alert_tree.column(col, width=width, anchor=tk.W)
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self.alert_tree.yview)
+        self.alert_tree.configure(yscrollcommand=scrollbar.set)
+        self.alert_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        for severity, (_, color) in SEVERITY_STATUS.items():
+            self.alert_tree.tag_configure(severity, foreground=color)
+        self.alert_tree.tag_configure('resolved', foreground='gray')
+
+    def setup_fleet_panel(self, parent):
+        """Resumo da frota (--aggregate): uma linha por host, só os FLEET_ROWS primeiros da ordenação"""
+        frame = ttk.LabelFrame(parent, text=" Frota", padding=10)
+        frame.grid(row=1, column=0, columnspan=2, sticky="nsew", pady=(10, 0))
+        parent.rowconfigure(1, weight=1)
+
+        top = ttk.Frame(frame)
+        top.pack(fill=tk.X, pady=(0, 5))
+        ttk.Label(top, text="Host exibido:").pack(side=tk.LEFT)
+        self.host_var = tk.StringVar(value=LOCAL_HOST)
+        self.host_combo = ttk.Combobox(top, textvariable=self.host_var, values=[LOCAL_HOST],
+                                       state='readonly', width=30)
+        self.host_combo.pack(side=tk.LEFT, padx=5)
+        self.host_combo.bind('<<ComboboxSelected>>', lambda e: self.select_host(self.host_var.get()))
+        self.fleet_summary_var = tk.StringVar(value="Aguardando agentes...")
+        ttk.Label(top, textvariable=self.fleet_summary_var).pack(side=tk.RIGHT)
+
+        self.fleet_tree = ttk.Treeview(frame, columns=list(FLEET_COLUMNS), show='headings', height=8)
+        for col in FLEET_COLUMNS:
+            self.fleet_tree.heading(col, text=col, command=lambda c=col: self.sort_fleet(c))
+            self.fleet_tree.column(col, width=200 if col == 'Host' else 90, anchor=tk.W if col == 'Host' else tk.E)
+        self.fleet_tree.tag_configure('offline', foreground='gray')
+        self.fleet_tree.pack(fill=tk.BOTH, expand=True)
+        self.fleet_tree.bind('<Double-1>', self.on_fleet_double_click)
+
+        # Atualizada só com as diferenças; a ordenação escolhe quais hosts aparecem
+        self.fleet_sync = TreeviewSync(self.fleet_tree)
+        self.fleet_sort = 'CPU%'
+        self.fleet_rows = []
+
+    def setup_process_tab(self, process_tab):
         # Frame superior com controles
         top_frame = ttk.Frame(process_tab)
         top_frame.pack(fill=tk.X, padx=10, pady=10)
@@ -278,11 +555,14 @@ class UltraOptimizedOSMonitor: # god class
                    command=self.collect_processes).pack(side=tk.LEFT, padx=5)
 
         ttk.Label(top_frame, text="Filtrar:").pack(side=tk.LEFT, padx=(20, 5))
-        self.filter_var = tk.StringVar()
         filter_entry = ttk.Entry(top_frame, textvariable=self.filter_var, width=20)
         filter_entry.pack(side=tk.LEFT, padx=5)
         filter_entry.bind('<KeyRelease>', self.filter_processes)
 
+        self.filter_regex_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(top_frame, text="Regex", variable=self.filter_regex_var,
+                        command=self.filter_processes).pack(side=tk.LEFT, padx=5)
+
         # Treeview de processos
         tree_frame = ttk.Frame(process_tab)
         tree_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
@@ -294,16 +574,17 @@ class UltraOptimizedOSMonitor: # god class
                       'Memória MB': 90, 'Threads': 70, 'Status': 90, 'Usuário': 100}
 
         for col in columns:
-            self.tree.heading(col, text=col)
+            self.tree.heading(col, text=col, command=lambda c=col: self.sort_processes(c))
             self.tree.column(col, width=col_widths.get(col, 100))
+        self.update_sort_headings()
 
-        # Scrollbars
-        v_scroll = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        # Scrollbars (a vertical rola a janela virtual, não o widget)
+        self.process_scroll = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.on_process_scroll)
         h_scroll = ttk.Scrollbar(tree_frame, orient=tk.HORIZONTAL, command=self.tree.xview)
-        self.tree.configure(yscrollcommand=v_scroll.set, xscrollcommand=h_scroll.set)
+        self.tree.configure(xscrollcommand=h_scroll.set)
 
         self.tree.grid(row=0, column=0, sticky="nsew")
-        v_scroll.grid(row=0, column=1, sticky="ns")
+        self.process_scroll.grid(row=0, column=1, sticky="ns")
         h_scroll.grid(row=1, column=0, sticky="ew")
 
         tree_frame.columnconfigure(0, weight=1)
@@ -312,9 +593,28 @@ class UltraOptimizedOSMonitor: # god class
         # Configurar seleção múltipla
         self.tree.configure(selectmode='extended')
 
+        self.tree.tag_configure('high_cpu', foreground='red')
+        self.tree.tag_configure('high_mem', foreground='orange')
+
+        # Linhas indexadas por PID; cada atualização aplica só as diferenças
+        self.tree_sync = TreeviewSync(self.tree)
+
+        # Lista virtualizada: só as linhas visíveis existem no Treeview
+        self.process_store = self.view_snapshot().processes
+        self.process_view = np.arange(0)
+        self.process_offset = 0
+        self.process_visible_rows = 25
+        self.tree.bind('<Configure>', self.on_process_tree_resize)
+        self.tree.bind('<MouseWheel>', self.on_process_wheel)
+        self.tree.bind('<Button-4>', lambda e: self.scroll_process_rows(-3))
+        self.tree.bind('<Button-5>', lambda e: self.scroll_process_rows(3))
+
         # Menu de contexto
         self.setup_context_menu()
 
+        # Preencher com a última coleta disponível (do host exibido)
+        self.update_process_ui(self.view_snapshot().processes)
+
     def setup_context_menu(self):
         """Configura menu de contexto para a treeview"""
         self.context_menu = tk.Menu(self.window, tearoff=0)
@@ -335,6 +635,8 @@ class UltraOptimizedOSMonitor: # god class
 
     def show_context_menu(self, event):
         """Mostra menu de contexto"""
+        if self.replay or self.view_host is not None:
+            return  # Processos gravados ou remotos: detalhes e finalização agiriam sobre os PIDs locais
         item = self.tree.identify_row(event.y)
         if item:
             self.tree.selection_set(item)
@@ -344,6 +646,7 @@ class UltraOptimizedOSMonitor: # god class
     def setup_system_tab(self):
         system_tab = ttk.Frame(self.notebook)
         self.notebook.add(system_tab, text=" Sistema")
+        self.tab_keys[str(system_tab)] = 'system'
 
         # Adicionar botão de limpeza
         control_frame = ttk.Frame(system_tab)
@@ -351,13 +654,22 @@ class UltraOptimizedOSMonitor: # god class
 
         ttk.Button(control_frame, text=" Atualizar Informações",
                    command=self.collect_system_info).pack(side=tk.RIGHT)
+        ttk.Button(control_frame, text=" Custo da Interface",
+                   command=self.show_refresh_stats).pack(side=tk.RIGHT, padx=5)
 
         self.system_text = scrolledtext.ScrolledText(system_tab, font=('Consolas', 10))
         self.system_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
-    def setup_charts_tab(self):
-        charts_tab = ttk.Frame(self.notebook)
-        self.notebook.add(charts_tab, text=" Gráficos Básicos")
+    def setup_charts_tab(self, charts_tab):
+        import_matplotlib(self.dark_mode)
+
+        # Seleção do intervalo exibido (lido do nível de retenção mais barato que o cobre)
+        range_frame = ttk.Frame(charts_tab)
+        range_frame.pack(fill=tk.X, padx=10, pady=(5, 0))
+
+        ttk.Label(range_frame, text="Período:").pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Combobox(range_frame, textvariable=self.chart_range_var, values=list(CHART_RANGES),
+                     state='readonly', width=10).pack(side=tk.LEFT)
 
         self.fig_basic = Figure(figsize=(10, 6), dpi=80)
         self.canvas_basic = FigureCanvasTkAgg(self.fig_basic, charts_tab)
@@ -371,28 +683,32 @@ class UltraOptimizedOSMonitor: # god class
         for ax in [self.ax_cpu, self.ax_mem, self.ax_dsk, self.ax_net]:
             ax.grid(True, alpha=0.3)
 
+        # Só as linhas são redesenhadas a cada tick; o resto fica no fundo em cache
+        self.blit_basic = BlitManager(self.canvas_basic)
         self.setup_basic_lines()
 
     def setup_basic_lines(self):
-        self.line_cpu, = self.ax_cpu.plot([], [], 'b-', lw=1.5)
+        blit = self.blit_basic
+
+        self.line_cpu = blit.add(self.ax_cpu.plot([], [], 'b-', lw=1.5)[0])
         self.ax_cpu.set_title('CPU (%)')
-        self.ax_cpu.set_ylim(0, 100)
+        blit.set_ylim(self.ax_cpu, 0, 100)
 
-        self.line_mem, = self.ax_mem.plot([], [], 'g-', lw=1.5)
+        self.line_mem = blit.add(self.ax_mem.plot([], [], 'g-', lw=1.5)[0])
         self.ax_mem.set_title('Memória (%)')
-        self.ax_mem.set_ylim(0, 100)
+        blit.set_ylim(self.ax_mem, 0, 100)
 
-        self.line_dsk, = self.ax_dsk.plot([], [], 'orange', lw=1.5)
+        self.line_dsk = blit.add(self.ax_dsk.plot([], [], 'orange', lw=1.5)[0])
         self.ax_dsk.set_title('Disco (%)')
-        self.ax_dsk.set_ylim(0, 100)
+        blit.set_ylim(self.ax_dsk, 0, 100)
 
-        self.line_net, = self.ax_net.plot([], [], 'r-', lw=1.5)
+        self.line_net = blit.add(self.ax_net.plot([], [], 'r-', lw=1.5)[0])
         self.ax_net.set_title('Rede (KB/s)')
+        blit.set_ylim(self.ax_net, 0, 100)
 
-    def setup_detailed_charts_tab(self):
+    def setup_detailed_charts_tab(self, det_tab):
         """Aba com gráficos detalhados de núcleos, IO, etc."""
-        det_tab = ttk.Frame(self.notebook)
-        self.notebook.add(det_tab, text=" Gráficos Detalhados")
+        import_matplotlib(self.dark_mode)
 
         # Frame principal com scrollbar
         main_frame = ttk.Frame(det_tab)
@@ -427,6 +743,15 @@ class UltraOptimizedOSMonitor: # god class
         for ax in [self.ax_cores, self.ax_io_disk, self.ax_io_net,
                    self.ax_mem_detail, self.ax_cpu_freq, self.ax_process_count]:
             ax.grid(True, alpha=0.3)
+            ax.set_xlabel('Tempo (s atrás)')
+
+        core_count = self.view_snapshot().core_count
+        self.core_view_var = tk.StringVar(value=CORE_VIEWS[core_count > CORE_LINES_LIMIT])
+        self.core_group_var = tk.StringVar(value='Nenhum')
+        self.anomaly_var = tk.BooleanVar(value=True)
+
+        self.blit_detailed = BlitManager(self.canvas_detailed)
+        self.setup_detailed_lines()
 
         # Botões de controle
         control_frame = ttk.Frame(main_frame)
@@ -437,19 +762,171 @@ class UltraOptimizedOSMonitor: # god class
         ttk.Button(control_frame, text=" Salvar Imagem",
                    command=self.save_detailed_chart).pack(side=tk.LEFT, padx=5)
 
-    def setup_energy_tab(self):
-        """Aba para monitoramento de energia e temperatura"""
-        energy_tab = ttk.Frame(self.notebook)
-        self.notebook.add(energy_tab, text=" Energia & Temperatura")
-
-        # Frame principal
-        main_frame = ttk.Frame(energy_tab)
-        main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-
-        # Frame esquerdo - Estatísticas
-        left_frame = ttk.LabelFrame(main_frame, text=" Estatísticas de Energia", padding=15)
-        left_frame.grid(row=0, column=0, sticky="nsew", padx=(0, 10))
-
+        ttk.Label(control_frame, text="Período:").pack(side=tk.LEFT, padx=(20, 5))
+        ttk.Combobox(control_frame, textvariable=self.chart_range_var, values=list(CHART_RANGES),
+                     state='readonly', width=10).pack(side=tk.LEFT)
+
+        ttk.Label(control_frame, text="Núcleos:").pack(side=tk.LEFT, padx=(20, 5))
+        core_view = ttk.Combobox(control_frame, textvariable=self.core_view_var, values=list(CORE_VIEWS),
+                                 state='readonly', width=14)
+        core_view.pack(side=tk.LEFT)
+        core_view.bind('<<ComboboxSelected>>', self.setup_core_view)
+
+        ttk.Label(control_frame, text="Agrupar:").pack(side=tk.LEFT, padx=(20, 5))
+        core_group = ttk.Combobox(control_frame, textvariable=self.core_group_var, values=list(GROUPINGS),
+                                  state='readonly', width=10)
+        core_group.pack(side=tk.LEFT)
+        core_group.bind('<<ComboboxSelected>>', self.setup_core_view)
+
+        ttk.Checkbutton(control_frame, text="Marcar anomalias", variable=self.anomaly_var,
+                        command=self.update_detailed_charts).pack(side=tk.LEFT, padx=(20, 5))
+
+    def setup_detailed_lines(self):
+        """Cria uma vez os artistas dos gráficos detalhados (títulos e legendas ficam no fundo)"""
+        blit = self.blit_detailed
+
+        # 1. Núcleos da CPU (linhas ou mapa de calor, ver setup_core_view)
+        self.core_artists = []
+        self.ax_core_groups = None
+        self.setup_core_view()
+
+        # 2. IO de disco
+        self.ax_io_disk.set_ylabel('KB/s')
+        self.line_disk_read = blit.add(self.ax_io_disk.plot([], [], 'b-', lw=1.5, label='Leitura')[0])
+        self.line_disk_write = blit.add(self.ax_io_disk.plot([], [], 'r-', lw=1.5, label='Escrita')[0])
+        marks_disk = self.add_anomaly_marks(self.ax_io_disk)
+        self.ax_io_disk.legend(loc='upper left', fontsize='small')
+
+        # 3. IO de rede
+        self.ax_io_net.set_ylabel('KB/s')
+        self.line_net_sent = blit.add(self.ax_io_net.plot([], [], 'g-', lw=1.5, label='Upload')[0])
+        self.line_net_recv = blit.add(self.ax_io_net.plot([], [], 'm-', lw=1.5, label='Download')[0])
+        marks_net = self.add_anomaly_marks(self.ax_io_net)
+        self.ax_io_net.legend(loc='upper left', fontsize='small')
+
+        # 4. Memória, com linha de média e faixa min/max quando vier de rollups
+        self.ax_mem_detail.set_ylabel('Uso (%)')
+        blit.set_ylim(self.ax_mem_detail, 0, 100)
+        self.line_mem_detail = blit.add(self.ax_mem_detail.plot([], [], 'g-', lw=2, label='Memória Total')[0])
+        self.line_mem_avg = blit.add(self.ax_mem_detail.plot([], [], color='r', linestyle='--', alpha=0.5,
+                                                             label='Média')[0])
+        self.text_mem_avg = blit.add(self.ax_mem_detail.text(0.98, 0.05, '', transform=self.ax_mem_detail.transAxes,
+                                                             ha='right', fontsize='small'))
+        self.band_mem_detail = None
+        marks_mem = self.add_anomaly_marks(self.ax_mem_detail)
+        self.ax_mem_detail.legend(loc='upper left', fontsize='small')
+
+        # Anomalias (ver anomaly.py) marcadas sobre a série de cada gráfico; núcleos em setup_core_view
+        self.anomaly_marks = [(marks_disk, ('disk_read', 'disk_write')), (marks_net, ('net_sent', 'net_recv')),
+                              (marks_mem, ('memory',))]
+
+        # 5. Frequência real por núcleo: mediana entre os núcleos e faixa do menor ao maior
+        self.ax_cpu_freq.set_ylabel('MHz')
+        self.line_cpu_freq = blit.add(self.ax_cpu_freq.plot([], [], 'orange', lw=1.5,
+                                                            label='Mediana (faixa: mín-máx)')[0])
+        self.band_cpu_freq = None
+        self.text_cpu_freq = blit.add(self.ax_cpu_freq.text(0.5, 0.5, '', transform=self.ax_cpu_freq.transAxes,
+                                                            ha='center', va='center'))
+        # Máximo lido pelo CpuFreqReader do coletor (a reprodução não tem: a escala acompanha os dados)
+        freq_reader = getattr(self.collector, 'freq_reader', None)
+        self.max_cpu_freq = freq_reader.max_mhz if freq_reader is not None else 0
+        if self.max_cpu_freq:
+            self.ax_cpu_freq.axhline(y=self.max_cpu_freq, color='r', linestyle='--', alpha=0.5,
+                                     label=f'Máx: {self.max_cpu_freq:.0f} MHz')
+            blit.set_ylim(self.ax_cpu_freq, 0, self.max_cpu_freq * 1.1)
+        self.ax_cpu_freq.legend(loc='upper right', fontsize='small')
+
+        # 6. Contagem de processos
+        self.ax_process_count.set_ylabel('Nº de Processos')
+        self.line_process_count = blit.add(self.ax_process_count.plot([], [], 'purple', lw=1.5,
+                                                                      label='Processos Ativos')[0])
+        self.line_process_avg = blit.add(self.ax_process_count.plot([], [], color='b', linestyle='--', alpha=0.5,
+                                                                    label='Média')[0])
+        self.ax_process_count.legend(loc='upper right', fontsize='small')
+
+    def add_anomaly_marks(self, ax):
+        """Círculos vazios sobre as amostras anômalas do eixo"""
+        return self.blit_detailed.add(ax.scatter(np.zeros(0), np.zeros(0), s=40, facecolors='none',
+                                                 edgecolors='red', linewidths=1.5, zorder=5, label='Anomalia'))
+
+    def setup_core_view(self, event=None):
+        """(Re)cria os artistas do gráfico de núcleos no modo e agrupamento escolhidos"""
+        blit = self.blit_detailed
+        ax = self.ax_cores
+        for artist in self.core_artists:
+            blit.remove(artist)
+        if ax.get_legend() is not None:
+            ax.get_legend().remove()
+        if self.ax_core_groups is not None:
+            for line in self.core_group_lines:
+                blit.remove(line)
+            self.ax_core_groups.remove()
+            self.ax_core_groups = None
+
+        ax.yaxis.set_major_locator(plt.AutoLocator())
+        ax.yaxis.set_major_formatter(plt.ScalarFormatter())
+
+        core_count = self.view_snapshot().core_count
+        # A topologia de um host remoto não é conhecida: sem agrupamento
+        grouping = GROUPINGS.get(self.core_group_var.get()) if self.view_host is None else None
+        groups = self.core_groups = core_groups(core_count, grouping)
+        self.core_artists = []
+        self.core_lines = []
+        self.core_group_lines = []
+        self.core_heatmap = None
+        group_ax = None
+
+        if self.core_view_var.get() == 'Mapa de calor':
+            # Uma única imagem núcleos x tempo: o custo de desenho não depende do número de núcleos
+            self.core_heatmap = blit.add(ax.imshow(
+                np.zeros((max(core_count, 1), 1)), aspect='auto', origin='lower', interpolation='nearest',
+                cmap='inferno', vmin=0, vmax=100, extent=(-1, 0, 0, max(core_count, 1))))
+            self.core_artists.append(self.core_heatmap)
+            ax.set_ylabel('Núcleo')
+            ax.grid(False)
+            blit.set_ylim(ax, 0, max(core_count, 1))
+            if grouping:
+                # Faixas contíguas por grupo, separadas por linhas e rotuladas no eixo y
+                self.core_artists += [ax.axhline(start, color='w', lw=1) for start in groups.starts[1:]]
+                ax.set_yticks(groups.starts + groups.sizes / 2, groups.labels)
+                # Médias por grupo em um eixo gêmeo de 0 a 100%
+                group_ax = self.ax_core_groups = ax.twinx()
+                group_ax.set_ylim(0, 100)
+                group_ax.set_ylabel('Média (%)')
+            else:
+                ax.yaxis.set_major_locator(plt.MaxNLocator(integer=True))
+        else:
+            ax.set_ylabel('Uso (%)')
+            ax.grid(True, alpha=0.3)
+            blit.set_ylim(ax, 0, 100)
+            if grouping:
+                group_ax = ax  # uma linha agregada por grupo em vez de uma por núcleo
+            else:
+                cmap = plt.get_cmap('viridis', max(core_count, 1))
+                self.core_lines = [blit.add(ax.plot([], [], lw=1, color=cmap(i), label=f'Núcleo {i + 1}')[0])
+                                   for i in range(core_count)]
+                self.core_artists += self.core_lines
+                if core_count <= CORE_LINES_LIMIT:  # Mostrar legenda apenas se tiver poucos núcleos
+                    ax.legend(loc='upper right', fontsize='small')
+
+        # Anomalias por núcleo: no valor de uso (linhas) ou na linha do núcleo (mapa de calor)
+        self.core_anomaly_marks = self.add_anomaly_marks(ax)
+        self.core_artists.append(self.core_anomaly_marks)
+
+        if group_ax is not None:
+            cmap = plt.get_cmap('tab10')
+            self.core_group_lines = [blit.add(group_ax.plot([], [], lw=1.5, color=cmap(i % 10), label=label)[0])
+                                     for i, label in enumerate(groups.labels)]
+            if group_ax is ax:
+                self.core_artists += self.core_group_lines
+            group_ax.legend(loc='upper right', fontsize='small')
+
+        blit.invalidate()
+        if event is not None:
+            self.update_detailed_charts()
+
+    def setup_energy_vars(self):
+        """Variáveis de energia, atualizadas mesmo antes da aba ser construída"""
         # Informações de bateria
         self.battery_percent_var = tk.StringVar(value="Bateria: --")
         self.battery_power_var = tk.StringVar(value="Potência: --")
@@ -460,6 +937,18 @@ class UltraOptimizedOSMonitor: # god class
         self.cpu_temp_var = tk.StringVar(value="")
         self.gpu_temp_var = tk.StringVar(value="")
 
+    def setup_energy_tab(self, energy_tab):
+        """Aba para monitoramento de energia e temperatura"""
+        import_matplotlib(self.dark_mode)
+
+        # Frame principal
+        main_frame = ttk.Frame(energy_tab)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        # Frame esquerdo - Estatísticas
+        left_frame = ttk.LabelFrame(main_frame, text=" Estatísticas de Energia", padding=15)
+        left_frame.grid(row=0, column=0, sticky="nsew", padx=(0, 10))
+
         # Labels
         ttk.Label(left_frame, text=" INFORMAÇÕES DE BATERIA",
                   font=('Arial', 11, 'bold')).grid(row=0, column=0, columnspan=2, pady=5, sticky="w")
@@ -518,139 +1007,137 @@ class UltraOptimizedOSMonitor: # god class
         main_frame.columnconfigure(1, weight=2)
         main_frame.rowconfigure(0, weight=1)
 
+        self.update_energy_charts()
+
     # ====== FUNÇÕES DE ATUALIZAÇÃO ======
 
     def force_update_all(self):
         """Força atualização de todos os dados"""
-        self.cache['last_process_update'] = 0
-        self.cache['last_system_update'] = 0
-        self.collect_processes()
-        self.collect_system_info()
-        self.update_energy_data()
-        messagebox.showinfo("Atualizado", " Todos os dados foram atualizados!")
+        # A coleta roda na thread do coletor; os dados chegam pela fila em seguida
+        self.collector.refresh()
+        messagebox.showinfo("Atualizado", " Atualização de todos os dados solicitada!")
 
     # ====== FUNÇÕES DE GRÁFICOS DETALHADOS ======
 
-    def update_detailed_charts(self, x=None):
+    def get_chart_span(self):
+        """Intervalo selecionado nos gráficos, em segundos"""
+        return CHART_RANGES.get(self.chart_range_var.get(), HISTORY_SIZE)
+
+    def update_detailed_charts(self, span=None):
         """Atualiza gráficos detalhados"""
-        if x is None:
-            x = range(60)
+        if 'detailed' not in self.built_tabs:
+            return
+        if span is None:
+            span = self.get_chart_span()
+        now = self.collector.now()
 
+        blit = self.blit_detailed
+        snapshot = self.view_snapshot()
         try:
+            for ax in (self.ax_cores, self.ax_io_disk, self.ax_io_net,
+                       self.ax_mem_detail, self.ax_cpu_freq, self.ax_process_count):
+                blit.set_xlim(ax, -span, 0)
+
             # 1. Gráfico de núcleos da CPU
-            self.ax_cores.clear()
-            self.ax_cores.set_title('Uso por Núcleo da CPU (%)')
-            self.ax_cores.set_ylim(0, 100)
-            self.ax_cores.set_xlabel('Tempo (segundos)')
-            self.ax_cores.set_ylabel('Uso (%)')
-            self.ax_cores.grid(True, alpha=0.3)
-
-            core_count = len(self.cache['cpu_cores'])
-            if core_count > 0:
-                cmap = plt.cm.get_cmap('viridis', core_count)
-                for i, core_hist in enumerate(self.cache['cpu_cores']):
-                    if len(core_hist) == 60:
-                        self.ax_cores.plot(x, core_hist, lw=1, color=cmap(i), label=f'Núcleo {i + 1}')
-
-                if core_count <= 8:  # Mostrar legenda apenas se tiver poucos núcleos
-                    self.ax_cores.legend(loc='upper right', fontsize='small')
+            self.update_core_chart(snapshot.window('cpu_cores', span, now), now)
 
             # 2. Gráfico de IO de Disco
-            self.ax_io_disk.clear()
-            self.ax_io_disk.set_title('IO de Disco (KB/s)')
-            self.ax_io_disk.set_xlabel('Tempo (segundos)')
-            self.ax_io_disk.set_ylabel('KB/s')
-            self.ax_io_disk.grid(True, alpha=0.3)
-
-            if len(self.cache['disk_io']['read']) == 60:
-                self.ax_io_disk.plot(x, self.cache['disk_io']['read'], 'b-', lw=1.5, label='Leitura')
-                self.ax_io_disk.plot(x, self.cache['disk_io']['write'], 'r-', lw=1.5, label='Escrita')
-                self.ax_io_disk.legend(loc='upper left', fontsize='small')
+            disk_read = snapshot.window('disk_read', span, now)
+            disk_write = snapshot.window('disk_write', span, now)
+            blit.set_line_data(self.line_disk_read, disk_read.times - now, disk_read.mean)
+            blit.set_line_data(self.line_disk_write, disk_write.times - now, disk_write.mean)
+            blit.autoscale_y(self.ax_io_disk, max(disk_read.mean.max(initial=0), disk_write.mean.max(initial=0)))
 
             # 3. Gráfico de IO de Rede
-            self.ax_io_net.clear()
-            self.ax_io_net.set_title('IO de Rede (KB/s)')
-            self.ax_io_net.set_xlabel('Tempo (segundos)')
-            self.ax_io_net.set_ylabel('KB/s')
-            self.ax_io_net.grid(True, alpha=0.3)
-
-            if len(self.cache['network_io']['sent']) == 60:
-                self.ax_io_net.plot(x, self.cache['network_io']['sent'], 'g-', lw=1.5, label='Upload')
-                self.ax_io_net.plot(x, self.cache['network_io']['recv'], 'm-', lw=1.5, label='Download')
-                self.ax_io_net.legend(loc='upper left', fontsize='small')
+            net_sent = snapshot.window('net_sent', span, now)
+            net_recv = snapshot.window('net_recv', span, now)
+            blit.set_line_data(self.line_net_sent, net_sent.times - now, net_sent.mean)
+            blit.set_line_data(self.line_net_recv, net_recv.times - now, net_recv.mean)
+            blit.autoscale_y(self.ax_io_net, max(net_sent.mean.max(initial=0), net_recv.mean.max(initial=0)))
 
             # 4. Gráfico detalhado de memória
-            self.ax_mem_detail.clear()
-            self.ax_mem_detail.set_title('Uso Detalhado de Memória')
-            self.ax_mem_detail.set_xlabel('Tempo (segundos)')
-            self.ax_mem_detail.set_ylabel('Uso (%)')
-            self.ax_mem_detail.grid(True, alpha=0.3)
-            self.ax_mem_detail.set_ylim(0, 100)
-
-            if len(self.cache['memory_history']) == 60:
-                self.ax_mem_detail.plot(x, self.cache['memory_history'], 'g-', lw=2, label='Memória Total')
-
-                # Adicionar linha de média
-                avg_memory = np.mean(self.cache['memory_history'])
-                self.ax_mem_detail.axhline(y=avg_memory, color='r', linestyle='--', alpha=0.5,
-                                           label=f'Média: {avg_memory:.1f}%')
-                self.ax_mem_detail.legend(loc='upper left', fontsize='small')
-
-            # 5. Gráfico de frequência da CPU
-            self.ax_cpu_freq.clear()
-            self.ax_cpu_freq.set_title('Frequência da CPU (MHz)')
-            self.ax_cpu_freq.set_xlabel('Tempo (segundos)')
-            self.ax_cpu_freq.set_ylabel('MHz')
-            self.ax_cpu_freq.grid(True, alpha=0.3)
-
-            try:
-                # Tentar obter frequência da CPU
-                cpu_freq = psutil.cpu_freq()
-                if cpu_freq:
-                    current_freq = cpu_freq.current
-                    max_freq = cpu_freq.max
-
-                    # Criar histórico de frequência simulado baseado no uso da CPU
-                    freq_history = []
-                    for cpu_usage in self.cache['cpu_history']:
-                        freq = current_freq * (0.3 + 0.7 * (cpu_usage / 100))
-                        freq_history.append(min(freq, max_freq))
-
-                    if len(freq_history) == 60:
-                        self.ax_cpu_freq.plot(x, freq_history, 'orange', lw=1.5, label='Frequência Atual')
-                        self.ax_cpu_freq.axhline(y=max_freq, color='r', linestyle='--', alpha=0.5,
-                                                 label=f'Máx: {max_freq:.0f} MHz')
-                        self.ax_cpu_freq.legend(loc='upper right', fontsize='small')
-            except:
-                pass
+            memory = snapshot.window('memory_history', span, now)
+            x = memory.times - now
+            blit.set_line_data(self.line_mem_detail, x, memory.mean)
+            if self.band_mem_detail is not None:
+                blit.remove(self.band_mem_detail)
+                self.band_mem_detail = None
+            if memory.times.size:
+                avg_memory = float(np.mean(memory.mean))
+                self.line_mem_avg.set_data([-span, 0], [avg_memory, avg_memory])
+                self.text_mem_avg.set_text(f'Média: {avg_memory:.1f}%')
+                if memory.period > 1:
+                    # Nos rollups, mostrar a faixa min/max do período
+                    band = decimate_band(x, memory.min, memory.max, pixel_width(self.ax_mem_detail))
+                    self.band_mem_detail = blit.add(self.ax_mem_detail.fill_between(*band, color='g', alpha=0.2))
+
+            # 5. Gráfico de frequência da CPU (histórico 'cpu_freq', núcleos x tempo)
+            if self.band_cpu_freq is not None:
+                blit.remove(self.band_cpu_freq)
+                self.band_cpu_freq = None
+            freq = snapshot.window('cpu_freq', span, now) if snapshot.has('cpu_freq') else None
+            self.text_cpu_freq.set_text('' if freq is not None else 'Frequência por núcleo indisponível')
+            if freq is not None and freq.times.size:
+                x = freq.times - now
+                low = np.fmin.reduce(freq.min, axis=0)
+                high = np.fmax.reduce(freq.max, axis=0)
+                blit.set_line_data(self.line_cpu_freq, x, channel_median(freq.mean))
+                band = decimate_band(x, low, high, pixel_width(self.ax_cpu_freq))
+                self.band_cpu_freq = blit.add(self.ax_cpu_freq.fill_between(*band, color='orange', alpha=0.25))
+                if not self.max_cpu_freq:
+                    blit.autoscale_y(self.ax_cpu_freq, np.nan_to_num(high).max(initial=0), floor=1000)
+            else:
+                self.line_cpu_freq.set_data([], [])
 
             # 6. Gráfico de contagem de processos
-            self.ax_process_count.clear()
-            self.ax_process_count.set_title('Contagem de Processos')
-            self.ax_process_count.set_xlabel('Tempo (segundos)')
-            self.ax_process_count.set_ylabel('Nº de Processos')
-            self.ax_process_count.grid(True, alpha=0.3)
-
-            # Criar histórico simulado de contagem de processos
-            if len(self.cache['processes']) > 0:
-                base_count = len(self.cache['processes'])
-                process_history = []
-                for i in range(60):
-                    variation = np.random.randint(-5, 6)  # Variação aleatória
-                    process_history.append(max(10, base_count + variation))
-
-                if len(process_history) == 60:
-                    self.ax_process_count.plot(x, process_history, 'purple', lw=1.5, label='Processos Ativos')
-                    avg_processes = np.mean(process_history)
-                    self.ax_process_count.axhline(y=avg_processes, color='b', linestyle='--', alpha=0.5,
-                                                  label=f'Média: {avg_processes:.0f}')
-                    self.ax_process_count.legend(loc='upper right', fontsize='small')
-
-            self.canvas_detailed.draw_idle()
+            counts = snapshot.window('process_count_history', span, now)
+            blit.set_line_data(self.line_process_count, counts.times - now, counts.mean)
+            if counts.times.size:
+                avg_processes = float(np.mean(counts.mean))
+                self.line_process_avg.set_data([-span, 0], [avg_processes, avg_processes])
+            blit.autoscale_y(self.ax_process_count, counts.max.max(initial=0), floor=10)
+
+            self.update_anomaly_marks(snapshot.anomalies if self.anomaly_var.get() else (), now - span, now)
+
+            blit.update()
 
         except Exception as e:
             print(f"Erro ao atualizar gráficos detalhados: {e}")
 
+    def update_core_chart(self, cores, now):
+        """Atualiza o gráfico de núcleos a partir de uma janela (núcleos x tempo)"""
+        blit = self.blit_detailed
+        x = cores.times - now
+        for line, core_hist in zip(self.core_lines, cores.mean):
+            blit.set_line_data(line, x, core_hist)
+
+        if not x.size or not (self.core_heatmap is not None or self.core_group_lines):
+            return
+        groups = self.core_groups
+        # Linhas reordenadas para que cada grupo ocupe uma faixa contígua
+        data = cores.mean[groups.order] if len(groups) > 1 else cores.mean
+        if self.core_heatmap is not None:
+            # Uma coluna por pixel, pelo máximo de cada balde (picos curtos continuam visíveis)
+            self.core_heatmap.set_data(decimate_columns(data, pixel_width(self.ax_cores)))
+            self.core_heatmap.set_extent((x[0], x[-1] + cores.period, 0, data.shape[0]))
+        if self.core_group_lines:
+            for line, group_mean in zip(self.core_group_lines, groups.means(data)):
+                blit.set_line_data(line, x, group_mean)
+
+    def update_anomaly_marks(self, anomalies, since, now):
+        """Posiciona os marcadores de anomalia da janela exibida (tempos relativos a `now`)"""
+        for marks, series in self.anomaly_marks:
+            times, _, values = anomaly_points(anomalies, series, since)
+            marks.set_offsets(np.column_stack((times - now, values)))
+
+        times, cores, values = anomaly_points(anomalies, 'cores', since)
+        if self.core_heatmap is not None:
+            # Linha do núcleo no mapa de calor (reordenado por grupo)
+            groups = self.core_groups
+            rows = np.argsort(groups.order) if len(groups) > 1 else np.arange(self.view_snapshot().core_count)
+            values = rows[np.minimum(cores, len(rows) - 1)] + 0.5
+        self.core_anomaly_marks.set_offsets(np.column_stack((times - now, values)))
+
     def save_detailed_chart(self):
         """Salva o gráfico detalhado como imagem"""
         try:
@@ -673,69 +1160,51 @@ class UltraOptimizedOSMonitor: # god class
 
     # ====== FUNÇÕES DE ENERGIA E TEMPERATURA ======
 
-    def update_energy_data(self):
-        """Atualiza dados de energia e temperatura"""
-        try:
-            # 1. Informações de bateria
-            if hasattr(psutil, 'sensors_battery'):
-                battery = psutil.sensors_battery()
-                if battery:
-                    percent = battery.percent
-                    power_plugged = battery.power_plugged
-                    secsleft = battery.secsleft
-
-                    self.battery_percent_var.set(f" Bateria: {percent}%")
-
-                    if power_plugged:
-                        self.battery_power_var.set(" Conectado à energia")
-                        self.battery_status_var.set("Status: Carregando")
-                    else:
-                        self.battery_power_var.set(" Usando bateria")
-                        self.battery_status_var.set("Status: Descarregando")
-
-                    if secsleft == psutil.POWER_TIME_UNLIMITED:
-                        self.battery_time_var.set(" Tempo restante: Ilimitado (conectado)")
-                    elif secsleft == psutil.POWER_TIME_UNKNOWN:
-                        self.battery_time_var.set(" Tempo restante: Desconhecido")
-                    else:
-                        hours = secsleft // 3600
-                        minutes = (secsleft % 3600) // 60
-                        self.battery_time_var.set(f" Tempo restante: {hours}h {minutes}min")
-                else:
-                    self.battery_percent_var.set(" Bateria: Não disponível")
-                    self.battery_power_var.set(" Status: Não disponível")
+    def update_energy_ui(self, energy):
+        """Exibe os dados de energia e temperatura publicados pelo coletor"""
+        # 1. Informações de bateria
+        battery = energy['battery']
+        if battery:
+            self.set_text(self.battery_percent_var, f" Bateria: {battery['percent']}%")
+
+            if battery['plugged']:
+                self.set_text(self.battery_power_var, " Conectado à energia")
+                self.set_text(self.battery_status_var, "Status: Carregando")
             else:
-                self.battery_percent_var.set(" Bateria: API não disponível")
-
-            # 2. Informações de temperatura
-            if hasattr(psutil, 'sensors_temperatures'):
-                temps = psutil.sensors_temperatures()
-                if temps:
-                    # Tentar obter temperatura da CPU
-                    if 'coretemp' in temps:
-                        cpu_temp = temps['coretemp'][0].current
-                        self.cpu_temp_var.set(f"")
-                        self.update_history_list(self.cache['temperature_history'], cpu_temp)
-                    elif 'acpitz' in temps:
-                        cpu_temp = temps['acpitz'][0].current
-                        self.cpu_temp_var.set(f"")
-                    else:
-                        self.cpu_temp_var.set("")
-                else:
-                    self.cpu_temp_var.set("")
+                self.set_text(self.battery_power_var, " Usando bateria")
+                self.set_text(self.battery_status_var, "Status: Descarregando")
+
+            secsleft = battery['secsleft']
+            if secsleft == psutil.POWER_TIME_UNLIMITED:
+                self.set_text(self.battery_time_var, " Tempo restante: Ilimitado (conectado)")
+            elif secsleft == psutil.POWER_TIME_UNKNOWN:
+                self.set_text(self.battery_time_var, " Tempo restante: Desconhecido")
             else:
-                self.cpu_temp_var.set("")
+                hours = secsleft // 3600
+                minutes = (secsleft % 3600) // 60
+                self.set_text(self.battery_time_var, f" Tempo restante: {hours}h {minutes}min")
+        elif energy['battery_api']:
+            self.set_text(self.battery_percent_var, " Bateria: Não disponível")
+            self.set_text(self.battery_power_var, " Status: Não disponível")
+        else:
+            self.set_text(self.battery_percent_var, " Bateria: API não disponível")
 
-            # 3. Atualizar gráficos de energia
-            self.update_energy_charts()
+        # 2. Informações de temperatura
+        cpu_temp = energy['cpu_temp']
+        self.set_text(self.cpu_temp_var, f"Temperatura CPU: {cpu_temp:.1f}°C" if cpu_temp is not None else "")
 
-        except Exception as e:
-            print(f"Erro ao atualizar dados de energia: {e}")
+        # 3. Atualizar gráficos de energia
+        if self.visible_tab() == 'energy':
+            self.update_energy_charts()
 
     def update_energy_charts(self):
         """Atualiza gráficos de energia"""
+        if 'energy' not in self.built_tabs:
+            return
         try:
-            x = range(60)
+            x = range(HISTORY_SIZE)
+            snapshot = self.collector.snapshot
+            cpu_recent = snapshot.last('cpu_history', HISTORY_SIZE)
 
             # Gráfico de energia/consumo
             self.ax_power.clear()
@@ -746,11 +1215,11 @@ class UltraOptimizedOSMonitor: # god class
 
             # Simular dados de consumo baseado no uso da CPU
             power_data = []
-            for cpu_usage in self.cache['cpu_history']:
+            for cpu_usage in cpu_recent:
                 power = 10 + (cpu_usage * 0.5) + np.random.rand() * 5
                 power_data.append(power)
 
-            if len(power_data) == 60:
+            if len(power_data) == HISTORY_SIZE:
                 self.ax_power.plot(x, power_data, 'orange', lw=2, label='Consumo Estimado')
                 self.ax_power.fill_between(x, 0, power_data, alpha=0.3, color='orange')
                 self.ax_power.legend(loc='upper right')
@@ -763,17 +1232,18 @@ class UltraOptimizedOSMonitor: # god class
             self.ax_temp.grid(True, alpha=0.3)
 
             # Usar dados de temperatura se disponíveis, senão simular
-            if len(self.cache['temperature_history']) > 0 and self.cache['temperature_history'][-1] > 0:
-                temp_data = self.cache['temperature_history']
+            temp_recent = snapshot.last('temperature_history', HISTORY_SIZE)
+            if temp_recent[-1] > 0:
+                temp_data = temp_recent
             else:
                 # Simular dados de temperatura
                 temp_data = []
                 base_temp = 40
-                for cpu_usage in self.cache['cpu_history']:
+                for cpu_usage in cpu_recent:
                     temp = base_temp + (cpu_usage * 0.2) + np.random.rand() * 3
                     temp_data.append(temp)
 
-            if len(temp_data) == 60:
+            if len(temp_data) == HISTORY_SIZE:
                 self.ax_temp.plot(x, temp_data, 'r', lw=2, label='Temperatura')
                 self.ax_temp.axhline(y=70, color='orange', linestyle='--', alpha=0.7, label='Limite Alto')
                 self.ax_temp.axhline(y=85, color='red', linestyle='--', alpha=0.7, label='Crítico')
@@ -790,6 +1260,7 @@ class UltraOptimizedOSMonitor: # god class
         try:
             if sys.platform == 'win32':
                 # Windows: tentar ajustar plano de energia
+                import subprocess
                 subprocess.run(['powercfg', '/setactive', 'a1841308-3541-4fab-bc81-f71556f20b4a'])  # Economia
                 messagebox.showinfo("Modo Economia", "✅ Modo economia de energia ativado!")
             else:
@@ -821,6 +1292,7 @@ class UltraOptimizedOSMonitor: # god class
             Status: {'Conectado' if battery.power_plugged else 'Bateria'}
             Tempo restante: {battery.secsleft if battery.secsleft != -1 else 'Desconhecido'} segundos"""
 
+            metrics = self.collector.snapshot.metrics
             report += f"""
 
             TEMPERATURAS:
@@ -829,17 +1301,17 @@ class UltraOptimizedOSMonitor: # god class
 
             CONSUMO ATUAL:
             {'-' * 30}
-            CPU: {self.cache['cpu']}%
-            Memória: {self.cache['memory']}%
-            Disco: {self.cache['disk']}%
+            CPU: {metrics.get('cpu', 0)}%
+            Memória: {metrics.get('memory', 0)}%
+            Disco: {metrics.get('disk', 0)}%
 
             RECOMENDAÇÕES:
             {'-' * 30}
             """
 
-            if self.cache['cpu'] > 80:
+            if metrics.get('cpu', 0) > 80:
                 report += "• Considere fechar programas pesados\n"
-            if self.cache['memory'] > 80:
+            if metrics.get('memory', 0) > 80:
                 report += "• Considere reiniciar o sistema\n"
             if 'Alta' in self.cpu_temp_var.get():
                 report += "• Considere limpar ventilação do sistema\n"
@@ -859,8 +1331,21 @@ class UltraOptimizedOSMonitor: # god class
 
     # ====== FUNÇÕES DE GERENCIAMENTO DE PROCESSOS ======
 
+    def local_processes(self):
+        """True se a lista exibida é dos processos locais; senão avisa que não há como agir sobre eles"""
+        if self.replay:
+            messagebox.showinfo("Reprodução", "Os processos exibidos são da gravação e não podem ser finalizados.")
+            return False
+        if self.view_host is not None:
+            messagebox.showinfo("Frota", f"Os processos exibidos são de {self.view_host} e não podem ser "
+                                         "inspecionados nem finalizados daqui.")
+            return False
+        return True
+
     def show_terminate_dialog(self):
         """Mostra diálogo para finalizar processos"""
+        if not self.local_processes():
+            return
         selected = self.tree.selection()
         if not selected:
             messagebox.showwarning("Aviso", "Selecione pelo menos um processo primeiro!")
@@ -896,6 +1381,7 @@ class UltraOptimizedOSMonitor: # god class
             try:
                 # Tentar finalizar o processo
                 if sys.platform == 'win32':
+                    import subprocess
                     subprocess.run(['taskkill', '/F', '/PID', str(pid)],
                                    capture_output=True, timeout=5)
                 else:
@@ -922,6 +1408,8 @@ class UltraOptimizedOSMonitor: # god class
 
     def show_process_details(self):
         """Mostra detalhes do processo selecionado"""
+        if not self.local_processes():
+            return
         selected = self.tree.selection()
         if not selected:
             messagebox.showwarning("Aviso", "Selecione um processo primeiro!")
@@ -988,6 +1476,7 @@ class UltraOptimizedOSMonitor: # god class
         """Finaliza um único processo"""
         try:
             if sys.platform == 'win32':
+                import subprocess
                 subprocess.run(['taskkill', '/F', '/PID', str(pid)],
                                capture_output=True, timeout=5)
             else:
@@ -1003,6 +1492,8 @@ class UltraOptimizedOSMonitor: # god class
 
     def terminate_selected(self, method):
         """Finaliza processos selecionados"""
+        if not self.local_processes():
+            return
         selected = self.tree.selection()
         if not selected:
             messagebox.showwarning("Aviso", "Selecione pelo menos um processo primeiro!")
@@ -1054,299 +1545,438 @@ class UltraOptimizedOSMonitor: # god class
 
     def filter_processes(self, event=None):
         """Filtra processos baseado no texto digitado"""
-        self.update_process_ui(self.cache['processes'])
+        self.process_offset = 0
+        self.update_process_ui(self.view_snapshot().processes)
+
+    def sort_processes(self, column):
+        """Ordena pela coluna clicada; clicar de novo inverte a ordem"""
+        if self.sort_column == column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column = column
+            # Texto começa em ordem alfabética, números do maior para o menor
+            self.sort_reverse = PROCESS_SORT_KEYS[column] not in ('name', 'user', 'status')
+        self.update_sort_headings()
+        self.update_process_ui(self.process_store)
+
+    def update_sort_headings(self):
+        for col in PROCESS_SORT_KEYS:
+            arrow = (' ▼' if self.sort_reverse else ' ▲') if col == self.sort_column else ''
+            self.tree.heading(col, text=col + arrow)
+
+    # ====== LISTA DE PROCESSOS VIRTUALIZADA ======
+
+    def on_process_tree_resize(self, event):
+        """Recalcula quantas linhas cabem na área visível"""
+        row_height = int(self.style.lookup('Treeview', 'rowheight') or 20)
+        visible = max(1, event.height // row_height - 1)  # desconta o cabeçalho
+        if visible != self.process_visible_rows:
+            self.process_visible_rows = visible
+            self.render_process_window()
+
+    def on_process_wheel(self, event):
+        self.scroll_process_rows(-3 if event.delta > 0 else 3)
+        return 'break'
+
+    def on_process_scroll(self, *args):
+        """Comando da scrollbar vertical: 'moveto fração' ou 'scroll n units|pages'"""
+        total = len(self.process_view)
+        if args[0] == 'moveto':
+            self.process_offset = int(float(args[1]) * total)
+        elif args[0] == 'scroll':
+            step = int(args[1])
+            if args[2] == 'pages':
+                step *= self.process_visible_rows
+            self.process_offset += step
+        self.render_process_window()
+
+    def scroll_process_rows(self, rows):
+        self.process_offset += rows
+        self.render_process_window()
+
+    def render_process_window(self):
+        """Materializa no Treeview apenas as linhas da janela visível"""
+        total = len(self.process_view)
+        visible = self.process_visible_rows
+        self.process_offset = max(0, min(self.process_offset, total - visible))
+
+        store = self.process_store
+        rows = []
+        for i in self.process_view[self.process_offset:self.process_offset + visible]:
+            p = store.record(i)
+            vals = (p['pid'], p['name'], f"{p['cpu']:.1f}%", f"{p['mem_pct']:.1f}%",
+                    f"{p['mem_mb']:.1f}", p['threads'], p['status'], p['user'])
+
+            tags = ()
+            if p['cpu'] > 20:
+                tags = ('high_cpu',)
+            elif p['mem_pct'] > 10:
+                tags = ('high_mem',)
+
+            rows.append((p['pid'], vals, tags))
+
+        self.tree_sync.apply(rows)
+
+        if total:
+            self.process_scroll.set(self.process_offset / total,
+                                    min(1.0, (self.process_offset + visible) / total))
+        else:
+            self.process_scroll.set(0, 1)
 
     # ====== MONITORAMENTO ======
 
     def start_threaded_monitoring(self):
         self.monitor_thread = threading.Thread(target=self.monitoring_worker, daemon=True)
         self.monitor_thread.start()
-        self.process_data_queue()
-        self.update_charts_loop()
-
+        self.setup_refresh_tasks()
+        self.scheduler.start()
+
+    def setup_refresh_tasks(self):
+        """Registra as atualizações periódicas da interface na agenda"""
+        # Fila: drenada mesmo minimizada (só guarda a última mensagem de cada tipo)
+        self.scheduler.add('fila', self.process_data_queue, 0.1,
+                           max_interval=self.collector.interval, background=True)
+        self.scheduler.add('graficos', self.refresh_charts, self.collector.interval, max_interval=60,
+                           when=lambda: self.visible_tab() in ('charts', 'detailed'))
+        self.scheduler.add('energia', self.update_energy_charts, 5, max_interval=30,
+                           when=lambda: self.visible_tab() == 'energy')
+        if self.replay:
+            self.scheduler.add('reproducao', self.update_replay_bar, 0.25, max_interval=1)
+
+    # ====== REPRODUÇÃO ======
+
+    def setup_replay_bar(self):
+        """Barra de reprodução: pausa, busca arrastando a posição e velocidade de 1x a 100x"""
+        recording = self.collector.recording
+        bar = ttk.Frame(self.window)
+        bar.pack(fill=tk.X, padx=10, pady=(0, 5))
+
+        self.replay_button_var = tk.StringVar(value="Pausar")
+        ttk.Button(bar, textvariable=self.replay_button_var, width=10, command=self.toggle_replay).pack(side=tk.LEFT)
+
+        self.replay_time_var = tk.StringVar()
+        ttk.Label(bar, textvariable=self.replay_time_var, width=20).pack(side=tk.LEFT, padx=10)
+
+        self.replay_speed_var = tk.StringVar(value=f'{SPEEDS[0]}x')
+        speed = ttk.Combobox(bar, textvariable=self.replay_speed_var, values=[f'{s}x' for s in SPEEDS],
+                             state='readonly', width=6)
+        speed.pack(side=tk.RIGHT)
+        speed.bind('<<ComboboxSelected>>',
+                   lambda e: self.collector.set_speed(float(self.replay_speed_var.get().rstrip('x'))))
+        ttk.Label(bar, text="Velocidade:").pack(side=tk.RIGHT, padx=5)
+
+        # Enquanto o usuário arrasta, a agenda não move o cursor
+        self.replay_dragging = False
+        self.replay_scale = ttk.Scale(bar, from_=0, to=max(recording.end - recording.start, 1),
+                                      orient=tk.HORIZONTAL, command=self.on_replay_scale)
+        self.replay_scale.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        self.replay_scale.bind('<ButtonPress-1>', lambda e: setattr(self, 'replay_dragging', True))
+        self.replay_scale.bind('<ButtonRelease-1>', self.on_replay_release)
+
+    def replay_time_text(self, ts):
+        recording = self.collector.recording
+        return f"{datetime.fromtimestamp(ts).strftime('%d/%m %H:%M:%S')} ({ts - recording.start:.0f}s)"
+
+    def on_replay_scale(self, value):
+        if self.replay_dragging:
+            ts = self.collector.recording.start + float(value)
+            self.set_text(self.replay_time_var, self.replay_time_text(ts))
+            self.collector.seek(ts)
+
+    def on_replay_release(self, event):
+        self.replay_dragging = False
+        self.collector.seek(self.collector.recording.start + float(self.replay_scale.get()))
+        self.scheduler.wake()
+
+    def toggle_replay(self):
+        if self.collector.playing:
+            self.collector.pause()
+        else:
+            self.collector.play()
+        self.scheduler.wake('reproducao')
+
+    def update_replay_bar(self):
+        """Acompanha a posição da reprodução na barra; devolve True se mudou"""
+        collector = self.collector
+        changed = self.set_text(self.replay_button_var, "Pausar" if collector.playing else "Reproduzir")
+        if not self.replay_dragging:
+            changed |= self.set_text(self.replay_time_var, self.replay_time_text(collector.position))
+            self.replay_scale.set(collector.position - collector.recording.start)
+        return changed
+
+    # ====== ALERTAS ======
+
+    def update_alerts_ui(self, messages):
+        """Acrescenta os eventos das mensagens 'alerts' ao histórico e atualiza o status"""
+        tree = self.alert_tree
+        for message in messages:
+            self.active_alerts[message['host']] = message['active']
+            for event in message['events']:
+                resolved = event['state'] == 'resolved'
+                values = (datetime.fromtimestamp(event['time']).strftime('%H:%M:%S'),
+                          event['host'] or LOCAL_HOST, SEVERITY_TEXT[event['severity']], event['rule'],
+                          "Resolvido" if resolved else "Disparado", event['message'])
+                tree.insert('', 0, values=values, tags=('resolved' if resolved else event['severity'],))
+        rows = tree.get_children()
+        if len(rows) > ALERT_ROWS:
+            tree.delete(*rows[ALERT_ROWS:])
+        self.update_alert_status()
+
+    def update_alert_status(self):
+        """Status do Dashboard: a maior severidade entre os alertas disparados do host exibido"""
+        active = self.active_alerts.get(self.view_host, ())
+        if not active:
+            text, color = "✅ Estável", "green"
+        else:
+            severity = max((event['severity'] for event in active), key=list(SEVERITY_TEXT).index)
+            prefix, color = SEVERITY_STATUS[severity]
+            text = prefix + ", ".join(event['rule'] for event in active if event['severity'] == severity)
+        if self.set_text(self.alert_var, text):
+            self.alert_label.configure(foreground=color)
+
+    # ====== FROTA ======
+
+    def update_fleet_ui(self, rows):
+        """Mostra o resumo da frota (mensagem 'fleet'): os FLEET_ROWS primeiros na ordenação escolhida"""
+        self.fleet_rows = rows
+        index = FLEET_COLUMNS[self.fleet_sort]
+        if index == 6:
+            # Última amostra: os mais atrasados (ou sem dados) primeiro
+            key = lambda row: float('inf') if row[6] is None else row[6]
+        else:
+            key = lambda row: row[index]
+        shown = sorted(rows, key=key, reverse=index != 0)[:FLEET_ROWS]
+
+        items = []
+        for name, cpu, memory, disk, network, cores, age, connected in shown:
+            status = "sem dados" if age is None else f"{age:.0f} s atrás"
+            if not connected:
+                status += " (desconectado)"
+            values = (name, f"{cpu:.1f}", f"{memory:.1f}", f"{disk:.1f}", f"{network:.1f}", cores, status)
+            items.append((name, values, () if connected else ('offline',)))
+        self.fleet_sync.apply(items)
+
+        names = [LOCAL_HOST] + sorted(row[0] for row in rows)
+        if list(self.host_combo['values']) != names:
+            self.host_combo['values'] = names
+        online = sum(1 for row in rows if row[7])
+        self.set_text(self.fleet_summary_var, f"{online} de {len(rows)} hosts conectados - "
+                                              f"{len(items)} exibidos por {self.fleet_sort}")
+
+    def sort_fleet(self, column):
+        self.fleet_sort = column
+        self.update_fleet_ui(self.fleet_rows)
+
+    def on_fleet_double_click(self, event):
+        item = self.fleet_tree.identify_row(event.y)
+        if item:
+            self.select_host(self.fleet_tree.set(item, 'Host'))
+
+    def select_host(self, name):
+        """Troca o host exibido no Dashboard e nos gráficos (LOCAL_HOST volta ao coletor local)"""
+        self.view_host = None if name == LOCAL_HOST else name
+        self.host_var.set(name)
+        self.metrics_frame.configure(text=f" Métricas em Tempo Real - {name}")
+        self.update_alert_status()
+        snapshot = self.view_snapshot()
+        if snapshot.metrics:
+            self.update_metrics_ui(snapshot.metrics)
+        if 'detailed' in self.built_tabs:
+            self.setup_core_view()  # número de núcleos do host escolhido
+        if 'processes' in self.built_tabs:
+            self.update_process_ui(snapshot.processes)
+        self.scheduler.wake()
 
     def monitoring_worker(self):
-        last_net = psutil.net_io_counters()
-        last_disk = psutil.disk_io_counters()
-
-        while self.is_running:
-            try:
-                now = time.time()
-
-                # Coleta dados básicos
-                cpu = psutil.cpu_percent(interval=0.5)
-                mem = psutil.virtual_memory()
-                disk = psutil.disk_usage('/')
-
-                # Atualizar cache com valores atuais
-                self.cache['cpu'] = cpu
-                self.cache['memory'] = mem.percent
-                self.cache['disk'] = disk.percent
-
-                # Calcula uso em GB
-                self.cache['memory_total_gb'] = mem.total / (1024 ** 3)
-                self.cache['memory_used_gb'] = mem.used / (1024 ** 3)
-                self.cache['memory_available_gb'] = mem.available / (1024 ** 3)
-
-                self.cache['disk_total_gb'] = disk.total / (1024 ** 3)
-                self.cache['disk_used_gb'] = disk.used / (1024 ** 3)
-                self.cache['disk_free_gb'] = disk.free / (1024 ** 3)
-
-                # Rede
-                curr_net = psutil.net_io_counters()
-                net_sent = (curr_net.bytes_sent - last_net.bytes_sent) / 1024
-                net_recv = (curr_net.bytes_recv - last_net.bytes_recv) / 1024
-                last_net = curr_net
-
-                # Disco IO
-                curr_disk = psutil.disk_io_counters()
-                disk_read = (curr_disk.read_bytes - last_disk.read_bytes) / 1024 if last_disk else 0
-                disk_write = (curr_disk.write_bytes - last_disk.write_bytes) / 1024 if last_disk else 0
-                last_disk = curr_disk
-
-                cores = psutil.cpu_percent(percpu=True)
-
-                # Atualiza históricos
-                self.update_history_list(self.cache['cpu_history'], cpu)
-                self.update_history_list(self.cache['memory_history'], mem.percent)
-                self.update_history_list(self.cache['disk_history'], disk.percent)
-                self.update_history_list(self.cache['network_history'], net_sent + net_recv)
-
-                self.update_history_list(self.cache['disk_io']['read'], disk_read)
-                self.update_history_list(self.cache['disk_io']['write'], disk_write)
-                self.update_history_list(self.cache['network_io']['sent'], net_sent)
-                self.update_history_list(self.cache['network_io']['recv'], net_recv)
-
-                for i, c_val in enumerate(cores):
-                    if i < len(self.cache['cpu_cores']):
-                        self.update_history_list(self.cache['cpu_cores'][i], c_val)
-
-                self.data_queue.put(('metrics', {
-                    'cpu': cpu, 'memory': mem.percent, 'disk': disk.percent,
-                    'network': net_sent + net_recv, 'cores': cores,
-                    'memory_used_gb': self.cache['memory_used_gb'],
-                    'memory_total_gb': self.cache['memory_total_gb'],
-                    'disk_used_gb': self.cache['disk_used_gb'],
-                    'disk_total_gb': self.cache['disk_total_gb']
-                }))
-
-                if now - self.cache['last_process_update'] > 3:
-                    self.collect_processes()
-                    self.cache['last_process_update'] = now
-
-                if now - self.cache['last_system_update'] > 10:
-                    self.collect_system_info()
-                    self.cache['last_system_update'] = now
-
-                # Atualizar dados de energia periodicamente
-                if now % 30 < 1:  # A cada ~30 segundos
-                    self.update_energy_data()
-
-            except Exception as e:
-                print(f"Erro no worker: {e}")
-                time.sleep(1)
-
-    def update_history_list(self, lst, value):
-        if len(lst) >= 60:
-            lst.pop(0)
-        lst.append(value)
+        # Event loop do serviço de coleta (uma tarefa por fonte); nada nesta
+        # thread toca em widgets Tk
+        self.collector.run()
 
     def collect_processes(self):
-        procs = []
-        cpu_count = psutil.cpu_count(logical=True)
-
-# Pega as variaveis para ser exibida no gerenciador
-        for p in psutil.process_iter(
-                ['pid', 'name', 'cpu_percent', 'memory_percent', 'username', 'num_threads', 'memory_info']):
-            try:
-                if p.info['pid'] == 0:
-                    continue
-
-                mem_mb = p.info['memory_info'].rss / (1024 * 1024) if p.info['memory_info'] else 0
-                raw_cpu = p.info['cpu_percent'] or 0
-                normalized_cpu = raw_cpu / cpu_count
-
-                procs.append({
-                    'pid': p.info['pid'],
-                    'name': p.info['name'],
-                    'cpu': normalized_cpu,
-                    'mem_pct': p.info['memory_percent'] or 0,
-                    'mem_mb': mem_mb,
-                    'threads': p.info['num_threads'] or 0,
-                    'status': p.status(),
-                    'user': p.info['username'] or 'N/A'
-                })
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
-
-        procs.sort(key=lambda x: x['cpu'], reverse=True)
-        self.cache['processes'] = procs[:200]
-        self.data_queue.put(('processes', self.cache['processes']))
+        self.collector.refresh('processes')
 
     def collect_system_info(self):
-        try:
-            boot = datetime.fromtimestamp(psutil.boot_time())
-            mem = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
-
-            info = f"""
-            SISTEMA OPERACIONAL
-            -------------------
-            OS: {platform.system()} {platform.release()}
-            Versão: {platform.version()}
-            Boot: {boot.strftime('%d/%m/%Y %H:%M:%S')}
-            Uptime: {datetime.now() - boot}
-
-            HARDWARE
-            --------
-            CPU: {psutil.cpu_count(logical=False)} Físicos / {psutil.cpu_count()} Lógicos
-            Freq: {psutil.cpu_freq().current:.0f}Mhz
-
-            MEMÓRIA RAM
-            -----------
-            Total: {mem.total / (1024 ** 3):.2f} GB
-            Usado: {mem.used / (1024 ** 3):.2f} GB
-            Disponível: {mem.available / (1024 ** 3):.2f} GB
-            Percentual: {mem.percent:.1f}%
-
-            ARMAZENAMENTO
-            -------------
-            Total: {disk.total / (1024 ** 3):.2f} GB
-            Usado: {disk.used / (1024 ** 3):.2f} GB
-            Livre: {disk.free / (1024 ** 3):.2f} GB
-            Percentual: {disk.percent:.1f}%
-
-            REDE
-            ----
-            Hostname: {socket.gethostname()}
-            IP Local: {socket.gethostbyname(socket.gethostname())}
-            """
-            self.data_queue.put(('sys_info', info))
-        except Exception as e:
-            self.data_queue.put(('sys_info', f"Erro ao coletar informações: {e}"))
+        self.collector.refresh('system')
+
+    def update_energy_data(self):
+        self.collector.refresh('energy')
 
     def process_data_queue(self):
+        """Drena a fila e exibe a última mensagem de cada tipo na aba que a mostra"""
         try:
-            while not self.data_queue.empty():
+            while True:
                 dtype, data = self.data_queue.get_nowait()
-                if dtype == 'metrics':
-                    self.update_metrics_ui(data)
-                elif dtype == 'processes':
-                    self.update_process_ui(data)
-                elif dtype == 'sys_info':
-                    self.system_text.delete('1.0', tk.END)
-                    self.system_text.insert('1.0', data)
-        except:
+                if dtype == 'alerts':
+                    self.pending_alerts.append(data)
+                else:
+                    self.pending_data[dtype] = data  # rajadas: só a mais recente importa
+        except queue.Empty:
             pass
 
-        if self.is_running:
-            self.window.after(100, self.process_data_queue)
+        if self.scheduler.is_minimized():
+            return False
+
+        # Valores estáveis (nada mudou na tela) deixam a tarefa espaçar as consultas
+        changed = False
+        tab = self.visible_tab()
+        if self.pending_alerts:
+            # Em qualquer aba: o histórico não pode perder eventos
+            self.update_alerts_ui(self.pending_alerts)
+            self.pending_alerts = []
+            changed = True
+        if 'metrics' in self.pending_data and tab == 'dashboard':
+            metrics = self.pending_data.pop('metrics')
+            if self.view_host is None:
+                changed |= self.update_metrics_ui(metrics)
+        if 'fleet' in self.pending_data and tab == 'dashboard':
+            self.update_fleet_ui(self.pending_data.pop('fleet'))
+            if self.view_host is not None and self.view_snapshot().metrics:
+                self.update_metrics_ui(self.view_snapshot().metrics)
+            changed = True
+        if 'processes' in self.pending_data and tab == 'processes' and self.view_host is None:
+            self.update_process_ui(self.pending_data.pop('processes'))
+            changed = True
+        if self.view_host is not None and tab == 'processes':
+            # Processos do host remoto: exibidos quando chega uma tabela nova
+            processes = self.view_snapshot().processes
+            if processes is not self.process_store:
+                self.update_process_ui(processes)
+                changed = True
+        if 'sys_info' in self.pending_data:
+            self.system_text.delete('1.0', tk.END)
+            self.system_text.insert('1.0', self.pending_data.pop('sys_info'))
+            changed = True
+        if 'energy' in self.pending_data:
+            self.update_energy_ui(self.pending_data.pop('energy'))
+            changed = True
+        return changed
+
+    def show_refresh_stats(self):
+        """Mostra o custo de cada tarefa de atualização da interface e de cada fonte do coletor"""
+        lines = [self.scheduler.report(), '',
+                 f"{'Fonte':<12}{'Intervalo':>10}{'Leituras':>10}{'Prazos':>8}{'Erros':>7}{'Última ms':>11}"]
+        for s in self.collector.source_stats():
+            lines.append(f"{s['name'] + (' *' if s['slow'] else ''):<12}{s['interval']:>9.2f}s{s['runs']:>10}"
+                         f"{s['timeouts']:>8}{s['errors']:>7}{s['duration_ms']:>11.2f}")
+        lines.append("* fonte lenta, lida no pool de threads com prazo")
+        lines.append(f"Mensagens descartadas na fila da interface: {self.data_queue.dropped}")
+        messagebox.showinfo("Custo da Interface", '\n'.join(lines))
+
+    def set_text(self, var, text):
+        """Só reescreve a variável Tk quando o texto muda; devolve True se mudou"""
+        if self.shown_text.get(str(var)) == text:
+            return False
+        self.shown_text[str(var)] = text
+        var.set(text)
+        return True
 
     def update_metrics_ui(self, data):
+        """Atualiza o Dashboard; devolve True se algum valor exibido mudou"""
         # Atualiza métricas básicas
-        self.cpu_var.set(f"{data['cpu']:.1f}%")
-        self.memory_var.set(f"{data['memory']:.1f}%")
-        self.disk_var.set(f"{data['disk']:.1f}%")
-        self.network_var.set(f"{data['network']:.1f} KB/s")
-        self.process_var.set(str(len(self.cache['processes'])))
+        changed = self.set_text(self.cpu_var, f"{data['cpu']:.1f}%")
+        changed |= self.set_text(self.memory_var, f"{data['memory']:.1f}%")
+        changed |= self.set_text(self.disk_var, f"{data['disk']:.1f}%")
+        changed |= self.set_text(self.network_var, f"{data['network']:.1f} KB/s")
+        # Na reprodução só os N maiores foram gravados; a contagem total vem da amostra
+        changed |= self.set_text(self.process_var,
+                                 str(int(data.get('process_count', len(self.view_snapshot().processes)))))
 
         # Atualiza métricas de uso total
-        self.memory_used_var.set(f"Usado: {data['memory_used_gb']:.1f} GB / Total: {data['memory_total_gb']:.1f} GB")
-        self.disk_used_var.set(f"Usado: {data['disk_used_gb']:.1f} GB / Total: {data['disk_total_gb']:.1f} GB")
-
-        # Atualiza barras de progresso
-        self.cpu_progress['value'] = data['cpu']
-        self.mem_progress['value'] = data['memory']
-
-        # Status do sistema
-        status = "✅ Estável"
-        color = "green"
-        if data['cpu'] > 90 or data['memory'] > 90:
-            status = "🔴 CRÍTICO"
-            color = "red"
-        elif data['cpu'] > 75 or data['memory'] > 75:
-            status = "⚠️ Atenção"
-            color = "orange"
-
-        self.alert_var.set(status)
-        self.alert_label.configure(foreground=color)
+        changed |= self.set_text(self.memory_used_var,
+                                 f"Usado: {data['memory_used_gb']:.1f} GB / Total: {data['memory_total_gb']:.1f} GB")
+        changed |= self.set_text(self.disk_used_var,
+                                 f"Usado: {data['disk_used_gb']:.1f} GB / Total: {data['disk_total_gb']:.1f} GB")
+
+        # Atualiza barras de progresso (só quando o valor arredondado muda)
+        progress = (round(data['cpu']), round(data['memory']))
+        if self.shown_text.get('progress') != progress:
+            self.shown_text['progress'] = progress
+            self.cpu_progress['value'], self.mem_progress['value'] = progress
 
         # Log
-        log_msg = f"[{datetime.now().strftime('%H:%M:%S')}] CPU: {data['cpu']}% | RAM: {data['memory']}% | RAM(GB): {data['memory_used_gb']:.1f}\n"
+        log_msg = f"[{datetime.fromtimestamp(self.collector.now()).strftime('%H:%M:%S')}] CPU: {data['cpu']}% | RAM: {data['memory']}% | RAM(GB): {data['memory_used_gb']:.1f}\n"
         self.info_text.insert('1.0', log_msg)
         if float(self.info_text.index('end')) > 100:
             self.info_text.delete('100.0', tk.END)
 
-    def update_process_ui(self, processes):
-        search = self.filter_var.get().lower()
-        if search:
-            processes = [p for p in processes if search in p['name'].lower() or search in str(p['pid'])]
-
-        self.tree.delete(*self.tree.get_children())
-
-        for p in processes:
-            vals = (p['pid'], p['name'], f"{p['cpu']:.1f}%", f"{p['mem_pct']:.1f}%",
-                    f"{p['mem_mb']:.1f}", p['threads'], p['status'], p['user'])
-
-            tags = ()
-            if p['cpu'] > 20:
-                tags = ('high_cpu',)
-            elif p['mem_pct'] > 10:
-                tags = ('high_mem',)
+        if self.startup_profile and not PROFILER.reported:
+            self.window.update_idletasks()
+            PROFILER.mark('primeiro frame (primeira amostra)')
+            PROFILER.report()
+        return changed
 
-            self.tree.insert('', 'end', values=vals, tags=tags)
-
-        self.tree.tag_configure('high_cpu', foreground='red')
-        self.tree.tag_configure('high_mem', foreground='orange')
-
-    def update_charts_loop(self):
-        if not self.is_running:
+    def update_process_ui(self, processes):
+        if 'processes' not in self.built_tabs:
             return
-
-        x = range(60)
-
-        # Atualizar gráficos básicos
-        self.line_cpu.set_data(x, self.cache['cpu_history'])
-        self.line_mem.set_data(x, self.cache['memory_history'])
-        self.line_dsk.set_data(x, self.cache['disk_history'])
-        self.line_net.set_data(x, self.cache['network_history'])
-
-        max_net = max(self.cache['network_history'])
-        self.ax_net.set_ylim(0, max(100, max_net * 1.2))
-
-        self.ax_cpu.relim()
-        self.ax_cpu.autoscale_view()
-        self.ax_mem.relim()
-        self.ax_mem.autoscale_view()
-        self.ax_dsk.relim()
-        self.ax_dsk.autoscale_view()
-        self.ax_net.relim()
-        self.ax_net.autoscale_view()
-
-        self.canvas_basic.draw_idle()
-
-        # Verificar qual aba está ativa
-        current_tab = self.notebook.select()
-        if current_tab:
-            tab_text = self.notebook.tab(current_tab, "text")
-
-            # Atualizar gráficos detalhados se a aba estiver ativa
-            if "Gráficos Detalhados" in tab_text:
-                self.update_detailed_charts(x)
-
-            # Atualizar gráficos de energia se a aba estiver ativa
-            if "Energia" in tab_text:
-                self.update_energy_charts()
-
-        self.window.after(1000, self.update_charts_loop)
+        # Filtro e ordenação rodam no snapshot em colunas, não no widget
+        search = self.filter_var.get().strip()
+        self.process_store = processes
+        self.process_view = processes.query(search, PROCESS_SORT_KEYS[self.sort_column],
+                                            self.sort_reverse, self.filter_regex_var.get())
+        self.render_process_window()
+
+    def refresh_charts(self):
+        """Atualiza os gráficos da aba visível"""
+        span = self.get_chart_span()
+        now = self.collector.now()
+        # Os dados do período só mudam a cada `period` segundos (de dados) do nível de retenção usado
+        period = self.view_snapshot().period('cpu_history', span, now)
+        self.scheduler.set_interval('graficos', max(self.collector.interval, period / self.collector.speed))
+
+        tab = self.visible_tab()
+        if tab == 'charts':
+            self.update_basic_charts(span, now)
+        elif tab == 'detailed':
+            self.update_detailed_charts(span)
+        return True
+
+    def update_basic_charts(self, span, now):
+        """Atualiza os gráficos básicos"""
+        # Atualizar gráficos básicos com o nível de retenção que cobre o período
+        blit = self.blit_basic
+        snapshot = self.view_snapshot()
+        for line, ax, key in ((self.line_cpu, self.ax_cpu, 'cpu_history'),
+                              (self.line_mem, self.ax_mem, 'memory_history'),
+                              (self.line_dsk, self.ax_dsk, 'disk_history'),
+                              (self.line_net, self.ax_net, 'network_history')):
+            window = snapshot.window(key, span, now)
+            blit.set_line_data(line, window.times - now, window.mean)
+            blit.set_xlim(ax, -span, 0)
+
+        # Escala da rede só muda quando o pico sai da faixa atual (evita redesenho completo)
+        net_window = snapshot.window('network_history', span, now)
+        blit.autoscale_y(self.ax_net, net_window.max.max(initial=0))
+
+        blit.update()
 
     def on_closing(self):
         if messagebox.askokcancel("Sair", "Deseja fechar o Monitor?"):
             self.is_running = False
+            self.scheduler.stop()
+            self.collector.stop()
+            # Espera o coletor fechar a gravação (último lote, índice e rodapé)
+            self.monitor_thread.join(timeout=2)
             self.window.destroy()
             sys.exit(0)
 
 
-if __name__ == "__main__":
-    app = UltraOptimizedOSMonitor()
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.headless:
+        # Modo headless: apenas o coletor, sem Tk/Matplotlib
+        from collector import run_headless
+        return run_headless(args)
+
+    import_gui()
+    app = UltraOptimizedOSMonitor(startup_profile=args.startup_profile, interval=args.interval,
+                                  process_backend=args.process_backend, record=args.record,
+                                  record_processes=args.record_processes, replay=args.replay,
+                                  exporter=args.exporter, exporter_top=args.exporter_top,
+                                  agent=args.agent, aggregate=args.aggregate, alerts=args.alerts)
     app.window.mainloop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""Mede o agregador da frota (fleet.FleetAggregator) com N agentes simulados por loopback.
+
+Uso: python benchmarks/bench_fleet.py [--agents 500] [--cores 16] [--seconds 20]
+
+O agregador roda em outro processo, como em produção (app.py --headless
+--aggregate), e é medido por psutil: CPU (% de um núcleo) e RSS, primeiro sem
+agentes e depois com os N conectados. Os agentes, todos neste processo,
+enviam uma amostra por segundo (wire.SampleEncoder, núcleos em passeio
+aleatório), sem tabelas de processos.
+"""
+import argparse
+import asyncio
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import psutil
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import wire  # noqa: E402
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def measure(process, seconds):
+    """(% de CPU de um núcleo, RSS em MB) do processo durante `seconds`"""
+    start, t0 = sum(process.cpu_times()[:2]), time.monotonic()
+    time.sleep(seconds)
+    used, elapsed = sum(process.cpu_times()[:2]) - start, time.monotonic() - t0
+    return 100 * used / elapsed, process.memory_info().rss / 1024 ** 2
+
+
+async def agent(i, port, cores, stop):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(wire.frame(wire.hello(f'bench-{i}', cores, 1.0, time.time())))
+    encoder = wire.SampleEncoder()
+    metrics = {key: random.random() * 50 for key, _ in wire.SCALES}
+    usage = [random.random() * 100 for _ in range(cores)]
+    await asyncio.sleep(random.random())  # espalha os envios dentro do segundo
+    while not stop.is_set():
+        for key in metrics:
+            metrics[key] = max(0.0, metrics[key] + random.gauss(0, 1))
+        usage = [min(100.0, max(0.0, u + random.gauss(0, 3))) for u in usage]
+        writer.write(wire.frame(encoder.encode(time.time(), dict(metrics, cores=usage))))
+        await writer.drain()
+        await asyncio.sleep(1)
+    writer.close()
+
+
+async def run_agents(args, port, process):
+    stop = asyncio.Event()
+    tasks = [asyncio.create_task(agent(i, port, args.cores, stop)) for i in range(args.agents)]
+    await asyncio.sleep(3)  # todos conectados e no ritmo
+    cpu, rss = await asyncio.get_running_loop().run_in_executor(None, measure, process, args.seconds)
+    stop.set()
+    await asyncio.gather(*tasks)
+    return cpu, rss
+
+
+def wait_listening(port, timeout=15):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--agents', type=int, default=500)
+    parser.add_argument('--cores', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=20)
+    args = parser.parse_args()
+
+    port = free_port()
+    aggregator = subprocess.Popen([sys.executable, os.path.join(ROOT, 'app.py'), '--headless', '--output',
+                                   os.devnull, '--aggregate', f'127.0.0.1:{port}'])
+    try:
+        if not wait_listening(port):
+            print("Agregador não respondeu", file=sys.stderr)
+            return 1
+        process = psutil.Process(aggregator.pid)
+        idle_cpu, idle_rss = measure(process, min(args.seconds, 5))
+        cpu, rss = asyncio.run(run_agents(args, port, process))
+    finally:
+        aggregator.send_signal(signal.SIGTERM)
+        aggregator.wait()
+
+    print(f"{'agentes':>8} {'núcleos':>8} {'CPU (%)':>8} {'RSS (MB)':>9}")
+    print(f"{0:>8} {'-':>8} {idle_cpu:>8.1f} {idle_rss:>9.0f}")
+    print(f"{args.agents:>8} {args.cores:>8} {cpu:>8.1f} {rss:>9.0f}")
+    print(f"por agente: {(cpu - idle_cpu) / args.agents:.3f}% de CPU, {(rss - idle_rss) / args.agents * 1024:.0f} KB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
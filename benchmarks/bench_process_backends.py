@@ -0,0 +1,83 @@
+"""Compara os backends de coleta de processos (procfs x psutil) em um /proc sintético.
+
+Uso: python benchmarks/bench_process_backends.py [--sizes 1000 10000] [--rounds 5]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import psutil  # noqa: E402
+
+from collector import ProcessCache  # noqa: E402
+from procfs import ProcFSBackend  # noqa: E402
+
+
+def build_fake_proc(root, count):
+    """Cria um /proc mínimo com `count` processos (os arquivos que os dois backends leem)"""
+    uid = os.getuid()
+    with open(os.path.join(root, 'stat'), 'w') as f:
+        f.write("cpu  1 0 1 100 0 0 0 0 0 0\nbtime 1700000000\n")
+    for pid in range(1, count + 1):
+        d = os.path.join(root, str(pid))
+        os.mkdir(d)
+        name = f"proc{pid % 997}"
+        # Campos 3..52 do stat; utime/stime, threads, starttime e rss nos lugares certos
+        fields = ['S', '1', str(pid), str(pid), '0', '-1', '4194560', '0', '0', '0', '0',
+                  str(pid * 3), str(pid), '0', '0', '20', '0', '1', '0', str(1000 + pid),
+                  '10000000', '2500'] + ['0'] * 30
+        with open(os.path.join(d, 'stat'), 'w') as f:
+            f.write(f"{pid} ({name}) {' '.join(fields)}\n")
+        with open(os.path.join(d, 'statm'), 'w') as f:
+            f.write("2441 2500 100 1 0 200 0\n")
+        with open(os.path.join(d, 'status'), 'w') as f:
+            f.write(f"Name:\t{name}\nState:\tS (sleeping)\nUid:\t{uid}\t{uid}\t{uid}\t{uid}\n"
+                    f"Gid:\t0\t0\t0\t0\nThreads:\t1\nvoluntary_ctxt_switches:\t1\n"
+                    f"nonvoluntary_ctxt_switches:\t1\n")
+
+
+def time_backend(backend, rounds):
+    backend.prime()
+    best = float('inf')
+    rows = 0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        rows = sum(1 for _ in backend.scan())
+        best = min(best, time.perf_counter() - start)
+    return best, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    if not sys.platform.startswith('linux'):
+        print("O backend procfs só existe no Linux")
+        return 1
+
+    print(f"{'processos':>10} {'backend':>8} {'melhor (ms)':>12} {'µs/processo':>12}")
+    for size in args.sizes:
+        root = tempfile.mkdtemp(prefix='fakeproc_')
+        try:
+            build_fake_proc(root, size)
+            original = psutil.PROCFS_PATH
+            psutil.PROCFS_PATH = root
+            try:
+                for label, backend in (('procfs', ProcFSBackend(root)), ('psutil', ProcessCache())):
+                    best, rows = time_backend(backend, args.rounds)
+                    print(f"{rows:>10} {label:>8} {best * 1000:>12.1f} {best / max(rows, 1) * 1e6:>12.1f}")
+            finally:
+                psutil.PROCFS_PATH = original
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""Mede a gravação em disco (recorder.py): µs por amostra, tempo de abertura e de leitura de janelas.
+
+Uso: python benchmarks/bench_recorder.py [--cores 16 256] [--samples 200000] [--check]
+
+Antes de medir, confere a recuperação (check_recovery): um arquivo fechado
+abre pela cadeia de índices; cortado no meio de um bloco, sem rodapé ou com
+um bloco corrompido, abre com `complete=False` e todos os blocos inteiros
+anteriores legíveis. `--check` só faz a conferência. Os arquivos ficam em um
+diretório temporário, apagado no fim.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from process_table import ProcessStoreBuilder  # noqa: E402
+from recorder import BLOCK_HEADER, FOOTER, Recorder, Recording  # noqa: E402
+
+
+def expect(condition, message):
+    if not condition:
+        raise AssertionError(message)
+
+
+def write_recording(path, channels, count, batch_size, index_every=4, processes_every=0):
+    """Grava `count` amostras conhecidas (valor = índice da amostra + canal); devolve os tempos"""
+    recorder = Recorder(path, channels, interval=1.0, batch_size=batch_size, flush_interval=1e9,
+                        index_every=index_every, process_limit=5)
+    times = 1.7e9 + np.arange(count, dtype=np.float64)
+    values = np.arange(count, dtype=np.float32)[:, None] + np.arange(len(channels), dtype=np.float32)
+    builder = ProcessStoreBuilder()
+    for i in range(count):
+        recorder.append(times[i], values[i])
+        if processes_every and i % processes_every == 0:
+            for pid in range(1, 8):
+                builder.add(pid, f"proc{pid}", float(pid + i % 7), 0.5, pid * 1024 * 1024, 1, 'S', 'root')
+            recorder.append_processes(times[i], builder.build())
+    recorder.close()
+    return recorder.path, times, values
+
+
+def expect_readable(recording, times, values, blocks, batch_size, message):
+    """Os `blocks` primeiros lotes (e nenhum outro) são lidos com os valores gravados"""
+    count = blocks * batch_size
+    expect(len(recording.blocks) == blocks and len(recording) == count, f"{message}: {len(recording)} amostras")
+    got_times, got_values = recording.window(times[0], times[-1])
+    expect(np.array_equal(got_times, times[:count]) and np.array_equal(got_values, values[:count]),
+           f"{message}: valores")
+
+
+def truncated_copy(source, path, size):
+    with open(source, 'rb') as f:
+        data = f.read(size)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
+
+
+def check_recovery(directory):
+    """Levanta AssertionError se alguma gravação não abrir como documentado"""
+    channels = ('cpu', 'memory', 'core0')
+    batch = 16
+    path, times, values = write_recording(os.path.join(directory, 'ok.mosr'), channels, 10 * batch, batch,
+                                          processes_every=batch)
+    recording = Recording(path)
+    # 10 blocos de dados + 10 de processos, índices a cada 4: só lê tudo percorrendo os 5 blocos INDX
+    expect(recording.complete, "arquivo fechado: índice")
+    expect_readable(recording, times, values, 10, batch, "arquivo fechado")
+    expect(len(recording.process_blocks) == 10 and recording.processes(times[-1])[2][0] == 'proc7',
+           "arquivo fechado: processos")
+
+    # Sem rodapé: a varredura acha os mesmos blocos
+    size = os.path.getsize(path)
+    recording = Recording(truncated_copy(path, os.path.join(directory, 'no-footer.mosr'), size - FOOTER.size))
+    expect(not recording.complete, "sem rodapé: complete")
+    expect_readable(recording, times, values, 10, batch, "sem rodapé")
+
+    # Cortado no meio do último bloco de dados: perde só esse lote (e o que viria depois dele)
+    full = Recording(path)
+    last = int(full.blocks['offset'][-1])
+    processes = int(np.count_nonzero(full.process_blocks['offset'] < last))
+    for cut, name in ((last + BLOCK_HEADER.size + 7, 'meio do bloco'), (last + 5, 'meio do cabeçalho')):
+        recording = Recording(truncated_copy(path, os.path.join(directory, 'cut.mosr'), cut))
+        expect(not recording.complete, f"{name}: complete")
+        expect_readable(recording, times, values, 9, batch, name)
+        expect(len(recording.process_blocks) == processes, f"{name}: processos")
+
+    # CRC inválido no quarto bloco de dados: a varredura para antes dele
+    with open(path, 'rb') as f:
+        data = bytearray(f.read())
+    fourth = int(full.blocks['offset'][3])
+    data[fourth + BLOCK_HEADER.size] ^= 0xFF
+    data = data[:-FOOTER.size]
+    corrupt = os.path.join(directory, 'corrupt.mosr')
+    with open(corrupt, 'wb') as f:
+        f.write(data)
+    expect_readable(Recording(corrupt), times, values, 3, batch, "bloco corrompido")
+
+
+def bench(directory, cores, count):
+    channels = ('cpu', 'memory') + tuple(f'core{i}' for i in range(cores))
+    path = os.path.join(directory, f'bench-{cores}.mosr')
+    recorder = Recorder(path, channels, interval=1.0)
+    values = np.random.default_rng(cores).random((1000, len(channels)), dtype=np.float32) * 100
+    start = time.perf_counter()
+    for i in range(count):
+        recorder.append(1.7e9 + i, values[i % 1000])
+    append = (time.perf_counter() - start) / count
+    recorder.close()
+
+    start = time.perf_counter()
+    recording = Recording(path)
+    indexed = time.perf_counter() - start
+    size = os.path.getsize(path)
+    truncated = truncated_copy(path, os.path.join(directory, f'bench-{cores}-cut.mosr'), size - FOOTER.size)
+    start = time.perf_counter()
+    Recording(truncated)
+    scanned = time.perf_counter() - start
+
+    end = recording.end
+    start = time.perf_counter()
+    recording.window(end - 900, end)
+    window = time.perf_counter() - start
+    print(f"{cores:>7} {count:>9} {size / 1024 ** 2:>8.1f} {append * 1e6:>10.2f} {indexed * 1e3:>10.2f} "
+          f"{scanned * 1e3:>12.1f} {window * 1e3:>10.2f}")
+    os.remove(path)
+    os.remove(truncated)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cores', type=int, nargs='+', default=[16, 256])
+    parser.add_argument('--samples', type=int, default=200000)
+    parser.add_argument('--check', action='store_true', help="Só confere a recuperação, sem medir")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='bench-recorder-')
+    try:
+        check_recovery(directory)
+        print("Recuperação conferida (índice, sem rodapé, bloco cortado ou corrompido)")
+        if args.check:
+            return 0
+        print(f"{'núcleos':>7} {'amostras':>9} {'MB':>8} {'µs/amostra':>10} {'índice ms':>10} "
+              f"{'varredura ms':>12} {'15 min ms':>10}")
+        for cores in args.cores:
+            bench(directory, cores, args.samples)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""Mede o encerramento do modo headless por SIGTERM (como o `systemctl stop`).
+
+Uso: python benchmarks/bench_shutdown.py [--runs 20] [--max-delay 2.0] [--timeout 10]
+
+Cada rodada inicia `app.py --headless --record`, envia SIGTERM após um
+atraso aleatório entre 0 e --max-delay segundos (atrasos curtos pegam a
+partida, quando as fontes ainda estão na primeira espera) e confere que o
+processo sai em até --timeout segundos com código 0 e que a gravação foi
+fechada com índice e rodapé (`Recording.complete`). Imprime o tempo de
+encerramento de cada rodada; qualquer falha encerra com código 1.
+"""
+import argparse
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from recorder import Recording  # noqa: E402
+
+
+def run_once(directory, i, delay, timeout):
+    """(segundos até sair, erro ou None) de uma rodada"""
+    path = os.path.join(directory, f'shutdown-{i}.mosr')
+    process = subprocess.Popen([sys.executable, os.path.join(ROOT, 'app.py'), '--headless', '--interval', '0.1',
+                                '--output', os.devnull, '--record', path],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    # O gravador cria o arquivo no construtor do coletor: antes disso o SIGTERM mataria o Python sem tratador
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path) and process.poll() is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(delay)
+    start = time.monotonic()
+    process.send_signal(signal.SIGTERM)
+    try:
+        _, stderr = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.communicate()
+        return None, f"não saiu em {timeout}s"
+    elapsed = time.monotonic() - start
+    if process.returncode != 0:
+        return elapsed, f"código {process.returncode}: {stderr.decode(errors='replace').strip()[-300:]}"
+    try:
+        if not Recording(path).complete:
+            return elapsed, "gravação sem rodapé"
+    except (OSError, ValueError) as e:
+        return elapsed, f"gravação ilegível: {e}"
+    return elapsed, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--max-delay', type=float, default=2.0)
+    parser.add_argument('--timeout', type=float, default=10.0)
+    args = parser.parse_args()
+
+    failures = 0
+    with tempfile.TemporaryDirectory(prefix='bench-shutdown-') as directory:
+        print(f"{'rodada':>6} {'atraso (s)':>10} {'saída (ms)':>10}  resultado")
+        for i in range(args.runs):
+            delay = random.uniform(0, args.max_delay)
+            elapsed, error = run_once(directory, i, delay, args.timeout)
+            failures += error is not None
+            shown = f"{elapsed * 1e3:>10.0f}" if elapsed is not None else f"{'-':>10}"
+            print(f"{i:>6} {delay:>10.2f} {shown}  {error or 'ok'}")
+    print(f"{args.runs - failures}/{args.runs} encerramentos limpos")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,290 @@
+"""Mede o protocolo da frota (wire.py): bytes por amostra e µs por quadro para 16, 128 e 256 núcleos.
+
+Uso: python benchmarks/bench_wire.py [--cores 16 128 256] [--samples 3000] [--processes 300] [--check]
+
+Antes de medir, confere a ida e volta (check_round_trip): decode(encode(x))
+igual a x dentro do passo de quantização, em KEYFRAMEs e DELTAs, com
+núcleos mudando de quantidade, varints nos extremos de int64, versão
+desconhecida e processos entrando, saindo e trocando de nome. `--check` só
+faz a conferência. As amostras são sintéticas: núcleos em passeio aleatório (metade quase
+ociosa), taxas de IO e rede variando a cada segundo. O tamanho JSON é o da
+mesma mensagem 'metrics' serializada como no modo headless, para comparação.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import wire  # noqa: E402
+from process_table import ProcessStoreBuilder  # noqa: E402
+
+
+def synthetic_samples(cores, count, seed=0):
+    """(tempo, metrics) como os emitidos pelo SystemCollector, a 1 Hz com atraso aleatório"""
+    rng = np.random.default_rng(seed)
+    busy = rng.random(cores) < 0.5
+    usage = np.where(busy, rng.uniform(20, 80, cores), rng.uniform(0, 3, cores))
+    memory_used = 12.0
+    samples = []
+    ts = 1.7e9
+    for _ in range(count):
+        usage = np.clip(usage + rng.normal(0, np.where(busy, 4.0, 0.5)), 0, 100)
+        memory_used = max(1.0, memory_used + rng.normal(0, 0.01))
+        rates = np.abs(rng.normal(0, [50, 200, 30, 300]))
+        ts += 1 + rng.normal(0, 0.002)
+        samples.append((ts, {
+            'cpu': float(usage.mean()), 'memory': round(memory_used / 32 * 100, 1), 'disk': 41.3,
+            'network': float(rates[2] + rates[3]), 'cores': usage.tolist(),
+            'memory_used_gb': memory_used, 'memory_total_gb': 32.0,
+            'disk_used_gb': 205.7, 'disk_total_gb': 498.0,
+            'disk_read': float(rates[0]), 'disk_write': float(rates[1]),
+            'net_sent': float(rates[2]), 'net_recv': float(rates[3]), 'process_count': 412,
+        }))
+    return samples
+
+
+def synthetic_stores(count, snapshots, seed=0):
+    """ProcessStores sucessivos: CPU variando e alguns processos entrando e saindo a cada varredura"""
+    rng = np.random.default_rng(seed)
+    builder = ProcessStoreBuilder()
+    pids = list(rng.choice(np.arange(1, 60000), count, replace=False))
+    cpu = rng.exponential(2, count)
+    stores = []
+    for _ in range(snapshots):
+        for i in rng.choice(count, 3, replace=False):
+            pids[i] = int(rng.integers(60000, 4000000))
+        cpu = np.clip(cpu + rng.normal(0, 0.5, count), 0, 100)
+        for pid, c in zip(pids, cpu.tolist()):
+            builder.add(int(pid), f"proc-{pid % 997}", c, 0.4, int(pid) * 4096, 4, 'S', 'root')
+        stores.append(builder.build())
+    return stores
+
+
+def expect(condition, message):
+    if not condition:
+        raise AssertionError(message)
+
+
+def expect_error(fn, message):
+    """`fn` deve recusar a entrada com ValueError"""
+    try:
+        fn()
+    except ValueError:
+        return
+    raise AssertionError(f"{message}: aceito")
+
+
+def close_to(decoded, original, scale):
+    """Diferença dentro de meio passo de quantização (mais folga de arredondamento)"""
+    return np.all(np.abs(np.asarray(decoded, dtype=np.float64) - original) <= 0.5 / scale + 1e-9)
+
+
+def check_varints():
+    extremes = [0, 1, -1, 63, -64, 64, -65, 8191, -8192, 2 ** 31, -2 ** 31, 2 ** 62, -2 ** 62,
+                np.iinfo(np.int64).max, np.iinfo(np.int64).min]
+    rng = np.random.default_rng(1)
+    for values in (np.array(extremes, dtype=np.int64), rng.integers(-64, 64, 500),
+                   rng.integers(-2 ** 40, 2 ** 40, 500), np.zeros(0, dtype=np.int64)):
+        data = b'\x07' + wire.pack_varints(values) + b'\x00'  # bytes alheios antes e depois
+        decoded, end = wire.unpack_varints(data, 1, len(values))
+        expect(np.array_equal(decoded, values) and end == len(data) - 1, f"varints: {values[:5]}...")
+        # A versão escalar (tamanhos e HELLO) lê os mesmos bytes
+        pos = 1
+        for value in values[:50].tolist():
+            n, pos = wire.read_varint(data, pos)
+            expect(wire.unzigzag(n) == value, f"read_varint: {value}")
+    expect_error(lambda: wire.unpack_varints(b'\x80\x80', 0, 1), "varint truncado")
+
+
+def check_samples():
+    for cores in (1, 16, 256):
+        samples = synthetic_samples(cores, 200, seed=cores)
+        encoder, decoder = wire.SampleEncoder(keyframe_interval=50), wire.SampleDecoder()
+        kinds = set()
+        for ts, metrics in samples:
+            payload = encoder.encode(ts, metrics)
+            kinds.add(payload[0])
+            decoded_ts, decoded = decoder.decode(payload)
+            expect(abs(decoded_ts - ts) <= 0.5 / wire.TIME_SCALE + 1e-6, "tempo")
+            for key, scale in wire.SCALES:
+                expect(close_to(decoded[key], metrics[key], scale), f"{key} com {cores} núcleos")
+            expect(len(decoded['cores']) == cores and close_to(decoded['cores'], metrics['cores'], wire.CORE_SCALE),
+                   f"núcleos ({cores})")
+        expect(kinds == {wire.KEYFRAME, wire.DELTA}, "KEYFRAMEs e DELTAs")
+
+    # Quantidade de núcleos mudando no meio da conexão: o encoder manda outro KEYFRAME
+    encoder, decoder = wire.SampleEncoder(), wire.SampleDecoder()
+    (t1, m1), (t2, m2) = synthetic_samples(4, 1)[0], synthetic_samples(8, 1)[0]
+    decoder.decode(encoder.encode(t1, m1))
+    payload = encoder.encode(t2, m2)
+    expect(payload[0] == wire.KEYFRAME and len(decoder.decode(payload)[1]['cores']) == 8, "núcleos mudando")
+
+    # NaN vira 0; DELTA antes de KEYFRAME e tipo desconhecido são ignorados
+    _, decoded = wire.SampleDecoder().decode(wire.SampleEncoder().encode(t1, dict(m1, cpu=float('nan'))))
+    expect(decoded['cpu'] == 0.0, "NaN")
+    delta = encoder.encode(t2 + 1, m2)
+    expect(delta[0] == wire.DELTA and wire.SampleDecoder().decode(delta) is None, "DELTA sem KEYFRAME")
+    expect(wire.SampleDecoder().decode(bytes([99])) is None, "tipo desconhecido")
+
+    # KEYFRAME com um escalar a mais (versão futura): o extra é ignorado
+    values = wire.SampleEncoder.quantize(t1, m1)
+    payload = bytearray([wire.KEYFRAME])
+    wire.write_varint(payload, len(wire.SCALES) + 1)
+    wire.write_varint(payload, 4)
+    n = 1 + len(wire.SCALES)
+    payload += wire.pack_varints(np.concatenate((values[:n], [12345], values[n:])))
+    _, decoded = wire.SampleDecoder().decode(bytes(payload))
+    expect(close_to(decoded['cores'], m1['cores'], wire.CORE_SCALE), "escalar extra")
+
+    # Versão do HELLO
+    info = wire.parse_hello(wire.hello('h', 4, 1.0, 1.7e9))
+    expect(info['host'] == 'h' and info['cores'] == 4, "HELLO")
+    expect_error(lambda: wire.parse_hello(bytes([wire.HELLO]) + json.dumps({'version': 99}).encode()),
+                 "versão desconhecida")
+
+    # Quadros cortados no meio ficam no buffer até completar
+    stream = b''.join(wire.frame(encoder.encode(ts, m)) for ts, m in synthetic_samples(8, 5))
+    payloads, used = wire.split_frames(bytearray(stream[:-3]))
+    rest, _ = wire.split_frames(bytearray(stream[used:]))
+    expect(len(payloads) == 4 and len(rest) == 1, "split_frames")
+
+    # Quadro declarado acima de MAX_FRAME ou prefixo que não termina: recusados antes de acumular
+    oversized = wire.frame(b'x' * 8)
+    expect_error(lambda: wire.split_frames(bytearray(oversized), max_size=4), "quadro grande demais")
+    expect_error(lambda: wire.split_frames(bytearray(b'\xff\xff\xff\x7f')), "quadro acima de MAX_FRAME")
+    expect_error(lambda: wire.split_frames(bytearray(b'\x80' * 64)), "prefixo sem fim")
+    expect(wire.split_frames(bytearray(b'\x80\x80'))[0] == [], "prefixo incompleto")
+
+
+def check_processes():
+    stores = synthetic_stores(120, 40, seed=2)
+    # PID reaproveitado por outro processo: mesmo PID, outro nome
+    builder = ProcessStoreBuilder()
+    last = stores[-1]
+    for i in range(len(last)):
+        pid = int(last.columns['pid'][i])
+        name = 'renomeado' if i % 17 == 0 else last.text('name', i)
+        builder.add(pid, name, float(last.columns['cpu'][i]), float(last.columns['mem_pct'][i]),
+                    int(last.columns['rss'][i]), int(last.columns['threads'][i]), 'S', 'root')
+    stores.append(builder.build())
+
+    encoder, decoder = wire.ProcessEncoder(keyframe_interval=15), wire.ProcessDecoder()
+    kinds = set()
+    for store in stores:
+        rows = store.top_k(50, 'cpu')
+        payload = encoder.encode(store, rows)
+        kinds.add(payload[0])
+        pids, columns, names = decoder.decode(payload)
+        order = np.asarray(rows)[np.argsort(store.columns['pid'][rows], kind='stable')]
+        expect(np.array_equal(pids, store.columns['pid'][order]), "PIDs")
+        expect(names == [store.text('name', i) for i in order.tolist()], "nomes")
+        for key, scale in wire.PROCESS_SCALES:
+            expect(close_to(columns[key], store.columns[key][order], scale), f"coluna {key}")
+    expect(kinds == {wire.PROCESSES, wire.PROCESS_DELTA}, "PROCESSES e PROCESS_DELTAs")
+
+
+def check_round_trip():
+    """Levanta AssertionError se alguma ida e volta do protocolo não reproduzir a entrada"""
+    check_varints()
+    check_samples()
+    check_processes()
+
+
+def best_per_frame(fn, items, rounds):
+    """Menor tempo médio por item entre `rounds` passadas"""
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn(items)
+        best = min(best, (time.perf_counter() - start) / len(items))
+    return best
+
+
+def bench_samples(cores, count, rounds):
+    samples = synthetic_samples(cores, count)
+    encoder = wire.SampleEncoder()
+    frames = [encoder.encode(ts, metrics) for ts, metrics in samples]
+    keyframes = [len(f) for f in frames if f[0] == wire.KEYFRAME]
+    deltas = [len(f) for f in frames if f[0] == wire.DELTA]
+    json_size = np.mean([len(json.dumps({'type': 'metrics', 'ts': ts, 'data': m})) for ts, m in samples[:200]])
+
+    def encode_all(items):
+        encoder = wire.SampleEncoder()
+        for ts, metrics in items:
+            encoder.encode(ts, metrics)
+
+    def decode_all(items):
+        decoder = wire.SampleDecoder()
+        for payload in items:
+            decoder.decode(payload)
+
+    def json_all(items):
+        for ts, metrics in items:
+            json.dumps({'type': 'metrics', 'ts': ts, 'data': metrics})
+
+    encode = best_per_frame(encode_all, samples, rounds)
+    decode = best_per_frame(decode_all, frames, rounds)
+    json_time = best_per_frame(json_all, samples, rounds)
+    average = sum(map(len, frames)) / len(frames)
+    print(f"{cores:>7} {json_size:>10.0f} {np.mean(keyframes):>10.0f} {np.mean(deltas):>8.1f} {average:>8.1f} "
+          f"{json_size / average:>7.1f}x {encode * 1e6:>10.1f} {decode * 1e6:>10.1f} {json_time * 1e6:>10.1f}")
+
+
+def bench_processes(count, limit, snapshots, rounds):
+    stores = synthetic_stores(count, snapshots)
+    tops = [(store, store.top_k(limit, 'cpu')) for store in stores]
+    encoder = wire.ProcessEncoder()
+    frames = [encoder.encode(store, rows) for store, rows in tops]
+    keyframes = [len(f) for f in frames if f[0] == wire.PROCESSES]
+    deltas = [len(f) for f in frames if f[0] == wire.PROCESS_DELTA]
+
+    def encode_all(items):
+        encoder = wire.ProcessEncoder()
+        for store, rows in items:
+            encoder.encode(store, rows)
+
+    def decode_all(items):
+        decoder = wire.ProcessDecoder()
+        for payload in items:
+            decoder.decode(payload)
+
+    encode = best_per_frame(encode_all, tops, rounds)
+    decode = best_per_frame(decode_all, frames, rounds)
+    print(f"{limit:>7} {np.mean(keyframes):>10.0f} {np.mean(deltas):>8.1f} "
+          f"{sum(map(len, frames)) / len(frames):>8.1f} {encode * 1e6:>10.1f} {decode * 1e6:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cores', type=int, nargs='+', default=[16, 128, 256])
+    parser.add_argument('--samples', type=int, default=3000)
+    parser.add_argument('--processes', type=int, default=300)
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--check', action='store_true', help="Só confere a ida e volta, sem medir")
+    args = parser.parse_args()
+
+    check_round_trip()
+    print("Ida e volta conferida (amostras, varints e processos)")
+    if args.check:
+        return 0
+
+    print(f"Amostras (KEYFRAME a cada {wire.KEYFRAME_INTERVAL}; bytes sem o prefixo de tamanho)")
+    print(f"{'núcleos':>7} {'JSON (B)':>10} {'keyframe':>10} {'delta':>8} {'média':>8} {'redução':>8} "
+          f"{'cod. µs':>10} {'decod. µs':>10} {'JSON µs':>10}")
+    for cores in args.cores:
+        bench_samples(cores, args.samples, args.rounds)
+
+    print(f"\nProcessos (de {args.processes}, os N de maior CPU por varredura)")
+    print(f"{'N':>7} {'keyframe':>10} {'delta':>8} {'média':>8} {'cod. µs':>10} {'decod. µs':>10}")
+    for limit in (50, args.processes):
+        bench_processes(args.processes, limit, 300, args.rounds)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
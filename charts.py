@@ -0,0 +1,153 @@
+import math
+
+import numpy as np
+
+
+class BlitManager:
+    """Redesenha só os artistas animados sobre um fundo em cache (blitting).
+
+    Eixos, ticks, títulos, grades e legendas ficam no fundo capturado a cada
+    desenho completo (evento 'draw_event'). Um tick comum restaura o fundo,
+    desenha as linhas e faz blit; o desenho completo só acontece quando o
+    fundo é invalidado (limites, tamanho da janela, tema).
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.figure = canvas.figure
+        self.artists = []
+        self.background = None
+        self._limits = {}
+        canvas.mpl_connect('draw_event', self.on_draw)
+
+    def add(self, artist):
+        """Registra um artista atualizado a cada tick"""
+        artist.set_animated(True)
+        self.artists.append(artist)
+        return artist
+
+    def remove(self, artist):
+        if artist in self.artists:
+            self.artists.remove(artist)
+        artist.remove()
+
+    def on_draw(self, event):
+        # Desenho completo: captura o fundo e desenha as linhas por cima
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_artists()
+
+    def _draw_artists(self):
+        for artist in self.artists:
+            self.figure.draw_artist(artist)
+
+    def invalidate(self):
+        """Força um desenho completo no próximo update"""
+        self.background = None
+
+    def set_xlim(self, ax, low, high):
+        self._set_limits(ax, 'x', low, high)
+
+    def set_ylim(self, ax, low, high):
+        self._set_limits(ax, 'y', low, high)
+
+    def _set_limits(self, ax, axis, low, high):
+        key = (id(ax), axis)
+        if self._limits.get(key) != (low, high):
+            self._limits[key] = (low, high)
+            (ax.set_xlim if axis == 'x' else ax.set_ylim)(low, high)
+            self.invalidate()
+
+    def autoscale_y(self, ax, peak, floor=100):
+        """Ajusta o topo do eixo y com histerese: só muda se o pico sair de [topo/4, topo]"""
+        key = (id(ax), 'y')
+        current = self._limits.get(key, (0, 0))[1]
+        if current and current / 4 <= peak <= current:
+            return
+        self.set_ylim(ax, 0, nice_ceiling(max(floor, peak * 1.2)))
+
+    def set_line_data(self, line, x, y):
+        """set_data com a série reduzida a ~2 pontos por pixel de largura do eixo"""
+        line.set_data(*decimate_minmax(x, y, pixel_width(line.axes)))
+
+    def update(self):
+        if self.background is None:
+            # draw() dispara o draw_event, que recaptura o fundo
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self.background)
+        self._draw_artists()
+        self.canvas.blit(self.figure.bbox)
+
+
+def nice_ceiling(value):
+    """Arredonda para cima em 1, 2, 5 x 10^n (limites estáveis, menos redesenhos)"""
+    if value <= 0:
+        return 1
+    exponent = 10 ** math.floor(math.log10(value))
+    for step in (1, 2, 5, 10):
+        if value <= step * exponent:
+            return step * exponent
+    return 10 * exponent
+
+
+def pixel_width(ax):
+    """Largura do eixo em pixels (mínimo de 1)"""
+    return max(int(ax.bbox.width), 1)
+
+
+def _bucket_indices(n, buckets):
+    """Índices (buckets, tamanho) que dividem n amostras em baldes consecutivos de mesmo tamanho.
+
+    O início é preenchido repetindo a amostra 0, assim os baldes terminam
+    sempre na amostra mais recente e ficam estáveis de um tick para o outro.
+    """
+    size = -(-n // buckets)
+    count = -(-n // size)
+    return np.maximum(np.arange(count * size) - (count * size - n), 0).reshape(count, size)
+
+
+def decimate_minmax(x, y, buckets):
+    """Reduz a série a no máximo 2 pontos (mínimo e máximo) por balde, preservando picos.
+
+    Cada balde contribui com o mínimo e o máximo na ordem em que ocorreram,
+    então a linha desenhada passa pelos mesmos extremos da série completa.
+    """
+    n = len(y)
+    if n <= 2 * buckets:
+        return x, y
+    idx = _bucket_indices(n, buckets)
+    values = y[idx]
+    rows = np.arange(len(idx))
+    lo = idx[rows, values.argmin(axis=1)]
+    hi = idx[rows, values.argmax(axis=1)]
+    keep = np.column_stack((np.minimum(lo, hi), np.maximum(lo, hi))).ravel()
+    # A amostra mais recente sempre entra, para a linha chegar até "agora"
+    keep = np.append(keep, n - 1)
+    return x[keep], y[keep]
+
+
+def decimate_band(x, low, high, buckets):
+    """Reduz uma faixa min/max a um ponto por balde (mínimo dos mínimos, máximo dos máximos)"""
+    n = len(x)
+    if n <= buckets:
+        return x, low, high
+    idx = _bucket_indices(n, buckets)
+    return x[idx[:, -1]], low[idx].min(axis=1), high[idx].max(axis=1)
+
+
+def channel_median(data):
+    """Mediana entre os canais (linhas) de cada coluna de uma matriz canais x tempo, ignorando NaN"""
+    ordered = np.sort(data, axis=0)  # NaN vão para o fim
+    count = np.count_nonzero(~np.isnan(data), axis=0)
+    columns = np.arange(data.shape[1])
+    # Coluna sem nenhum valor: os dois índices são 0, um NaN
+    return (ordered[np.maximum(count - 1, 0) // 2, columns] + ordered[count // 2, columns]) / 2
+
+
+def decimate_columns(data, buckets):
+    """Reduz as colunas (tempo) de uma matriz canais x tempo pelo máximo de cada balde"""
+    n = data.shape[-1]
+    if n <= buckets:
+        return data
+    idx = _bucket_indices(n, buckets)
+    return data[:, idx].max(axis=2)
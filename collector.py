@@ -0,0 +1,626 @@
+import json
+import asyncio
+import platform
+import signal
+import socket
+import sys
+import time
+from datetime import datetime
+from types import MappingProxyType
+
+import numpy as np
+import psutil
+
+from alerts import AlertEngine, DEFAULT_RULES
+from anomaly import AnomalyDetector
+from cpufreq import CpuFreqReader
+from history import CORE_TIERS, TieredHistory
+from process_table import ProcessStore, ProcessStoreBuilder
+
+# Limites do intervalo de coleta (segundos)
+MIN_INTERVAL = 0.1
+MAX_INTERVAL = 10.0
+DEFAULT_INTERVAL = 1.0
+
+# Fontes que podem ser antecipadas com SystemCollector.refresh
+REFRESH_SOURCES = ('processes', 'system', 'energy')
+
+# Threads do pool das fontes lentas (processos, informações do sistema, sensores, disco)
+SLOW_WORKERS = 3
+
+
+class CpuSampler:
+    """Uso de CPU total e por núcleo a partir de um único snapshot de cpu_times por tick.
+
+    Não bloqueia: cada chamada compara o snapshot atual com o anterior, então
+    total e núcleos usam exatamente a mesma janela de medição.
+    """
+
+    def __init__(self):
+        fields = psutil.cpu_times(percpu=True)[0]._fields
+        # Mesmo critério do psutil: guest/guest_nice já estão contidos em user/nice
+        self._total_mask = np.array([f not in ('guest', 'guest_nice') for f in fields])
+        self._idle_mask = np.array([f in ('idle', 'iowait') for f in fields])
+        self._last = self._read()
+
+    def _read(self):
+        return np.array(psutil.cpu_times(percpu=True), dtype=np.float64)
+
+    def sample(self):
+        """Retorna (uso total %, array com uso % por núcleo) desde a última chamada"""
+        current = self._read()
+        delta = current - self._last
+        self._last = current
+
+        total = delta[:, self._total_mask].sum(axis=1)
+        busy = total - delta[:, self._idle_mask].sum(axis=1)
+        np.clip(busy, 0, None, out=busy)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cores = np.where(total > 0, busy / total * 100, 0.0)
+        total_sum = total.sum()
+        cpu = float(busy.sum() / total_sum * 100) if total_sum > 0 else 0.0
+        return round(min(cpu, 100.0), 1), np.clip(cores, 0, 100)
+
+
+class ProcessCache:
+    """Objetos psutil.Process mantidos entre coletas, indexados por PID.
+
+    cpu_percent só tem significado a partir da segunda leitura do mesmo objeto,
+    então manter os objetos (e prepará-los na inicialização) evita o 0% da
+    primeira coleta. Reuso de PID é detectado pelo create_time e processos
+    encerrados são descartados a cada varredura.
+    """
+
+    def __init__(self):
+        self.procs = {}
+        self.usernames = {}
+        # Em POSIX o uid vem do mesmo oneshot e o nome é resolvido por cache
+        self.user_attr = 'uids' if hasattr(psutil.Process, 'uids') else 'username'
+        self.attrs = ['name', 'cpu_percent', 'memory_info', 'num_threads', 'status', self.user_attr]
+
+    def _track(self, pid):
+        proc = psutil.Process(pid)
+        proc.cpu_percent(None)  # primeira leitura só inicia o delta
+        self.procs[pid] = proc
+        return proc
+
+    def prime(self):
+        """Registra todos os processos atuais para que a primeira coleta já tenha CPU%"""
+        for pid in psutil.pids():
+            try:
+                self._track(pid)
+            except psutil.Error:
+                continue
+
+    def _username(self, info):
+        value = info.get(self.user_attr)
+        if self.user_attr == 'username':
+            return value or 'N/A'
+        if value is None:
+            return 'N/A'
+        uid = value.real
+        name = self.usernames.get(uid)
+        if name is None:
+            try:
+                import pwd
+                name = pwd.getpwuid(uid).pw_name
+            except (ImportError, KeyError):
+                name = str(uid)
+            self.usernames[uid] = name
+        return name
+
+    def scan(self):
+        """Gera (pid, nome, cpu%, rss, threads, status, usuário), lendo tudo em um oneshot"""
+        pids = psutil.pids()
+        alive = set(pids)
+        for pid in [pid for pid in self.procs if pid not in alive]:
+            del self.procs[pid]
+
+        for pid in pids:
+            if pid == 0:
+                continue
+            try:
+                proc = self.procs.get(pid)
+                info = None
+                if proc is not None:
+                    with proc.oneshot():
+                        # is_running compara o create_time e detecta PID reutilizado
+                        if proc.is_running():
+                            info = proc.as_dict(attrs=self.attrs, ad_value=None)
+                if info is None:
+                    proc = self._track(pid)
+                    info = proc.as_dict(attrs=self.attrs, ad_value=None)
+                mem = info['memory_info']
+                yield (pid, info['name'], info['cpu_percent'] or 0, mem.rss if mem else 0,
+                       info['num_threads'] or 0, info['status'] or '', self._username(info))
+            except psutil.NoSuchProcess:
+                self.procs.pop(pid, None)
+            except psutil.Error:
+                continue
+
+
+def make_process_backend(name='auto'):
+    """Cria o backend de coleta de processos: 'procfs' (Linux), 'psutil' ou 'auto'"""
+    if name in ('auto', 'procfs'):
+        import procfs
+        if sys.platform.startswith('linux') and procfs.is_supported():
+            return procfs.ProcFSBackend()
+        if name == 'procfs':
+            print("Backend procfs indisponível; usando psutil", file=sys.stderr)
+    return ProcessCache()
+
+
+class Snapshot:
+    """Estado publicado pelo coletor ao fim de cada ciclo, para leitura em outras threads.
+
+    A publicação é só a troca de uma referência (`collector.snapshot`), então
+    quem lê nunca vê um ciclo pela metade. Métricas e energia são mapeamentos
+    somente leitura, o ProcessStore não é alterado depois de construído e os
+    históricos são lidos por cópias consistentes (`TieredHistory.read`).
+    `anomalies` é a tupla de anomalias recentes (ver anomaly.AnomalyDetector).
+    """
+
+    __slots__ = ('seq', 'time', 'metrics', 'processes', 'energy', 'histories', 'anomalies')
+
+    def __init__(self, seq, time_, metrics, processes, energy, histories, anomalies=()):
+        self.seq = seq
+        self.time = time_
+        self.metrics = MappingProxyType(dict(metrics))
+        self.processes = processes
+        self.energy = MappingProxyType(dict(energy))
+        self.histories = histories
+        self.anomalies = anomalies
+
+    @property
+    def core_count(self):
+        return self.histories['cpu_cores'].channels
+
+    def has(self, key):
+        """Se o histórico `key` existe (ex.: 'cpu_freq' só com leitura de frequência disponível)"""
+        return key in self.histories
+
+    def window(self, key, seconds, now=None):
+        """Janela copiada do histórico `key` (ver SystemCollector.histories)"""
+        return self.histories[key].read(seconds, now)
+
+    def last(self, key, count):
+        """Últimas `count` amostras brutas do histórico `key`"""
+        return self.histories[key].read_last(count)
+
+    def period(self, key, seconds, now=None):
+        """Resolução (s) do nível de retenção usado para exibir `seconds` do histórico `key`"""
+        return self.histories[key].tier_for(seconds, now).period
+
+
+class Source:
+    """Uma fonte de dados com intervalo próprio.
+
+    `collect()` só lê o sistema e devolve o resultado; `apply(result, now)`
+    grava cache e históricos e emite, sempre no event loop do serviço (único
+    escritor, ver service.CollectorService). Fontes lentas rodam `collect` no
+    pool limitado: passando do `deadline`, o resultado é descartado e a fonte
+    só volta a ser lida quando a leitura travada terminar.
+    """
+
+    def __init__(self, name, collect, apply, interval, slow=False, deadline=None):
+        self.name = name
+        self.collect = collect
+        self.apply = apply
+        self.interval = interval
+        self.slow = slow
+        self.deadline = deadline
+        self.due = 0.0       # relógio monotônico
+        # Estatísticas
+        self.runs = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.duration = 0.0
+
+    def timed_collect(self):
+        start = time.perf_counter()
+        try:
+            return self.collect()
+        finally:
+            self.duration = time.perf_counter() - start
+
+
+# Coleta de dados do sistema, sem nenhuma dependência de Tk ou Matplotlib.
+# Usada tanto pela interface gráfica quanto pelo modo headless (servidores sem display).
+class SystemCollector:
+    def __init__(self, emit=None, interval=DEFAULT_INTERVAL, process_backend='auto', workers=SLOW_WORKERS,
+                 record=None, record_processes=0, exporter=None, exporter_top=10, agent=None, aggregate=None,
+                 alerts=None):
+        # emit(dtype, data) recebe cada amostra produzida ('metrics', 'processes', 'sys_info', 'energy')
+        self.emit = emit or (lambda dtype, data: None)
+        self.interval = min(max(interval, MIN_INTERVAL), MAX_INTERVAL)
+        self.is_running = True
+        # Segundos de dados por segundo real (só a reprodução acelera, ver replay.py)
+        self.speed = 1.0
+        # Leituras lentas (varredura de processos, DNS, sensores) usam um pool de `workers` threads
+        self.workers = workers
+        self.service = None
+
+        # Cache de dados
+        self.cache = {
+            'cpu': 0, 'memory': 0, 'disk': 0, 'network': 0,
+            'process_count': 0, 'processes': ProcessStore.empty(),
+            'cpu_history': TieredHistory(),
+            'memory_history': TieredHistory(),
+            'disk_history': TieredHistory(),
+            'network_history': TieredHistory(),
+            'process_count_history': TieredHistory(),
+            'cpu_cores': None,
+            'cores': None,
+            'cpu_freq': None,
+            'freqs': None,
+            'disk_io': {'read': TieredHistory(), 'write': TieredHistory()},
+            'network_io': {'sent': TieredHistory(), 'recv': TieredHistory()},
+            'io_rates': (0.0, 0.0, 0.0, 0.0),
+            'temperature_history': TieredHistory(),
+            'metrics': {},
+            'energy': {},
+            'memory_total_gb': 0,
+            'memory_used_gb': 0,
+            'memory_available_gb': 0,
+            'disk_total_gb': 0,
+            'disk_used_gb': 0,
+            'disk_free_gb': 0,
+            'memory_standby': 0,
+            'cache_size': 0,
+            'cpu_temperatures': [],
+            'battery_info': {}
+        }
+
+        self.initialize_cpu_cores()
+
+        self.cpu_sampler = CpuSampler()
+        self.freq_reader = CpuFreqReader(self.cache['cpu_cores'].channels)
+        self.process_builder = ProcessStoreBuilder()
+        self.process_cache = make_process_backend(process_backend)
+        self.process_cache.prime()
+        self.last_io = self.read_io_counters()
+
+        # Uma fonte por métrica, cada uma com seu intervalo
+        self.sources = {source.name: source for source in (
+            Source('cpu', self.cpu_sampler.sample, self.apply_cpu, self.interval),
+            Source('memory', psutil.virtual_memory, self.apply_memory, self.interval),
+            Source('io', self.read_io_counters, self.apply_io, self.interval),
+            Source('disk', lambda: psutil.disk_usage('/'), self.apply_disk, max(self.interval, 5),
+                   slow=True, deadline=2),
+            Source('processes', self._scan_processes, self.apply_processes, 3, slow=True, deadline=10),
+            Source('system', self.read_system_info, self.apply_system_info, 10, slow=True, deadline=5),
+            Source('energy', self.read_energy, self.apply_energy, 30, slow=True, deadline=5),
+        )}
+        # Frequência por núcleo só se alguma fonte (sysfs ou psutil) informar ao menos um canal
+        if self.freq_reader.channels:
+            self.sources['freq'] = Source('freq', self.freq_reader.read, self.apply_freq, self.interval)
+        # Primeira varredura ~1s após o preparo, para o delta de CPU ter resolução suficiente
+        self.sources['processes'].due = time.monotonic() + 1
+        # Disco, memória e frequência já disponíveis para a primeira amostra (o IO parte de
+        # last_io, lido acima: a primeira taxa cobre o intervalo desde o preparo)
+        for name in ('disk', 'memory', 'freq'):
+            if name in self.sources:
+                self.collect(name)
+
+        # Históricos por nome (todos gravados só pela thread do coletor)
+        cache = self.cache
+        self.histories = {
+            key: cache[key] for key in ('cpu_history', 'memory_history', 'disk_history', 'network_history',
+                                        'process_count_history', 'cpu_cores', 'temperature_history')
+        }
+        if self.freq_reader.channels:
+            # Frequência real por núcleo (MHz), mesma retenção dos núcleos
+            cache['cpu_freq'] = self.histories['cpu_freq'] = TieredHistory(
+                CORE_TIERS, channels=self.freq_reader.channels, dtype=np.float32)
+        self.histories.update(disk_read=cache['disk_io']['read'], disk_write=cache['disk_io']['write'],
+                              net_sent=cache['network_io']['sent'], net_recv=cache['network_io']['recv'])
+        # Anomalias sobre CPU, memória, IO e núcleos, sem limites fixos (ver anomaly.py)
+        self.anomalies = AnomalyDetector(cache['cpu_cores'].channels)
+        self.snapshot = None
+        self.publish(time.time())
+
+        # Gravação em disco opcional (arquivo binário append-only, ver recorder.py)
+        self.recorder = None
+        if record:
+            from recorder import METRIC_CHANNELS, Recorder
+            core_count = self.cache['cpu_cores'].channels
+            channels = METRIC_CHANNELS + tuple(f'core{i}' for i in range(core_count))
+            self.recorder = Recorder(record, channels, interval=self.interval, process_limit=record_processes)
+            print(f"Gravando em {self.recorder.path}", file=sys.stderr)
+
+        # Regras de alerta (ver alerts.py) avaliadas a cada amostra; eventos saem como 'alerts'
+        self.alert_rules = DEFAULT_RULES if alerts is None else alerts
+        self.alerts = AlertEngine(self.alert_rules)
+
+        # Exportador OpenMetrics opcional: (host, porta), servido pelo mesmo event loop
+        self.exporter = None
+        if exporter:
+            from exporter import MetricsExporter
+            self.exporter = MetricsExporter(*exporter, top_n=exporter_top)
+
+        # Modo frota (ver fleet.py): `agent` envia as amostras a um agregador, `aggregate`
+        # recebe as de outros hosts; endereços (host, porta) ou caminho de socket Unix
+        self.agent = self.fleet = None
+        if agent or aggregate:
+            from fleet import FleetAgent, FleetAggregator
+            if agent:
+                self.agent = FleetAgent(agent, interval=self.interval)
+            if aggregate:
+                self.fleet = FleetAggregator(aggregate, rules=self.alert_rules)
+
+    def initialize_cpu_cores(self):
+        core_count = psutil.cpu_count()
+        # Um único histórico 2-D (núcleos x tempo) atualizado com uma escrita por amostra
+        self.cache['cpu_cores'] = TieredHistory(CORE_TIERS, channels=core_count, dtype=np.float32)
+
+    # ====== SERVIÇO DE COLETA ======
+
+    def run(self):
+        """Executa o serviço assíncrono de coleta até stop(), bloqueando a thread atual"""
+        from service import CollectorService
+        self.service = CollectorService(self, slow_workers=self.workers)
+        extras = [extra.serve for extra in (self.exporter, self.agent, self.fleet) if extra is not None]
+        try:
+            if self.is_running:
+                asyncio.run(self.service.run(*extras))
+        finally:
+            self.freq_reader.close()
+            if self.recorder is not None:
+                self.recorder.close()
+
+    def stop(self):
+        self.is_running = False
+        if self.service is not None:
+            self.service.stop()
+
+    def refresh(self, *kinds):
+        """Pede uma coleta imediata de 'processes', 'system' e/ou 'energy' (todas por padrão)"""
+        if self.service is not None:
+            self.service.refresh(*(kinds or REFRESH_SOURCES))
+
+    def now(self):
+        """Relógio dos dados (ao vivo, o relógio do sistema)"""
+        return time.time()
+
+    def collect(self, name):
+        """Coleta e aplica a fonte `name` na thread atual (fora do laço: inicialização, testes)"""
+        source = self.sources[name]
+        source.apply(source.timed_collect(), time.time())
+
+    def publish(self, now):
+        """Publica o estado atual trocando a referência de `snapshot` (sem locks para o leitor)"""
+        previous = self.snapshot
+        self.snapshot = Snapshot((previous.seq + 1) if previous else 0, now, self.cache['metrics'],
+                                 self.cache['processes'], self.cache['energy'], self.histories,
+                                 self.anomalies.events)
+
+    def source_stats(self):
+        """Execuções, prazos estourados, erros e duração da última leitura de cada fonte"""
+        return [{'name': source.name, 'interval': source.interval, 'slow': source.slow,
+                 'runs': source.runs, 'timeouts': source.timeouts, 'errors': source.errors,
+                 'duration_ms': source.duration * 1000}
+                for source in self.sources.values()]
+
+    # ====== FONTES ======
+
+    def apply_cpu(self, sample, now):
+        # CPU total e núcleos do mesmo snapshot de cpu_times, sem bloquear
+        self.cache['cpu'], self.cache['cores'] = sample
+
+    def apply_freq(self, freqs, now):
+        self.cache['freqs'] = freqs
+
+    def apply_memory(self, mem, now):
+        self.cache['memory'] = mem.percent
+        self.cache['memory_total_gb'] = mem.total / (1024 ** 3)
+        self.cache['memory_used_gb'] = mem.used / (1024 ** 3)
+        self.cache['memory_available_gb'] = mem.available / (1024 ** 3)
+
+    def apply_disk(self, disk, now):
+        self.cache['disk'] = disk.percent
+        self.cache['disk_total_gb'] = disk.total / (1024 ** 3)
+        self.cache['disk_used_gb'] = disk.used / (1024 ** 3)
+        self.cache['disk_free_gb'] = disk.free / (1024 ** 3)
+
+    def read_io_counters(self):
+        return psutil.net_io_counters(), psutil.disk_io_counters(), time.monotonic()
+
+    def apply_io(self, counters, now):
+        # Taxas de IO normalizadas por segundo, independentes do intervalo de coleta
+        curr_net, curr_disk, sampled_at = counters
+        last_net, last_disk, last_time = self.last_io
+        elapsed = max(sampled_at - last_time, 1e-3)
+        self.last_io = counters
+
+        net_sent = (curr_net.bytes_sent - last_net.bytes_sent) / 1024 / elapsed
+        net_recv = (curr_net.bytes_recv - last_net.bytes_recv) / 1024 / elapsed
+        disk_read = (curr_disk.read_bytes - last_disk.read_bytes) / 1024 / elapsed if last_disk else 0
+        disk_write = (curr_disk.write_bytes - last_disk.write_bytes) / 1024 / elapsed if last_disk else 0
+        self.cache['io_rates'] = (disk_read, disk_write, net_sent, net_recv)
+        self.cache['network'] = net_sent + net_recv
+
+    def record_metrics(self, now):
+        """Grava os valores mais recentes de cada fonte nos históricos e emite 'metrics'"""
+        cache = self.cache
+        cpu, cores = cache['cpu'], cache['cores']
+        disk_read, disk_write, net_sent, net_recv = cache['io_rates']
+
+        # Atualiza históricos
+        cache['cpu_history'].append(cpu, now)
+        cache['memory_history'].append(cache['memory'], now)
+        cache['disk_history'].append(cache['disk'], now)
+        cache['network_history'].append(net_sent + net_recv, now)
+
+        cache['disk_io']['read'].append(disk_read, now)
+        cache['disk_io']['write'].append(disk_write, now)
+        cache['network_io']['sent'].append(net_sent, now)
+        cache['network_io']['recv'].append(net_recv, now)
+
+        cache['cpu_cores'].append(cores, now)
+        if cache['freqs'] is not None and cache['cpu_freq'] is not None:
+            cache['cpu_freq'].append(cache['freqs'], now)
+
+        metrics = {
+            'cpu': cpu, 'memory': cache['memory'], 'disk': cache['disk'],
+            'network': net_sent + net_recv, 'cores': cores.tolist(),
+            'memory_used_gb': cache['memory_used_gb'],
+            'memory_total_gb': cache['memory_total_gb'],
+            'disk_used_gb': cache['disk_used_gb'],
+            'disk_total_gb': cache['disk_total_gb'],
+            'disk_read': disk_read, 'disk_write': disk_write,
+            'net_sent': net_sent, 'net_recv': net_recv
+        }
+        cache['metrics'] = metrics
+        # Amostra completa para gravação e alertas: contagem de processos e temperatura (NaN se não houver)
+        cpu_temp = cache['energy'].get('cpu_temp')
+        sample = dict(metrics, process_count=len(cache['processes']),
+                      cpu_temp=np.nan if cpu_temp is None else cpu_temp)
+        if self.recorder is not None:
+            self.recorder.append_metrics(now, sample, cores)
+        self.emit('metrics', metrics)
+        self.anomalies.observe(now, metrics)
+        events = self.alerts.observe_metrics(now, sample)
+        if events:
+            self.emit('alerts', self.alerts.message(events))
+        return metrics
+
+    def apply_processes(self, store, now):
+        # Conjunto completo (sem corte): a interface virtualiza a exibição
+        self.cache['processes'] = store
+        self.cache['process_count_history'].append(len(store), now)
+        if self.recorder is not None:
+            self.recorder.append_processes(now, store)
+        self.emit('processes', store)
+        events = self.alerts.observe_processes(now, store)
+        if events:
+            self.emit('alerts', self.alerts.message(events))
+
+    def _scan_processes(self):
+        builder = self.process_builder
+        cache = self.process_cache
+        cpu_count = psutil.cpu_count(logical=True)
+        total_mem = psutil.virtual_memory().total
+
+        # Pega as variaveis para ser exibida no gerenciador
+        for pid, name, raw_cpu, rss, threads, status, user in cache.scan():
+            normalized_cpu = raw_cpu / cpu_count
+            builder.add(pid, name, normalized_cpu, rss / total_mem * 100, rss, threads, status, user)
+
+        return builder.build()
+
+    def read_system_info(self):
+        # gethostbyname pode travar sem DNS: por isso roda no pool, com prazo
+        try:
+            boot = datetime.fromtimestamp(psutil.boot_time())
+            mem = psutil.virtual_memory()
+            disk = psutil.disk_usage('/')
+
+            info = f"""
+            SISTEMA OPERACIONAL
+            -------------------
+            OS: {platform.system()} {platform.release()}
+            Versão: {platform.version()}
+            Boot: {boot.strftime('%d/%m/%Y %H:%M:%S')}
+            Uptime: {datetime.now() - boot}
+
+            HARDWARE
+            --------
+            CPU: {psutil.cpu_count(logical=False)} Físicos / {psutil.cpu_count()} Lógicos
+            Freq: {psutil.cpu_freq().current:.0f}Mhz
+
+            MEMÓRIA RAM
+            -----------
+            Total: {mem.total / (1024 ** 3):.2f} GB
+            Usado: {mem.used / (1024 ** 3):.2f} GB
+            Disponível: {mem.available / (1024 ** 3):.2f} GB
+            Percentual: {mem.percent:.1f}%
+
+            ARMAZENAMENTO
+            -------------
+            Total: {disk.total / (1024 ** 3):.2f} GB
+            Usado: {disk.used / (1024 ** 3):.2f} GB
+            Livre: {disk.free / (1024 ** 3):.2f} GB
+            Percentual: {disk.percent:.1f}%
+
+            REDE
+            ----
+            Hostname: {socket.gethostname()}
+            IP Local: {socket.gethostbyname(socket.gethostname())}
+            """
+            return info
+        except Exception as e:
+            return f"Erro ao coletar informações: {e}"
+
+    def apply_system_info(self, info, now):
+        self.emit('sys_info', info)
+
+    def read_energy(self):
+        """Lê bateria e temperatura da CPU (sensores podem ser lentos: roda no pool)"""
+        energy = {'battery_api': hasattr(psutil, 'sensors_battery'), 'battery': None, 'cpu_temp': None}
+        battery = psutil.sensors_battery() if energy['battery_api'] else None
+        if battery:
+            energy['battery'] = {'percent': battery.percent, 'plugged': battery.power_plugged,
+                                 'secsleft': battery.secsleft}
+        temps = psutil.sensors_temperatures() if hasattr(psutil, 'sensors_temperatures') else {}
+        # Tentar obter temperatura da CPU
+        for sensor in ('coretemp', 'acpitz'):
+            if temps.get(sensor):
+                energy['cpu_temp'] = temps[sensor][0].current
+                break
+        return energy
+
+    def apply_energy(self, energy, now):
+        if energy['cpu_temp'] is not None:
+            self.cache['temperature_history'].append(energy['cpu_temp'], now)
+        self.cache['energy'] = energy
+        self.emit('energy', energy)
+
+
+# ====== MODO HEADLESS ======
+
+class JsonLinesSink:
+    """Grava cada amostra como uma linha JSON (stdout ou arquivo)"""
+
+    def __init__(self, stream, kinds=('metrics',)):
+        self.stream = stream
+        self.kinds = kinds
+
+    def __call__(self, dtype, data):
+        if dtype not in self.kinds:
+            return
+        if isinstance(data, ProcessStore):
+            data = data.to_records()
+        record = {'type': dtype, 'ts': time.time(), 'host': socket.gethostname(), 'data': data}
+        self.stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.stream.flush()
+
+
+def run_headless(args):
+    """Executa o coletor sem interface gráfica, gravando as amostras no destino escolhido"""
+    kinds = ['metrics', 'alerts']
+    if args.processes:
+        kinds.append('processes')
+    if args.sys_info:
+        kinds.append('sys_info')
+    if args.aggregate:
+        kinds.append('fleet')  # resumo da frota a cada segundo
+
+    # Sem --output, ou com '-', as linhas vão para o stdout (que nunca é fechado)
+    stream = open(args.output, 'a', encoding='utf-8') if args.output not in (None, '-') else sys.stdout
+    collector = SystemCollector(emit=JsonLinesSink(stream, tuple(kinds)), interval=args.interval,
+                                process_backend=args.process_backend, record=args.record,
+                                record_processes=args.record_processes, exporter=args.exporter,
+                                exporter_top=args.exporter_top, agent=args.agent, aggregate=args.aggregate,
+                                alerts=args.alerts)
+    # SIGTERM (ex.: serviço do systemd) encerra como o Ctrl+C, fechando a gravação
+    signal.signal(signal.SIGTERM, lambda signum, frame: collector.stop())
+    try:
+        collector.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        collector.stop()
+        if stream is not sys.stdout:
+            stream.close()
+    return 0
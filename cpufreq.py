@@ -0,0 +1,80 @@
+"""Frequência real de cada núcleo, lida a cada tick.
+
+No Linux lê cpu*/cpufreq/scaling_cur_freq (kHz) de todos os núcleos: os
+arquivos ficam abertos e cada tick faz só um os.pread por núcleo (o sysfs
+regera o valor a cada leitura no início do arquivo), sem abrir/fechar nem
+interpretar núcleo a núcleo; o texto de todos é convertido de uma vez pelo
+NumPy. Sem cpufreq no sysfs (outros sistemas, VMs) usa
+psutil.cpu_freq(percpu=True), uma única chamada por tick.
+"""
+import os
+
+import numpy as np
+import psutil
+
+# Bytes lidos por arquivo (o valor em kHz cabe com folga)
+READ_SIZE = 32
+
+
+class CpuFreqReader:
+    """Frequência (MHz) por núcleo; `channels` é 0 se nenhuma fonte estiver disponível"""
+
+    def __init__(self, core_count, root='/sys/devices/system'):
+        self.fds = []
+        self.max_mhz = 0.0
+        for cpu in range(core_count):
+            path = os.path.join(root, 'cpu', f'cpu{cpu}', 'cpufreq')
+            try:
+                fd = os.open(os.path.join(path, 'scaling_cur_freq'), os.O_RDONLY)
+            except OSError:
+                fd = None  # núcleo offline ou sem cpufreq: NaN
+            self.fds.append(fd)
+            try:
+                with open(os.path.join(path, 'cpuinfo_max_freq')) as f:
+                    self.max_mhz = max(self.max_mhz, int(f.read()) / 1000)
+            except (OSError, ValueError):
+                pass
+
+        if any(fd is not None for fd in self.fds):
+            self.read = self._read_sysfs
+            self.channels = core_count
+            return
+
+        self.close()
+        self.fds = []
+        self.read = self._read_psutil
+        try:
+            freqs = psutil.cpu_freq(percpu=True) or []
+        except (AttributeError, NotImplementedError, OSError):
+            freqs = []
+        # Em alguns sistemas o psutil só informa um valor para a CPU inteira
+        self.channels = len(freqs)
+        self.max_mhz = max((f.max for f in freqs), default=0.0)
+
+    def _read_sysfs(self):
+        chunks = []
+        for fd in self.fds:
+            try:
+                text = os.pread(fd, READ_SIZE, 0) if fd is not None else b''
+            except OSError:
+                text = b''
+            # Leitura vazia ou "<unknown>" vira NaN sem desalinhar os núcleos seguintes
+            chunks.append(text if text[:1].isdigit() else b'nan')
+        values = np.fromstring(b' '.join(chunks), dtype=np.float64, sep=' ')
+        return values / 1000
+
+    def _read_psutil(self):
+        try:
+            freqs = psutil.cpu_freq(percpu=True)
+        except (NotImplementedError, OSError):
+            freqs = None
+        if not freqs or len(freqs) != self.channels:
+            return np.full(self.channels, np.nan)
+        return np.array([f.current for f in freqs], dtype=np.float64)
+
+    def close(self):
+        """Fecha os arquivos do sysfs; leituras seguintes devolvem NaN"""
+        for fd in self.fds:
+            if fd is not None:
+                os.close(fd)
+        self.fds = [None] * len(self.fds)
@@ -0,0 +1,156 @@
+"""Exportador Prometheus/OpenMetrics embutido no serviço de coleta.
+
+O texto de /metrics é montado uma vez por amostra (mensagem 'metrics') e
+guardado já com o cabeçalho HTTP; cada scrape só escreve esses bytes no
+socket, então muitos scrapes simultâneos não refazem nenhum cálculo. As
+métricas por processo se limitam aos `top_n` de maior CPU para manter a
+cardinalidade (séries por PID) sob controle.
+"""
+import asyncio
+import socket
+import sys
+
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+DEFAULT_PORT = 9105
+DEFAULT_TOP = 10
+
+GB = 1024 ** 3
+KB = 1024
+
+# (nome, ajuda, chave da mensagem 'metrics', escala para unidades base)
+GAUGES = (
+    ('monitor_cpu_usage_percent', 'Uso total de CPU (%).', 'cpu', 1),
+    ('monitor_memory_usage_percent', 'Uso de memória (%).', 'memory', 1),
+    ('monitor_memory_used_bytes', 'Memória usada.', 'memory_used_gb', GB),
+    ('monitor_memory_total_bytes', 'Memória total.', 'memory_total_gb', GB),
+    ('monitor_disk_usage_percent', 'Uso do disco raiz (%).', 'disk', 1),
+    ('monitor_disk_used_bytes', 'Espaço usado no disco raiz.', 'disk_used_gb', GB),
+    ('monitor_disk_total_bytes', 'Tamanho do disco raiz.', 'disk_total_gb', GB),
+    ('monitor_disk_read_bytes_per_second', 'Taxa de leitura de disco.', 'disk_read', KB),
+    ('monitor_disk_write_bytes_per_second', 'Taxa de escrita em disco.', 'disk_write', KB),
+    ('monitor_network_sent_bytes_per_second', 'Taxa de envio de rede.', 'net_sent', KB),
+    ('monitor_network_received_bytes_per_second', 'Taxa de recebimento de rede.', 'net_recv', KB),
+)
+
+
+def escape_label(value):
+    """Escapa um valor de label (barra invertida, aspas e quebra de linha)"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_value(value):
+    value = float(value)
+    if value != value:
+        return 'NaN'
+    return repr(value)
+
+
+def render_metrics(metrics, labels=''):
+    """Linhas OpenMetrics das métricas do sistema e dos núcleos (mensagem 'metrics')"""
+    lines = []
+    for name, help_, key, scale in GAUGES:
+        if key in metrics:
+            lines += [f'# TYPE {name} gauge', f'# HELP {name} {help_}',
+                      f'{name}{{{labels}}} {format_value(metrics[key] * scale)}']
+    cores = metrics.get('cores') or ()
+    if len(cores):
+        name = 'monitor_cpu_core_usage_percent'
+        lines += [f'# TYPE {name} gauge', f'# HELP {name} Uso de CPU por núcleo (%).']
+        sep = ',' if labels else ''
+        lines += [f'{name}{{{labels}{sep}core="{i}"}} {format_value(value)}' for i, value in enumerate(cores)]
+    return lines
+
+
+def render_processes(store, top_n, labels=''):
+    """Linhas OpenMetrics da contagem de processos e dos `top_n` de maior CPU (um ProcessStore)"""
+    lines = ['# TYPE monitor_processes gauge', '# HELP monitor_processes Número de processos.',
+             f'monitor_processes{{{labels}}} {len(store)}']
+    if not top_n or not len(store):
+        return lines
+
+    rows = store.top_k(top_n, 'cpu')
+    columns = store.columns
+    sep = ',' if labels else ''
+    series = [f'{labels}{sep}pid="{int(columns["pid"][i])}",name="{escape_label(store.text("name", i))}"'
+              for i in rows]
+    for name, help_, values in (
+            ('monitor_process_cpu_percent', f'Uso de CPU dos {top_n} processos de maior CPU (%).', columns['cpu']),
+            ('monitor_process_resident_memory_bytes', 'Memória residente dos mesmos processos.', columns['rss']),
+            ('monitor_process_threads', 'Threads dos mesmos processos.', columns['threads'])):
+        lines += [f'# TYPE {name} gauge', f'# HELP {name} {help_}']
+        lines += [f'{name}{{{s}}} {format_value(values[i])}' for s, i in zip(series, rows)]
+    return lines
+
+
+class MetricsExporter:
+    """Servidor HTTP mínimo (asyncio) que responde GET /metrics com o texto pré-montado.
+
+    Roda como uma tarefa do CollectorService (`serve`), assinando as mensagens
+    do coletor com uma fila própria que descarta as mais antigas.
+    """
+
+    def __init__(self, host='127.0.0.1', port=DEFAULT_PORT, top_n=DEFAULT_TOP):
+        self.host = host
+        self.port = port
+        self.top_n = top_n
+        self.labels = f'host="{escape_label(socket.gethostname())}"'
+        self.scrapes = 0
+        self.renders = 0
+        self._process_lines = []
+        self._response = self._http(200, b'# EOF\n', CONTENT_TYPE)
+
+    @staticmethod
+    def _http(status, body, content_type='text/plain; charset=utf-8'):
+        reason = {200: 'OK', 404: 'Not Found', 405: 'Method Not Allowed'}[status]
+        header = (f'HTTP/1.1 {status} {reason}\r\nContent-Type: {content_type}\r\n'
+                  f'Content-Length: {len(body)}\r\nConnection: close\r\n\r\n')
+        return header.encode('ascii') + body
+
+    def render(self, metrics):
+        """Monta a resposta completa de /metrics para a amostra `metrics`"""
+        lines = render_metrics(metrics, self.labels) + self._process_lines
+        lines += ['# TYPE monitor_exporter_scrapes counter',
+                  '# HELP monitor_exporter_scrapes Scrapes atendidos por este exportador.',
+                  f'monitor_exporter_scrapes_total{{{self.labels}}} {self.scrapes}',
+                  '# EOF', '']
+        self._response = self._http(200, '\n'.join(lines).encode('utf-8'), CONTENT_TYPE)
+        self.renders += 1
+
+    async def serve(self, service):
+        """Atende scrapes e remonta o texto a cada amostra até o serviço parar"""
+        try:
+            server = await asyncio.start_server(self._handle, self.host, self.port)
+        except OSError as e:
+            print(f"Exportador não iniciado em {self.host}:{self.port}: {e}", file=sys.stderr)
+            return
+        print(f"Exportador OpenMetrics em http://{self.host}:{self.port}/metrics", file=sys.stderr)
+        messages = service.subscribe()
+        try:
+            while True:
+                dtype, data = await messages.get()
+                if dtype == 'processes':
+                    self._process_lines = render_processes(data, self.top_n, self.labels)
+                elif dtype == 'metrics':
+                    self.render(data)
+        finally:
+            service.unsubscribe(messages)
+            server.close()
+
+    async def _handle(self, reader, writer):
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), 5)
+            method, path = (request.split(b' ', 2) + [b'', b''])[:2]
+            if method != b'GET':
+                response = self._http(405, b'Somente GET\n')
+            elif path.split(b'?')[0] == b'/metrics':
+                self.scrapes += 1
+                response = self._response  # bytes imutáveis: sem cópia nem render por scrape
+            else:
+                response = self._http(404, b'Use /metrics\n')
+            writer.write(response)
+            await writer.drain()
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                ConnectionError):
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,279 @@
+"""Modo frota: agentes headless enviam amostras a um agregador central.
+
+O agente roda como tarefa extra do CollectorService e envia cada amostra
+(wire.SampleEncoder) e os AGENT_PROCESSES processos de maior CPU de cada
+varredura (wire.ProcessEncoder) por TCP ou socket Unix, reconectando
+sozinho. O agregador (também uma tarefa do serviço, no mesmo event loop)
+decodifica os quadros com um asyncio.Protocol por conexão e grava cada
+host em históricos próprios, publicados como collector.Snapshot, avaliando
+as mesmas regras de alerta e a mesma detecção de anomalias do coletor local. Uma vez por segundo emite
+('fleet', linhas) com o resumo de todos os hosts e os eventos de alerta
+('alerts') acumulados.
+"""
+import asyncio
+import socket
+import sys
+import time
+
+import numpy as np
+
+from alerts import AlertEngine, DEFAULT_RULES
+from anomaly import AnomalyDetector
+from collector import Snapshot
+from history import TieredHistory
+from process_table import ProcessStore, ProcessStoreBuilder
+import wire
+
+# Retenção por host remoto: 15 min de amostras e 24 h em rollups de 5 min, em float32;
+# núcleos só com as amostras brutas. ~0,35 MB por host de 16 núcleos
+FLEET_TIERS = ((1, 900), (300, 288))
+FLEET_CORE_TIERS = ((1, 300),)
+
+# Históricos mantidos por host (mesmas chaves de SystemCollector.histories) -> chave da amostra
+FLEET_HISTORIES = {
+    'cpu_history': 'cpu', 'memory_history': 'memory', 'disk_history': 'disk',
+    'network_history': 'network', 'process_count_history': 'process_count',
+    'disk_read': 'disk_read', 'disk_write': 'disk_write', 'net_sent': 'net_sent', 'net_recv': 'net_recv',
+}
+
+# Processos de maior CPU enviados pelo agente a cada varredura
+AGENT_PROCESSES = 50
+
+# Resumo da frota: intervalo das mensagens 'fleet'
+OVERVIEW_INTERVAL = 1.0
+
+# Espera entre tentativas de conexão do agente (dobra até o máximo)
+RECONNECT_MIN = 1.0
+RECONNECT_MAX = 30.0
+
+
+async def open_connection(address):
+    """`address` é (host, porta) para TCP ou um caminho (str) para socket Unix"""
+    if isinstance(address, str):
+        return await asyncio.open_unix_connection(address)
+    return await asyncio.open_connection(*address)
+
+
+def describe(address):
+    return f"unix:{address}" if isinstance(address, str) else f"{address[0]}:{address[1]}"
+
+
+class FleetAgent:
+    """Envia as amostras do coletor local para um agregador"""
+
+    def __init__(self, address, host=None, interval=1.0, process_limit=AGENT_PROCESSES):
+        self.address = address
+        self.host = host or socket.gethostname()
+        self.interval = interval
+        self.process_limit = process_limit
+        self.encoder = wire.SampleEncoder()
+        self.process_encoder = wire.ProcessEncoder()
+        self.sent = 0
+        self.bytes_sent = 0
+        self._process_count = 0
+
+    async def serve(self, service):
+        """Conecta, envia HELLO e as amostras; em caso de erro reconecta com espera crescente"""
+        messages = service.subscribe()
+        delay = RECONNECT_MIN
+        cores = service.collector.snapshot.core_count
+        try:
+            while True:
+                try:
+                    reader, writer = await open_connection(self.address)
+                except OSError as e:
+                    print(f"Agregador {describe(self.address)} indisponível ({e}); nova tentativa em {delay:.0f}s",
+                          file=sys.stderr)
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, RECONNECT_MAX)
+                    continue
+
+                delay = RECONNECT_MIN
+                self.encoder.reset()
+                self.process_encoder.reset()
+                try:
+                    writer.write(wire.frame(wire.hello(self.host, cores, self.interval, time.time())))
+                    while True:
+                        dtype, data = await messages.get()
+                        if dtype == 'processes':
+                            self._process_count = len(data)
+                            if not self.process_limit or not len(data):
+                                continue
+                            payload = wire.frame(self.process_encoder.encode(
+                                data, data.top_k(self.process_limit, 'cpu')))
+                        elif dtype == 'metrics':
+                            payload = wire.frame(self.encoder.encode(
+                                time.time(), dict(data, process_count=self._process_count)))
+                        else:
+                            continue
+                        writer.write(payload)
+                        self.sent += 1
+                        self.bytes_sent += len(payload)
+                        await writer.drain()
+                except (OSError, ConnectionError) as e:
+                    print(f"Conexão com o agregador perdida: {e}", file=sys.stderr)
+                finally:
+                    writer.close()
+        finally:
+            service.unsubscribe(messages)
+
+
+class FleetHost:
+    """Estado de um host remoto: históricos, última amostra e snapshot publicado"""
+
+    def __init__(self, name, cores, interval, rules=DEFAULT_RULES):
+        self.name = name
+        self.interval = interval
+        self.histories = {key: TieredHistory(FLEET_TIERS, dtype=np.float32) for key in FLEET_HISTORIES}
+        self.histories['cpu_cores'] = TieredHistory(FLEET_CORE_TIERS, channels=cores, dtype=np.float32)
+        self.metrics = {}
+        self.connected = False
+        self.address = ''
+        self.samples = 0
+        self.last_seen = 0.0
+        # Diferença entre o relógio do agregador e o do agente (medida no HELLO)
+        self.clock_offset = 0.0
+        self.process_builder = ProcessStoreBuilder()
+        self.alerts = AlertEngine(rules, host=name)
+        self.anomalies = AnomalyDetector(cores)
+        self.snapshot = Snapshot(0, 0.0, {}, ProcessStore.empty(), {}, self.histories)
+
+    def apply(self, ts, metrics):
+        """Grava uma amostra decodificada; devolve os eventos de alerta novos"""
+        ts += self.clock_offset
+        for key, field in FLEET_HISTORIES.items():
+            self.histories[key].append(metrics[field], ts)
+        self.histories['cpu_cores'].append(metrics['cores'], ts)
+        self.metrics = metrics
+        self.samples += 1
+        self.last_seen = time.time()
+        self.anomalies.observe(ts, metrics)
+        self.snapshot = Snapshot(self.snapshot.seq + 1, ts, metrics, self.snapshot.processes, {}, self.histories,
+                                 self.anomalies.events)
+        return self.alerts.observe_metrics(ts, metrics)
+
+    def apply_processes(self, pids, columns, names):
+        """Tabela de processos decodificada (status e usuário não são enviados); devolve os eventos de alerta"""
+        builder = self.process_builder
+        rows = zip(pids.tolist(), names, columns['cpu'].tolist(), columns['mem_pct'].tolist(),
+                   columns['rss'].tolist(), columns['threads'].tolist())
+        for pid, name, cpu, mem_pct, rss, threads in rows:
+            builder.add(pid, name, cpu, mem_pct, int(rss), int(threads), '-', '-')
+        snapshot = self.snapshot
+        self.snapshot = Snapshot(snapshot.seq + 1, snapshot.time, snapshot.metrics, builder.build(), {},
+                                 self.histories, snapshot.anomalies)
+        return self.alerts.observe_processes(time.time(), self.snapshot.processes)
+
+
+class FleetProtocol(asyncio.Protocol):
+    """Uma conexão de agente: junta os bytes recebidos em quadros e os decodifica"""
+
+    def __init__(self, aggregator):
+        self.aggregator = aggregator
+        self.buffer = bytearray()
+        self.decoder = wire.SampleDecoder()
+        self.process_decoder = wire.ProcessDecoder()
+        self.host = None
+        self.peer = ''
+
+    def connection_made(self, transport):
+        self.transport = transport
+        peer = transport.get_extra_info('peername')
+        self.peer = f"{peer[0]}:{peer[1]}" if isinstance(peer, tuple) else 'unix'
+
+    def data_received(self, data):
+        if self.transport.is_closing():
+            return
+        self.buffer += data
+        self.aggregator.bytes_received += len(data)
+        try:
+            # Quadros acima de wire.MAX_FRAME são recusados: o buffer da conexão nunca cresce sem limite
+            payloads, used = wire.split_frames(self.buffer)
+            del self.buffer[:used]
+            for payload in payloads:
+                if payload[0] == wire.HELLO:
+                    self.host = self.aggregator.register(wire.parse_hello(payload), self.peer)
+                elif self.host is None:
+                    continue
+                elif payload[0] in (wire.PROCESSES, wire.PROCESS_DELTA):
+                    table = self.process_decoder.decode(payload)
+                    if table is not None:
+                        self.aggregator.received(self.host, self.host.apply_processes(*table))
+                else:
+                    sample = self.decoder.decode(payload)
+                    if sample is not None:
+                        self.aggregator.received(self.host, self.host.apply(*sample))
+        except (ValueError, IndexError, KeyError) as e:
+            print(f"Quadro inválido de {self.peer}: {e}", file=sys.stderr)
+            self.buffer.clear()
+            self.transport.close()
+
+    def connection_lost(self, exc):
+        if self.host is not None:
+            self.host.connected = False
+
+
+class FleetAggregator:
+    """Recebe os agentes e mantém um FleetHost por host"""
+
+    def __init__(self, address, rules=DEFAULT_RULES):
+        self.address = address
+        self.rules = rules
+        self.hosts = {}
+        self.frames = 0
+        self.bytes_received = 0
+        self.alert_events = {}  # host -> eventos ainda não emitidos
+
+    def received(self, host, events):
+        self.frames += 1
+        if events:
+            self.alert_events.setdefault(host, []).extend(events)
+
+    def register(self, info, peer):
+        """HELLO de um agente: reaproveita o host (reconexão) ou cria um novo"""
+        name = str(info['host'])
+        host = self.hosts.get(name)
+        if host is not None and host.connected and host.address != peer:
+            # Mesmo nome vindo de outra conexão ativa: mantém os dois separados
+            name = f"{name} ({peer})"
+            host = self.hosts.get(name)
+        cores = int(info['cores'])
+        if host is None or host.histories['cpu_cores'].channels != cores:
+            host = self.hosts[name] = FleetHost(name, cores, info.get('interval', 1.0), self.rules)
+        host.connected = True
+        host.address = peer
+        host.clock_offset = time.time() - info.get('time', time.time())
+        return host
+
+    def overview(self):
+        """Uma linha por host: (nome, cpu, memória, disco, rede, núcleos, segundos sem dados, conectado)"""
+        now = time.time()
+        rows = []
+        for host in self.hosts.values():
+            m = host.metrics
+            rows.append((host.name, m.get('cpu', 0.0), m.get('memory', 0.0), m.get('disk', 0.0),
+                         m.get('network', 0.0), host.histories['cpu_cores'].channels,
+                         now - host.last_seen if host.samples else None, host.connected))
+        return rows
+
+    async def serve(self, service):
+        """Aceita agentes e emite o resumo da frota a cada OVERVIEW_INTERVAL"""
+        loop = asyncio.get_running_loop()
+        try:
+            if isinstance(self.address, str):
+                server = await loop.create_unix_server(lambda: FleetProtocol(self), self.address)
+            else:
+                server = await loop.create_server(lambda: FleetProtocol(self), *self.address)
+        except OSError as e:
+            print(f"Agregador não iniciado em {describe(self.address)}: {e}", file=sys.stderr)
+            return
+        print(f"Agregador da frota em {describe(self.address)}", file=sys.stderr)
+        try:
+            while True:
+                await asyncio.sleep(OVERVIEW_INTERVAL)
+                service.broadcast('fleet', self.overview())
+                pending, self.alert_events = self.alert_events, {}
+                for host, events in pending.items():
+                    service.broadcast('alerts', host.alerts.message(events))
+        finally:
+            server.close()
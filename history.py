@@ -0,0 +1,208 @@
+import time
+
+import numpy as np
+
+# Tamanho da janela de histórico (amostras) usada pelas séries de curto prazo
+HISTORY_SIZE = 60
+
+
+class RingBuffer:
+    """Histórico de tamanho fixo apoiado em um array NumPy pré-alocado.
+
+    Cada valor é gravado duas vezes (posição i e i + capacity), de modo que a
+    janela ordenada do mais antigo ao mais recente é sempre uma fatia contígua
+    do array, obtida sem cópia. Com ``channels`` o buffer guarda várias séries
+    alinhadas (ex.: um canal por núcleo) e cada append grava uma coluna inteira.
+    """
+
+    def __init__(self, capacity=60, channels=None, fill=0.0, dtype=np.float64):
+        if capacity <= 0:
+            raise ValueError("capacity deve ser maior que zero")
+        self.capacity = int(capacity)
+        self.channels = channels
+        shape = (2 * self.capacity,) if channels is None else (channels, 2 * self.capacity)
+        self._data = np.full(shape, fill, dtype=dtype)
+        self._index = 0  # próxima posição de escrita
+
+    def append(self, value):
+        """Grava uma amostra (escalar ou vetor com um valor por canal)"""
+        i = self._index
+        if self.channels is None:
+            self._data[i] = value
+            self._data[i + self.capacity] = value
+        else:
+            value = np.asarray(value, dtype=self._data.dtype)
+            n = min(len(value), self.channels)
+            self._data[:n, i] = value[:n]
+            self._data[:n, i + self.capacity] = value[:n]
+        self._index = (i + 1) % self.capacity
+
+    def view(self):
+        """Retorna a janela ordenada (mais antigo -> mais recente) sem cópia"""
+        start = self._index
+        return self._data[..., start:start + self.capacity]
+
+    def last(self):
+        """Último valor gravado"""
+        return self._data[..., self._index + self.capacity - 1]
+
+
+# Níveis de retenção padrão: (segundos por ponto, capacidade)
+# 1s por 15 min, rollups de 10s por 6 h e de 1 min por 7 dias
+DEFAULT_TIERS = ((1, 900), (10, 2160), (60, 10080))
+
+# Retenção por núcleo: mais curta e em float32 para limitar a memória em máquinas com muitos núcleos
+CORE_TIERS = ((1, 900), (10, 2160), (60, 1440))
+
+
+class HistoryWindow:
+    """Fatia de um nível de retenção: tempos, média, mínimo e máximo"""
+
+    __slots__ = ('times', 'mean', 'min', 'max', 'period')
+
+    def __init__(self, times, mean, min_, max_, period):
+        self.times = times
+        self.mean = mean
+        self.min = min_
+        self.max = max_
+        self.period = period
+
+    def copy(self):
+        """Cópia independente do buffer (no nível bruto min/max/média são o mesmo array)"""
+        mean = self.mean.copy()
+        min_ = mean if self.min is self.mean else self.min.copy()
+        max_ = mean if self.max is self.mean else self.max.copy()
+        return HistoryWindow(self.times.copy(), mean, min_, max_, self.period)
+
+
+class _Tier:
+    """Um nível de retenção; agrega as amostras recebidas em baldes de `period` segundos"""
+
+    def __init__(self, period, capacity, channels, dtype, raw=False):
+        self.period = period
+        self.capacity = capacity
+        self.raw = raw
+        self.times = RingBuffer(capacity)
+        self.mean = RingBuffer(capacity, channels, dtype=dtype)
+        # No nível bruto mínimo e máximo são a própria amostra
+        self.min = self.mean if raw else RingBuffer(capacity, channels, dtype=dtype)
+        self.max = self.mean if raw else RingBuffer(capacity, channels, dtype=dtype)
+        self._bucket = None
+        self._count = 0
+        self._sum = self._lo = self._hi = None
+
+    def add(self, value, ts):
+        if self.raw:
+            self.times.append(ts)
+            self.mean.append(value)
+            return
+
+        bucket = int(ts // self.period)
+        if self._count and bucket != self._bucket:
+            self.flush()
+
+        if not self._count:
+            self._bucket = bucket
+            self._sum = np.array(value, dtype=np.float64)
+            self._lo = self._sum.copy()
+            self._hi = self._sum.copy()
+        else:
+            self._sum += value
+            np.minimum(self._lo, value, out=self._lo)
+            np.maximum(self._hi, value, out=self._hi)
+        self._count += 1
+
+    def flush(self):
+        """Fecha o balde corrente gravando min/max/média do período"""
+        if not self._count:
+            return
+        self.times.append(self._bucket * self.period)
+        self.mean.append(self._sum / self._count)
+        self.min.append(self._lo)
+        self.max.append(self._hi)
+        self._count = 0
+
+    def window(self, cutoff):
+        times = self.times.view()
+        start = int(np.searchsorted(times, cutoff, side='left'))
+        mean = self.mean.view()[..., start:]
+        return HistoryWindow(times[start:], mean,
+                             mean if self.raw else self.min.view()[..., start:],
+                             mean if self.raw else self.max.view()[..., start:],
+                             self.period)
+
+
+class TieredHistory:
+    """Histórico com retenção em vários níveis e memória limitada por série.
+
+    O primeiro nível guarda as amostras brutas; os seguintes guardam rollups
+    min/max/média calculados incrementalmente a cada append. `select` devolve
+    o nível mais barato (menos pontos) que cobre o intervalo pedido.
+
+    Só uma thread grava. Leitores em outras threads usam `read`/`read_last`,
+    que copiam a janela e conferem o contador de versão (seqlock): a cópia só
+    é aceita se nenhum append aconteceu durante ela, sem lock para o coletor.
+    """
+
+    def __init__(self, tiers=DEFAULT_TIERS, channels=None, dtype=np.float64):
+        self.channels = channels
+        self.tiers = [_Tier(period, capacity, channels, dtype, raw=(i == 0))
+                      for i, (period, capacity) in enumerate(tiers)]
+        # Ímpar enquanto um append está em andamento
+        self.version = 0
+
+    def append(self, value, ts=None):
+        """Grava uma amostra em todos os níveis"""
+        if ts is None:
+            ts = time.time()
+        self.version += 1
+        for tier in self.tiers:
+            tier.add(value, ts)
+        self.version += 1
+
+    def _consistent(self, read):
+        while True:
+            version = self.version
+            if not version & 1:
+                result = read()
+                if self.version == version:
+                    return result
+            time.sleep(0)  # cede a vez para o coletor terminar o append
+
+    def read(self, seconds, now=None):
+        """Como `select`, mas devolve uma cópia consistente (seguro fora da thread do coletor)"""
+        if now is None:
+            now = time.time()
+        return self._consistent(lambda: self.select(seconds, now).copy())
+
+    def read_last(self, count):
+        """Cópia consistente das últimas `count` amostras brutas"""
+        return self._consistent(lambda: self.view()[..., -count:].copy())
+
+    def view(self):
+        """Janela de amostras brutas (sem cópia)"""
+        return self.tiers[0].mean.view()
+
+    def last(self):
+        """Última amostra bruta"""
+        return self.tiers[0].mean.last()
+
+    def tier_for(self, seconds, now=None):
+        """Nível mais fino que cobre `seconds` (pela capacidade nominal e pelos dados retidos)"""
+        if now is None:
+            now = time.time()
+        cutoff = now - seconds
+        for tier in self.tiers:
+            # Com coleta mais rápida que o período nominal o nível bruto cobre menos tempo
+            if tier.period * tier.capacity >= seconds and tier.times.view()[0] <= cutoff:
+                return tier
+        return self.tiers[-1]
+
+    def select(self, seconds, now=None):
+        """Retorna um HistoryWindow com os últimos `seconds` segundos"""
+        if now is None:
+            now = time.time()
+        return self.tier_for(seconds, now).window(now - seconds)
+
+    def __len__(self):
+        return self.tiers[0].capacity if self.channels is None else self.channels
@@ -0,0 +1,224 @@
+import re
+
+import numpy as np
+
+
+class StringTable:
+    """Interna strings repetidas (nomes, usuários, status) como ids inteiros.
+
+    Só cresce por append, então snapshots antigos continuam válidos enquanto
+    o coletor registra strings novas.
+    """
+
+    def __init__(self, limit=65536):
+        self.limit = limit
+        self.ids = {}
+        self.strings = []
+
+    def intern(self, value):
+        value = value or ''
+        sid = self.ids.get(value)
+        if sid is None:
+            sid = len(self.strings)
+            self.ids[value] = sid
+            self.strings.append(value)
+        return sid
+
+    def is_full(self):
+        return len(self.strings) >= self.limit
+
+
+class ProcessStore:
+    """Snapshot completo dos processos guardado em colunas NumPy.
+
+    Texto (nome, usuário, status) fica como ids internados; ordenação, top-k e
+    filtros são vetorizados sobre as colunas e devolvem índices de linha. A
+    interface só materializa as linhas da janela visível.
+    """
+
+    COLUMNS = (('pid', np.int64), ('cpu', np.float32), ('mem_pct', np.float32),
+               ('rss', np.int64), ('threads', np.int32), ('status', np.int32),
+               ('name', np.int32), ('user', np.int32))
+    TEXT = ('name', 'user', 'status')
+
+    def __init__(self, columns, tables):
+        self.columns = columns
+        # Cópia das listas de strings no momento do snapshot (ids < len sempre válidos)
+        self.strings = {key: np.array(tables[key].strings, dtype=object) for key in self.TEXT}
+        self._ranks = {}
+
+    @classmethod
+    def empty(cls):
+        tables = {key: StringTable() for key in cls.TEXT}
+        return cls({name: np.zeros(0, dtype=dtype) for name, dtype in cls.COLUMNS}, tables)
+
+    def __len__(self):
+        return len(self.columns['pid'])
+
+    def text(self, key, i):
+        return self.strings[key][self.columns[key][i]]
+
+    def sort_values(self, key):
+        """Valores numéricos usados para ordenar pela coluna `key`"""
+        if key not in self.TEXT:
+            return self.columns[key]
+        # Ordem alfabética das strings internadas, calculada uma vez por snapshot
+        if key not in self._ranks:
+            strings = self.strings[key]
+            ranks = np.empty(len(strings), dtype=np.int32)
+            ranks[np.argsort(np.array([s.lower() for s in strings], dtype=object), kind='stable')] = \
+                np.arange(len(strings), dtype=np.int32)
+            self._ranks[key] = ranks
+        return self._ranks[key][self.columns[key]]
+
+    def order(self, key='cpu', reverse=True):
+        """Índices de todas as linhas ordenadas por `key`"""
+        values = self.sort_values(key)
+        if reverse:
+            # Negar mantém a ordem estável entre empates
+            return np.argsort(-values.astype(np.float64), kind='stable')
+        return np.argsort(values, kind='stable')
+
+    def top_k(self, k, key='cpu'):
+        """Os `k` maiores por `key`, em ordem decrescente, via argpartition"""
+        values = self.sort_values(key)
+        if k >= len(values):
+            return self.order(key)
+        part = np.argpartition(-values.astype(np.float64), k)[:k]
+        return part[np.argsort(-values[part].astype(np.float64), kind='stable')]
+
+    def match(self, search, regex=False):
+        """Máscara das linhas cujo nome (ou PID) casa com `search`"""
+        if regex:
+            try:
+                pattern = re.compile(search, re.IGNORECASE)
+            except re.error:
+                pattern = re.compile(re.escape(search), re.IGNORECASE)
+            name_hits = np.array([bool(pattern.search(s)) for s in self.strings['name']], dtype=bool)
+        else:
+            search = search.lower()
+            name_hits = np.array([search in s.lower() for s in self.strings['name']], dtype=bool)
+
+        # Testa só os nomes distintos e espalha o resultado pelas linhas
+        mask = name_hits[self.columns['name']] if len(name_hits) else np.zeros(len(self), dtype=bool)
+        if not regex and search.isdigit():
+            pids = self.columns['pid'].astype(str)
+            mask |= np.char.find(pids, search) >= 0
+        return mask
+
+    def query(self, search='', key='cpu', reverse=True, regex=False):
+        """Índices das linhas filtradas por `search` e ordenadas por `key`"""
+        order = self.order(key, reverse)
+        if not search:
+            return order
+        return order[self.match(search, regex)[order]]
+
+    def record(self, i):
+        """Linha `i` como dicionário (mesmo formato usado pela interface)"""
+        c = self.columns
+        return {
+            'pid': int(c['pid'][i]),
+            'name': self.text('name', i),
+            'cpu': float(c['cpu'][i]),
+            'mem_pct': float(c['mem_pct'][i]),
+            'mem_mb': float(c['rss'][i]) / (1024 * 1024),
+            'threads': int(c['threads'][i]),
+            'status': self.text('status', i),
+            'user': self.text('user', i),
+        }
+
+    def to_records(self):
+        return [self.record(i) for i in range(len(self))]
+
+
+class ProcessStoreBuilder:
+    """Acumula linhas em listas por coluna e gera ProcessStores com strings internadas"""
+
+    def __init__(self):
+        self.tables = {key: StringTable() for key in ProcessStore.TEXT}
+        self._reset()
+
+    def _reset(self):
+        self._columns = {name: [] for name, _ in ProcessStore.COLUMNS}
+        # Recomeça as tabelas se crescerem demais (snapshots antigos guardam as suas)
+        for key, table in self.tables.items():
+            if table.is_full():
+                self.tables[key] = StringTable(table.limit)
+
+    def add(self, pid, name, cpu, mem_pct, rss, threads, status, user):
+        c = self._columns
+        c['pid'].append(pid)
+        c['cpu'].append(cpu)
+        c['mem_pct'].append(mem_pct)
+        c['rss'].append(rss)
+        c['threads'].append(threads)
+        c['status'].append(self.tables['status'].intern(status))
+        c['name'].append(self.tables['name'].intern(name))
+        c['user'].append(self.tables['user'].intern(user))
+
+    def build(self):
+        columns = {name: np.array(self._columns[name], dtype=dtype) for name, dtype in ProcessStore.COLUMNS}
+        store = ProcessStore(columns, self.tables)
+        self._reset()
+        return store
+
+
+class TreeviewSync:
+    """Mantém um ttk.Treeview igual a uma lista de linhas indexadas por chave (PID).
+
+    Em vez de apagar e reinserir tudo, aplica só as diferenças: insere linhas
+    novas, remove as que sumiram, atualiza células alteradas e usa `move`
+    apenas quando a ordem muda. Seleção e rolagem são preservadas.
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+        self.rows = {}    # chave -> (values, tags) exibidos
+        self.order = []   # chaves na ordem atual do widget
+
+    def apply(self, rows):
+        """Sincroniza com `rows`: lista de (chave, values, tags) já na ordem desejada"""
+        stats = {'inserted': 0, 'updated': 0, 'removed': 0, 'moved': 0}
+        wanted = {key for key, _, _ in rows}
+
+        # 1. Remover linhas que não existem mais
+        gone = [key for key in self.order if key not in wanted]
+        if gone:
+            self.tree.delete(*[str(key) for key in gone])
+            for key in gone:
+                del self.rows[key]
+            self.order = [key for key in self.order if key in wanted]
+            stats['removed'] = len(gone)
+
+        # 2. Inserir, reposicionar e atualizar
+        order_changed = [key for key, _, _ in rows if key in self.rows] != self.order
+
+        current = self.order
+        for index, (key, values, tags) in enumerate(rows):
+            shown = self.rows.get(key)
+            if shown is None:
+                self.tree.insert('', index, iid=str(key), values=values, tags=tags)
+                current.insert(index, key)
+                self.rows[key] = (values, tags)
+                stats['inserted'] += 1
+                continue
+
+            if order_changed and current[index] != key:
+                self.tree.move(str(key), '', index)
+                current.remove(key)
+                current.insert(index, key)
+                stats['moved'] += 1
+
+            if shown != (values, tags):
+                self.tree.item(str(key), values=values, tags=tags)
+                self.rows[key] = (values, tags)
+                stats['updated'] += 1
+
+        self.order = current
+        return stats
+
+    def clear(self):
+        if self.order:
+            self.tree.delete(*[str(key) for key in self.order])
+        self.rows.clear()
+        self.order = []
@@ -0,0 +1,376 @@
+"""Gravação contínua das amostras em um arquivo binário append-only.
+
+Formato (little-endian):
+
+    cabeçalho   MAGIC, u32 tamanho, JSON {versão, canais, início, host, intervalo}
+    blocos      BLOCK_HEADER (tipo, registros, bytes, crc32, t_primeiro, t_último) + payload
+    rodapé      FOOTER (offset do último índice, FOOTER_MAGIC), só em arquivos fechados
+
+Blocos 'DATA' guardam registros float32 de largura fixa: [t - t_primeiro,
+canal 0, canal 1, ...]. Blocos 'PROC' guardam um snapshot de processos
+(pid, cpu%, mem%, rss MB, threads em float32, seguidos dos nomes separados
+por '\\0'). A cada INDEX_EVERY blocos um bloco 'INDX' lista os anteriores
+(offset do índice anterior + entradas INDEX_ENTRY), formando uma cadeia
+que o leitor percorre de trás para frente a partir do rodapé. Sem rodapé
+(processo interrompido) o leitor varre os cabeçalhos e para no primeiro
+bloco incompleto ou com CRC inválido: perde-se no máximo o último lote.
+"""
+import collections
+import json
+import os
+import queue
+import socket
+import struct
+import sys
+import threading
+import time
+import zlib
+
+import numpy as np
+
+MAGIC = b'MOSREC01'
+FOOTER_MAGIC = b'MOSREND\0'
+BLOCK_HEADER = struct.Struct('<4sIIIdd')
+INDEX_ENTRY = struct.Struct('<ddQI4s')
+# Mesma estrutura de INDEX_ENTRY, para ler blocos de índice direto do arquivo mapeado
+INDEX_DTYPE = np.dtype([('t0', '<f8'), ('t1', '<f8'), ('offset', '<u8'), ('count', '<u4'), ('kind', 'S4')])
+FOOTER = struct.Struct('<Q8s')
+
+DATA, PROC, INDEX = b'DATA', b'PROC', b'INDX'
+
+# Canais gravados antes dos núcleos: valores escalares da mensagem 'metrics', a contagem
+# de processos e a temperatura (NaN sem sensor), o suficiente para reproduzir todas as abas
+METRIC_CHANNELS = ('cpu', 'memory', 'disk', 'network', 'disk_read', 'disk_write', 'net_sent', 'net_recv',
+                   'memory_used_gb', 'memory_total_gb', 'disk_used_gb', 'disk_total_gb',
+                   'process_count', 'cpu_temp')
+PROCESS_COLUMNS = ('pid', 'cpu', 'mem_pct', 'rss_mb', 'threads')
+
+# Registros por bloco e blocos entre índices
+BATCH_SIZE = 256
+INDEX_EVERY = 64
+# Rollups de blocos mantidos em memória pelo leitor
+ROLLUP_CACHE = 4096
+
+
+def unique_path(path):
+    """Não sobrescreve gravações anteriores: acrescenta data e hora ao nome se o arquivo existir"""
+    if not os.path.exists(path):
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}-{time.strftime('%Y%m%d-%H%M%S')}{ext or '.mosr'}"
+
+
+class Recorder:
+    """Grava amostras em lotes de registros float32 de largura fixa.
+
+    `append` só copia a amostra para um buffer pré-alocado. Um lote cheio
+    (ou mais velho que `flush_interval`) vira um bloco com CRC, que uma
+    thread de escrita grava e confirma com um único fsync. Um crash perde no
+    máximo o lote em memória.
+    """
+
+    def __init__(self, path, channels, interval=None, batch_size=BATCH_SIZE, flush_interval=30.0,
+                 index_every=INDEX_EVERY, process_limit=0):
+        self.path = unique_path(path)
+        self.channels = tuple(channels)
+        self.width = 1 + len(self.channels)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.index_every = index_every
+        # Processos por snapshot gravado (os de maior CPU); 0 desativa
+        self.process_limit = process_limit
+
+        self._batch = np.zeros((batch_size, self.width), dtype=np.float32)
+        self._times = np.zeros(batch_size, dtype=np.float64)
+        self._count = 0
+        self._batch_started = 0.0
+
+        self._file = open(self.path, 'xb')
+        header = json.dumps({'version': 1, 'channels': self.channels, 'start': time.time(),
+                             'host': socket.gethostname(), 'interval': interval}).encode()
+        self._offset = self._write(MAGIC + struct.pack('<I', len(header)) + header)
+        self._pending_index = []
+        self._last_index = 0
+
+        self._blocks = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._write_blocks, name='gravador', daemon=True)
+        self._writer.start()
+
+    # ====== LADO DO COLETOR ======
+
+    def append(self, ts, values):
+        """Acrescenta uma amostra (`values` na ordem de `channels`)"""
+        i = self._count
+        if i == 0:
+            self._batch_started = time.monotonic()
+        self._times[i] = ts
+        self._batch[i, 1:] = values
+        self._count = i + 1
+        if self._count == self.batch_size or time.monotonic() - self._batch_started >= self.flush_interval:
+            self.flush()
+
+    def append_metrics(self, ts, metrics, cores):
+        """Amostra a partir de um mapeamento com as chaves de METRIC_CHANNELS e do vetor de núcleos"""
+        values = np.empty(self.width - 1, dtype=np.float32)
+        values[:len(METRIC_CHANNELS)] = [metrics[key] for key in METRIC_CHANNELS]
+        values[len(METRIC_CHANNELS):] = cores
+        self.append(ts, values)
+
+    def append_processes(self, ts, store):
+        """Grava os `process_limit` processos de maior CPU de um ProcessStore"""
+        if not self.process_limit or not len(store):
+            return
+        rows = store.top_k(self.process_limit, 'cpu')
+        c = store.columns
+        table = np.column_stack((c['pid'][rows], c['cpu'][rows], c['mem_pct'][rows],
+                                 c['rss'][rows] / (1024 * 1024), c['threads'][rows])).astype(np.float32)
+        names = '\0'.join(store.text('name', i) for i in rows).encode('utf-8', 'replace')
+        self._blocks.put((PROC, len(rows), ts, ts, table.tobytes() + names))
+
+    def flush(self):
+        """Fecha o lote atual em um bloco e o entrega à thread de escrita"""
+        n = self._count
+        if not n:
+            return
+        t0 = self._times[0]
+        batch = self._batch[:n]
+        batch[:, 0] = self._times[:n] - t0
+        self._blocks.put((DATA, n, t0, self._times[n - 1], batch.tobytes()))
+        self._count = 0
+
+    def close(self):
+        """Grava o lote pendente, o índice final e o rodapé"""
+        self.flush()
+        self._blocks.put(None)
+        self._writer.join()
+        self._file.close()
+
+    # ====== THREAD DE ESCRITA ======
+
+    def _write(self, data):
+        self._file.write(data)
+        return self._file.tell()
+
+    def _write_block(self, kind, count, t0, t1, payload):
+        offset = self._offset
+        header = BLOCK_HEADER.pack(kind, count, len(payload), zlib.crc32(payload), t0, t1)
+        self._offset = self._write(header + payload)
+        return offset
+
+    def _write_index(self):
+        entries = b''.join(INDEX_ENTRY.pack(*entry) for entry in self._pending_index)
+        t0, t1 = self._pending_index[0][0], self._pending_index[-1][1]
+        payload = struct.pack('<Q', self._last_index) + entries
+        self._last_index = self._write_block(INDEX, len(self._pending_index), t0, t1, payload)
+        self._pending_index = []
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _write_blocks(self):
+        while True:
+            block = self._blocks.get()
+            if block is None:
+                break
+            kind, count, t0, t1, payload = block
+            try:
+                offset = self._write_block(kind, count, t0, t1, payload)
+                self._pending_index.append((t0, t1, offset, count, kind))
+                if len(self._pending_index) >= self.index_every:
+                    self._write_index()
+                # Um fsync por lote: o custo fica em ~1 chamada a cada BATCH_SIZE amostras
+                if kind == DATA:
+                    self._sync()
+            except OSError as e:
+                print(f"Erro ao gravar {self.path}: {e}", file=sys.stderr)
+
+        try:
+            if self._pending_index:
+                self._write_index()
+            # Rodapé sempre: fechado antes do primeiro bloco, aponta para 0 (cadeia vazia, arquivo completo)
+            self._write(FOOTER.pack(self._last_index, FOOTER_MAGIC))
+            self._sync()
+        except OSError as e:
+            print(f"Erro ao finalizar {self.path}: {e}", file=sys.stderr)
+
+
+class Recording:
+    """Leitura de um arquivo gravado pelo Recorder, mapeado em memória (np.memmap).
+
+    Abrir só lê o cabeçalho e a cadeia de índices (ou varre os cabeçalhos de
+    bloco, se o arquivo não foi fechado). Os registros ficam no arquivo: uma
+    janela toca apenas os blocos que a cobrem, e janelas longas usam rollups
+    min/max/média por bloco, calculados uma vez e guardados em cache.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.data = np.memmap(path, dtype=np.uint8, mode='r')
+        if bytes(self.data[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} não é uma gravação do monitor")
+        size = struct.unpack_from('<I', self.data, len(MAGIC))[0]
+        start = len(MAGIC) + 4
+        self.header = json.loads(bytes(self.data[start:start + size]))
+        self.channels = tuple(self.header['channels'])
+        self.width = 1 + len(self.channels)
+        self.interval = self.header.get('interval') or 1.0
+        self._first_block = start + size
+
+        self.complete = False
+        blocks = self._read_index()
+        if blocks is None:
+            blocks = self._scan()
+        self.blocks = blocks[blocks['kind'] == DATA]
+        self.process_blocks = blocks[blocks['kind'] == PROC]
+        self.start = float(self.blocks['t0'][0]) if len(self.blocks) else self.header['start']
+        self.end = float(self.blocks['t1'][-1]) if len(self.blocks) else self.start
+        self._rollups = collections.OrderedDict()
+
+    def __len__(self):
+        """Total de amostras gravadas"""
+        return int(self.blocks['count'].sum())
+
+    def column(self, name):
+        """Índice do canal `name` nos valores devolvidos (None se não foi gravado)"""
+        return self.channels.index(name) if name in self.channels else None
+
+    def _read_index(self):
+        """Percorre a cadeia de índices a partir do rodapé (arquivo fechado normalmente)"""
+        if len(self.data) < FOOTER.size:
+            return None
+        offset, magic = FOOTER.unpack_from(self.data, len(self.data) - FOOTER.size)
+        if magic != FOOTER_MAGIC:
+            return None
+        chain = []
+        while offset:
+            kind, count, size, crc, _, _ = BLOCK_HEADER.unpack_from(self.data, offset)
+            payload = offset + BLOCK_HEADER.size
+            if kind != INDEX or zlib.crc32(self.data[payload:payload + size]) != crc:
+                return None
+            # Entradas lidas sem cópia, direto do arquivo mapeado
+            chain.append(np.frombuffer(self.data, dtype=INDEX_DTYPE, count=count, offset=payload + 8))
+            offset = struct.unpack_from('<Q', self.data, payload)[0]
+        self.complete = True
+        return np.concatenate(chain[::-1]) if chain else np.zeros(0, dtype=INDEX_DTYPE)
+
+    def _scan(self):
+        """Recuperação: varre os blocos e para no primeiro incompleto ou corrompido"""
+        blocks = []
+        offset = self._first_block
+        end = len(self.data)
+        while offset + BLOCK_HEADER.size <= end:
+            kind, count, size, crc, t0, t1 = BLOCK_HEADER.unpack_from(self.data, offset)
+            payload = offset + BLOCK_HEADER.size
+            if kind not in (DATA, PROC, INDEX) or payload + size > end \
+                    or zlib.crc32(self.data[payload:payload + size]) != crc:
+                break
+            if kind != INDEX:
+                blocks.append((t0, t1, offset, count, kind))
+            offset = payload + size
+        return np.array(blocks, dtype=INDEX_DTYPE)
+
+    def _records(self, i):
+        """Registros do bloco de dados `i` (view do arquivo mapeado, sem cópia)"""
+        block = self.blocks[i]
+        start = int(block['offset']) + BLOCK_HEADER.size
+        count = int(block['count'])
+        return self.data[start:start + count * self.width * 4].view(np.float32).reshape(count, self.width)
+
+    def _block_range(self, t0, t1):
+        """Blocos de dados com alguma amostra entre t0 e t1"""
+        first = int(np.searchsorted(self.blocks['t1'], t0, side='left'))
+        last = int(np.searchsorted(self.blocks['t0'], t1, side='right'))
+        return range(first, max(first, last))
+
+    def window(self, t0, t1):
+        """Tempos (float64) e valores (amostras x canais) entre t0 e t1; só a janela é copiada"""
+        times, values = [], []
+        for i in self._block_range(t0, t1):
+            records = self._records(i)
+            block_times = self.blocks['t0'][i] + records[:, 0].astype(np.float64)
+            first = int(np.searchsorted(block_times, t0, side='left'))
+            last = int(np.searchsorted(block_times, t1, side='right'))
+            times.append(block_times[first:last])
+            values.append(records[first:last, 1:])
+        if not times:
+            return np.zeros(0), np.zeros((0, len(self.channels)), dtype=np.float32)
+        return np.concatenate(times), np.concatenate(values)
+
+    def sample(self, ts):
+        """Última amostra gravada até `ts` (ou a primeira, antes do início): (tempo, valores)"""
+        if not len(self.blocks):
+            return None
+        i = max(int(np.searchsorted(self.blocks['t0'], ts, side='right')) - 1, 0)
+        records = self._records(i)
+        t0 = self.blocks['t0'][i]
+        j = max(int(np.searchsorted(records[:, 0], ts - t0, side='right')) - 1, 0)
+        return t0 + float(records[j, 0]), records[j, 1:].copy()
+
+    @staticmethod
+    def _reduce(times, values, period):
+        """Somas, mínimos, máximos e contagens por balde de `period` s"""
+        buckets = np.floor(times / period)
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        return (buckets[starts] * period,
+                np.add.reduceat(values, starts, axis=0, dtype=np.float64),
+                np.minimum.reduceat(values, starts, axis=0),
+                np.maximum.reduceat(values, starts, axis=0),
+                np.diff(np.r_[starts, len(times)]))
+
+    def _block_rollup(self, i, period, until=None):
+        """Rollup do bloco `i`; blocos inteiros ficam em cache, o cortado em `until` não"""
+        partial = until is not None and self.blocks['t1'][i] > until
+        key = (i, period)
+        rollup = None if partial else self._rollups.get(key)
+        if rollup is not None:
+            self._rollups.move_to_end(key)
+            return rollup
+
+        records = self._records(i)
+        times = self.blocks['t0'][i] + records[:, 0].astype(np.float64)
+        if partial:
+            keep = int(np.searchsorted(times, until, side='right'))
+            return self._reduce(times[:keep], records[:keep, 1:], period) if keep else None
+
+        rollup = self._rollups[key] = self._reduce(times, records[:, 1:], period)
+        if len(self._rollups) > ROLLUP_CACHE:
+            self._rollups.popitem(last=False)
+        return rollup
+
+    def rollup(self, t0, t1, period):
+        """Tempos, média, mínimo e máximo (baldes x canais) em baldes de `period` s entre t0 e t1.
+
+        O primeiro balde é completo (lê os blocos anteriores a t0 que o cobrem);
+        o último só inclui amostras até t1.
+        """
+        first = np.floor(t0 / period) * period
+        parts = [part for part in (self._block_rollup(i, period, t1) for i in self._block_range(first, t1))
+                 if part is not None]
+        if not parts:
+            empty = np.zeros((0, len(self.channels)), dtype=np.float32)
+            return np.zeros(0), empty, empty, empty
+        times, sums, lows, highs, counts = (np.concatenate(column) for column in zip(*parts))
+        # Baldes divididos entre dois blocos aparecem duas vezes: junta pelo tempo
+        starts = np.flatnonzero(np.r_[True, times[1:] != times[:-1]])
+        times = times[starts]
+        counts = np.add.reduceat(counts, starts)
+        mean = (np.add.reduceat(sums, starts, axis=0) / counts[:, None]).astype(np.float32)
+        lows = np.minimum.reduceat(lows, starts, axis=0)
+        highs = np.maximum.reduceat(highs, starts, axis=0)
+        keep = slice(int(np.searchsorted(times, first, side='left')), len(times))
+        return times[keep], mean[keep], lows[keep], highs[keep]
+
+    def processes(self, ts):
+        """Snapshot de processos mais recente até `ts`: (tempo, colunas PROCESS_COLUMNS, nomes)"""
+        i = int(np.searchsorted(self.process_blocks['t0'], ts, side='right')) - 1
+        if i < 0:
+            return None
+        block = self.process_blocks[i]
+        offset, count = int(block['offset']), int(block['count'])
+        size = BLOCK_HEADER.unpack_from(self.data, offset)[2]
+        start = offset + BLOCK_HEADER.size
+        table_size = count * len(PROCESS_COLUMNS) * 4
+        table = self.data[start:start + table_size].view(np.float32).reshape(count, len(PROCESS_COLUMNS))
+        names = bytes(self.data[start + table_size:start + size]).decode('utf-8', 'replace').split('\0')
+        return float(block['t0']), table, names
@@ -0,0 +1,280 @@
+import os
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from alerts import AlertEngine, DEFAULT_RULES
+from anomaly import AnomalyDetector
+from history import HistoryWindow
+from process_table import ProcessStore, ProcessStoreBuilder
+from recorder import METRIC_CHANNELS, Recording
+
+# Velocidades oferecidas na barra de reprodução
+SPEEDS = (1, 2, 5, 10, 25, 50, 100)
+
+# Pontos por janela: acima disso a janela é lida em rollups de ROLLUP_PERIODS segundos
+MAX_POINTS = 3600
+ROLLUP_PERIODS = (1, 10, 60, 600, 3600)
+
+# Menor passo da reprodução em segundos reais
+MIN_TICK = 0.1
+
+# Históricos do SystemCollector -> canal gravado
+HISTORY_CHANNELS = {
+    'cpu_history': 'cpu', 'memory_history': 'memory', 'disk_history': 'disk',
+    'network_history': 'network', 'process_count_history': 'process_count',
+    'temperature_history': 'cpu_temp', 'disk_read': 'disk_read', 'disk_write': 'disk_write',
+    'net_sent': 'net_sent', 'net_recv': 'net_recv',
+}
+
+
+def replay_period(recording, seconds):
+    """Resolução usada para exibir `seconds`: amostras brutas ou o menor rollup que cabe em MAX_POINTS"""
+    if seconds / recording.interval <= MAX_POINTS:
+        return recording.interval
+    for period in ROLLUP_PERIODS:
+        if period > recording.interval and seconds / period <= MAX_POINTS:
+            return period
+    return ROLLUP_PERIODS[-1]
+
+
+class ReplaySnapshot:
+    """Mesma interface do collector.Snapshot, lendo as janelas direto da gravação.
+
+    `time` é a posição da reprodução; cada janela copia só os blocos que a
+    cobrem, então a memória usada acompanha a janela exibida e não o arquivo.
+    """
+
+    __slots__ = ('seq', 'time', 'metrics', 'processes', 'energy', 'recording', 'cores', 'anomalies')
+
+    def __init__(self, seq, time_, metrics, processes, energy, recording, cores, anomalies=()):
+        self.seq = seq
+        self.time = time_
+        self.metrics = metrics
+        self.processes = processes
+        self.energy = energy
+        self.recording = recording
+        self.cores = cores
+        self.anomalies = anomalies
+
+    @property
+    def core_count(self):
+        return len(self.cores)
+
+    def has(self, key):
+        """Se o histórico `key` foi gravado (a frequência por núcleo não é)"""
+        return key == 'cpu_cores' or self.recording.column(HISTORY_CHANNELS.get(key)) is not None
+
+    def _columns(self, key):
+        if key == 'cpu_cores':
+            return self.cores
+        return self.recording.column(HISTORY_CHANNELS[key])
+
+    def window(self, key, seconds, now=None):
+        """Janela do histórico `key` terminando em `now` (padrão: posição da reprodução)"""
+        if now is None:
+            now = self.time
+        columns = self._columns(key)
+        period = self.period(key, seconds)
+        if columns is None:
+            empty = np.zeros(0, dtype=np.float32)
+            return HistoryWindow(np.zeros(0), empty, empty, empty, period)
+
+        if period == self.recording.interval:
+            times, values = self.recording.window(now - seconds, now)
+            values = np.ascontiguousarray(values[:, columns].T)
+            return HistoryWindow(times, values, values, values, period)
+
+        times, mean, low, high = self.recording.rollup(now - seconds, now, period)
+        return HistoryWindow(times, np.ascontiguousarray(mean[:, columns].T),
+                             np.ascontiguousarray(low[:, columns].T),
+                             np.ascontiguousarray(high[:, columns].T), period)
+
+    def last(self, key, count):
+        """Últimas `count` amostras até a posição, completadas com zeros no início"""
+        window = self.window(key, count * self.recording.interval, self.time).mean[..., -count:]
+        recent = np.zeros(window.shape[:-1] + (count,), dtype=np.float64)
+        recent[..., count - window.shape[-1]:] = np.nan_to_num(window)
+        return recent
+
+    def period(self, key, seconds, now=None):
+        return replay_period(self.recording, seconds)
+
+
+class ReplayCollector:
+    """Reproduz uma gravação no lugar do SystemCollector.
+
+    A posição avança `speed` segundos de dados por segundo real; a cada passo
+    publica um ReplaySnapshot e emite as mesmas mensagens do coletor ao vivo
+    ('metrics', 'processes', 'energy', 'sys_info'), então todas as abas
+    funcionam sem mudanças. `seek`, `play`, `pause` e `set_speed` podem ser
+    chamados da thread da interface.
+    """
+
+    def __init__(self, path, emit=None, alerts=None):
+        self.recording = Recording(path)
+        # As regras de alerta são reavaliadas sobre os dados reproduzidos (recomeçam a cada busca)
+        self.alerts = AlertEngine(DEFAULT_RULES if alerts is None else alerts)
+        self.emit = emit or (lambda dtype, data: None)
+        self.is_running = True
+        self.playing = True
+        self.speed = 1.0
+        self.position = self.recording.start
+        channels = self.recording.channels
+        self.cores = np.array([i for i, name in enumerate(channels) if name.startswith('core')], dtype=np.intp)
+        # Anomalias das amostras reproduzidas, só quando a posição avança (recomeçam a cada busca)
+        self.anomalies = AnomalyDetector(len(self.cores))
+        self._anomaly_time = None
+
+        self.process_builder = ProcessStoreBuilder()
+        self._processes = ProcessStore.empty()
+        self._process_time = None
+        self._energy = None
+        self._seek = None
+        self._refresh = False
+        self._wake = threading.Event()
+        self.snapshot = None
+        self.publish()
+
+    @property
+    def interval(self):
+        """Passo da reprodução em segundos reais (uma amostra gravada, acelerada por `speed`)"""
+        return max(self.recording.interval / self.speed, MIN_TICK)
+
+    def now(self):
+        """Relógio dos dados: a posição da reprodução"""
+        return self.position
+
+    # ====== CONTROLES ======
+
+    def seek(self, ts):
+        self._seek = min(max(ts, self.recording.start), self.recording.end)
+        self._wake.set()
+
+    def play(self):
+        if self.position >= self.recording.end:
+            self.seek(self.recording.start)
+        self.playing = True
+        self._wake.set()
+
+    def pause(self):
+        self.playing = False
+
+    def set_speed(self, speed):
+        self.speed = float(speed)
+        self._wake.set()
+
+    # ====== MESMA INTERFACE DO SystemCollector ======
+
+    def run(self):
+        """Avança a posição até stop(), publicando a cada passo"""
+        self.emit('sys_info', self.describe())
+        self.publish()
+        last = time.monotonic()
+        while self.is_running:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            now = time.monotonic()
+            seek, self._seek = self._seek, None
+            if seek is not None:
+                self.position = seek
+                self.alerts.reset()
+                self.emit('alerts', self.alerts.message([]))
+                self.anomalies.reset()
+                self._anomaly_time = None
+            elif self.playing:
+                self.position = min(self.position + (now - last) * self.speed, self.recording.end)
+                if self.position >= self.recording.end:
+                    self.playing = False
+            elif not self._refresh:
+                last = now
+                continue
+            last = now
+            self._refresh = False
+            self.publish()
+
+    def stop(self):
+        self.is_running = False
+        self._wake.set()
+
+    def refresh(self, *kinds):
+        """Reemite o estado da posição atual"""
+        self._refresh = True
+        self._process_time = self._energy = None
+        self._wake.set()
+
+    def source_stats(self):
+        return []
+
+    def publish(self):
+        """Monta o estado da posição atual, emite as mensagens e troca o snapshot"""
+        position = self.position
+        recording = self.recording
+        metrics = dict.fromkeys(METRIC_CHANNELS, 0.0)
+        metrics['cpu_temp'] = np.nan
+        sample = recording.sample(position)
+        if sample is not None:
+            values = sample[1]
+            metrics.update((name, float(values[i])) for i, name in enumerate(recording.channels)
+                           if name in metrics)
+            metrics['cores'] = values[self.cores].tolist()
+        else:
+            metrics['cores'] = [0.0] * len(self.cores)
+        cpu_temp = metrics.pop('cpu_temp')
+
+        processes = recording.processes(position)
+        if processes is not None and processes[0] != self._process_time:
+            self._process_time = processes[0]
+            self._processes = self.build_processes(processes[1], processes[2])
+            self.emit('processes', self._processes)
+            self.emit_alerts(self.alerts.observe_processes(position, self._processes))
+
+        energy = {'battery_api': False, 'battery': None,
+                  'cpu_temp': None if np.isnan(cpu_temp) else cpu_temp}
+        if energy != self._energy:
+            self._energy = energy
+            self.emit('energy', energy)
+
+        if sample is not None and (self._anomaly_time is None or sample[0] > self._anomaly_time):
+            self._anomaly_time = sample[0]
+            self.anomalies.observe(sample[0], metrics)
+
+        previous = self.snapshot
+        self.snapshot = ReplaySnapshot((previous.seq + 1) if previous else 0, position, metrics,
+                                       self._processes, energy, recording, self.cores, self.anomalies.events)
+        self.emit('metrics', metrics)
+        self.emit_alerts(self.alerts.observe_metrics(position, dict(metrics, cpu_temp=cpu_temp)))
+
+    def emit_alerts(self, events):
+        if events:
+            self.emit('alerts', self.alerts.message(events))
+
+    def build_processes(self, table, names):
+        """ProcessStore a partir de um snapshot gravado (status e usuário não são gravados)"""
+        builder = self.process_builder
+        for (pid, cpu, mem_pct, rss_mb, threads), name in zip(table.tolist(), names):
+            builder.add(int(pid), name, cpu, mem_pct, int(rss_mb * 1024 * 1024), int(threads), '-', '-')
+        return builder.build()
+
+    def describe(self):
+        """Texto da aba Sistema: dados da gravação"""
+        recording = self.recording
+        header = recording.header
+        fmt = '%d/%m/%Y %H:%M:%S'
+        return "\n".join([
+            "REPRODUÇÃO DE GRAVAÇÃO",
+            "=" * 50,
+            f"Arquivo: {os.path.abspath(recording.path)}",
+            f"Tamanho: {os.path.getsize(recording.path) / (1024 ** 2):.1f} MB",
+            f"Host: {header.get('host', '?')}",
+            f"Início: {datetime.fromtimestamp(recording.start).strftime(fmt)}",
+            f"Fim: {datetime.fromtimestamp(recording.end).strftime(fmt)}",
+            f"Duração: {recording.end - recording.start:.0f} s",
+            f"Intervalo de coleta: {recording.interval} s",
+            f"Amostras: {len(recording)}",
+            f"Núcleos: {len(self.cores)}",
+            f"Snapshots de processos: {len(recording.process_blocks)}",
+            f"Fechado corretamente: {'Sim' if recording.complete else 'Não (recuperado pela varredura)'}",
+        ])
@@ -0,0 +1,133 @@
+import sys
+import time
+
+
+class RefreshTask:
+    """Uma atualização periódica da interface com intervalo adaptativo"""
+
+    def __init__(self, name, callback, interval, max_interval, when, background):
+        self.name = name
+        self.callback = callback
+        self.min_interval = interval
+        self.max_interval = max(interval, max_interval)
+        self.interval = interval
+        self.when = when
+        self.background = background
+        self.due = 0.0
+        # Estatísticas de custo
+        self.runs = 0
+        self.skips = 0
+        self.total = 0.0
+        self.worst = 0.0
+
+
+class RefreshScheduler:
+    """Agenda central das atualizações da interface, com um único `after` pendente.
+
+    Cada tarefa tem um intervalo base e uma condição `when` (ex.: aba visível).
+    Tarefas cuja condição é falsa, ou todas exceto as de fundo com a janela
+    minimizada, são puladas sem custo até um `wake`. A callback devolve True
+    quando algo mudou na tela; sem mudanças o intervalo dobra até
+    `max_interval` e volta ao base na primeira mudança.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.tasks = {}
+        self.started = time.monotonic()
+        self._after_id = None
+        self._running = False
+
+    def add(self, name, callback, interval, max_interval=None, when=None, background=False):
+        self.tasks[name] = RefreshTask(name, callback, interval, max_interval or interval, when, background)
+
+    def set_interval(self, name, interval, max_interval=None):
+        """Muda o intervalo base de uma tarefa (ex.: período do gráfico selecionado)"""
+        task = self.tasks[name]
+        if task.min_interval != interval:
+            task.min_interval = interval
+            task.max_interval = max(interval, max_interval or task.max_interval)
+            task.interval = interval
+
+    def start(self):
+        self._running = True
+        self._reschedule()
+
+    def stop(self):
+        self._running = False
+        if self._after_id is not None:
+            self.window.after_cancel(self._after_id)
+            self._after_id = None
+
+    def wake(self, name=None):
+        """Executa já a tarefa `name` (ou todas), voltando ao intervalo base"""
+        for task in ([self.tasks[name]] if name else self.tasks.values()):
+            task.interval = task.min_interval
+            task.due = 0.0
+        self._reschedule()
+
+    def is_minimized(self):
+        try:
+            return self.window.state() in ('iconic', 'withdrawn')
+        except Exception:
+            return False
+
+    def _run(self):
+        self._after_id = None
+        now = time.monotonic()
+        minimized = self.is_minimized()
+        for task in self.tasks.values():
+            if task.due > now:
+                continue
+            if (minimized and not task.background) or (task.when and not task.when()):
+                # Invisível: confere de novo só no intervalo máximo (wake antecipa)
+                task.skips += 1
+                task.due = now + task.max_interval
+                continue
+
+            start = time.perf_counter()
+            try:
+                changed = task.callback()
+            except Exception as e:
+                print(f"Erro na atualização '{task.name}': {e}", file=sys.stderr)
+                changed = False
+            cost = time.perf_counter() - start
+            task.runs += 1
+            task.total += cost
+            task.worst = max(task.worst, cost)
+
+            task.interval = task.min_interval if changed else min(task.interval * 2, task.max_interval)
+            task.due = now + task.interval
+        self._reschedule()
+
+    def _reschedule(self):
+        if not self._running or not self.tasks:
+            return
+        if self._after_id is not None:
+            self.window.after_cancel(self._after_id)
+        due = min(task.due for task in self.tasks.values())
+        delay = max(int((due - time.monotonic()) * 1000), 1)
+        self._after_id = self.window.after(delay, self._run)
+
+    def stats(self):
+        """Custo por tarefa: execuções, pulos, intervalo atual, média/pior (ms) e ms por segundo"""
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return [{
+            'name': task.name,
+            'runs': task.runs,
+            'skips': task.skips,
+            'interval': task.interval,
+            'avg_ms': task.total / task.runs * 1000 if task.runs else 0.0,
+            'max_ms': task.worst * 1000,
+            'ms_per_s': task.total / elapsed * 1000,
+        } for task in self.tasks.values()]
+
+    def report(self):
+        lines = [f"{'Tarefa':<12}{'Execuções':>10}{'Puladas':>9}{'Intervalo':>11}"
+                 f"{'Média ms':>10}{'Pior ms':>9}{'ms/s':>8}"]
+        for s in self.stats():
+            lines.append(f"{s['name']:<12}{s['runs']:>10}{s['skips']:>9}{s['interval']:>10.1f}s"
+                         f"{s['avg_ms']:>10.2f}{s['max_ms']:>9.2f}{s['ms_per_s']:>8.3f}")
+        total = sum(s['ms_per_s'] for s in self.stats())
+        lines.append(f"Custo total da interface: {total:.3f} ms por segundo")
+        return '\n'.join(lines)
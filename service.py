@@ -0,0 +1,221 @@
+import asyncio
+import collections
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Executor, Future
+
+# Prazo (s) para as tarefas terminarem depois de stop(); uma fonte presa não segura o encerramento
+STOP_TIMEOUT = 2.0
+
+
+class WorkerPool(Executor):
+    """Pool fixo de threads daemon usado pelo run_in_executor do serviço.
+
+    Diferente do ThreadPoolExecutor, as threads são daemon: uma leitura
+    travada (sensor, DNS) nunca impede o programa de encerrar.
+    """
+
+    def __init__(self, workers, name='coletor'):
+        self.workers = workers
+        self._jobs = queue.SimpleQueue()
+        for i in range(workers):
+            threading.Thread(target=self._work, name=f'{name}-{i}', daemon=True).start()
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        self._jobs.put((future, fn, args, kwargs))
+        return future
+
+    def _work(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            future, fn, args, kwargs = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        # Não espera: threads presas em leituras travadas morrem com o processo
+        for _ in range(self.workers):
+            self._jobs.put(None)
+
+
+class DropOldestQueue(asyncio.Queue):
+    """asyncio.Queue limitada: cheia, descarta a mensagem mais antiga em vez de bloquear"""
+
+    def __init__(self, maxsize=256):
+        super().__init__(maxsize)
+        self.dropped = 0
+
+    def put_nowait(self, item):
+        if self.full():
+            self.get_nowait()
+            self.dropped += 1
+        super().put_nowait(item)
+
+
+class BoundedQueue:
+    """Fila limitada entre threads (coletor -> Tk) com a mesma política de descarte.
+
+    Só o necessário da interface de queue.Queue: put, get_nowait e empty.
+    """
+
+    def __init__(self, maxsize=256):
+        self._items = collections.deque(maxlen=maxsize)
+        self.dropped = 0
+
+    def put(self, item):
+        if len(self._items) == self._items.maxlen:
+            self.dropped += 1
+        self._items.append(item)  # deque com maxlen descarta o mais antigo
+
+    def get_nowait(self):
+        try:
+            return self._items.popleft()
+        except IndexError:
+            raise queue.Empty from None
+
+    def empty(self):
+        return not self._items
+
+    def __len__(self):
+        return len(self._items)
+
+
+class CollectorService:
+    """Núcleo de coleta assíncrono: uma tarefa periódica por fonte em um único event loop.
+
+    As leituras bloqueantes do psutil passam por run_in_executor: as fontes
+    do ciclo principal usam uma thread própria e as lentas um pool limitado,
+    com prazo. Aplicar resultados, gravar históricos e distribuir mensagens
+    acontece só no loop. Cada assinante (`subscribe`) recebe uma fila
+    limitada que descarta a mensagem mais antiga se ele atrasar.
+    """
+
+    def __init__(self, collector, slow_workers=3, queue_size=256):
+        self.collector = collector
+        self.queue_size = queue_size
+        self.subscribers = []
+        # O emit original (fila da interface, JSON do modo headless) vira um destino síncrono
+        self.sinks = [collector.emit]
+        collector.emit = self.broadcast
+        self._fast = WorkerPool(1, name='coletor-rapido')
+        self._slow = WorkerPool(slow_workers, name='coletor-lento')
+        self.loop = None
+        self._stopped = None
+        self._refresh = {}
+
+    def subscribe(self, maxsize=None):
+        """Nova fila assíncrona com todas as mensagens (dtype, data) a partir de agora"""
+        subscriber = DropOldestQueue(maxsize or self.queue_size)
+        self.subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        if subscriber in self.subscribers:
+            self.subscribers.remove(subscriber)
+
+    def broadcast(self, dtype, data):
+        for sink in self.sinks:
+            sink(dtype, data)
+        for subscriber in self.subscribers:
+            subscriber.put_nowait((dtype, data))
+
+    async def run(self, *extras):
+        """Roda todas as fontes até stop(); `extras` são corrotinas extras serve(service), ex.: exportador"""
+        # Os eventos existem antes de `loop`: um stop() vindo de um sinal nunca vê _stopped vazio
+        self._stopped = asyncio.Event()
+        self._refresh = {name: asyncio.Event() for name in self.collector.sources}
+        self.loop = asyncio.get_running_loop()
+        if not self.collector.is_running:
+            self._stopped.set()  # stop() chegou antes do loop existir
+        tasks = [asyncio.create_task(self._source_task(source), name=f'fonte-{source.name}')
+                 for source in self.collector.sources.values()]
+        tasks += [asyncio.create_task(serve(self)) for serve in extras]
+        try:
+            await self._stopped.wait()
+        finally:
+            for task in tasks:
+                task.cancel()
+            _, pending = await asyncio.wait(tasks, timeout=STOP_TIMEOUT)
+            for task in pending:
+                print(f"Tarefa '{task.get_name()}' não terminou em {STOP_TIMEOUT}s; encerrando sem ela",
+                      file=sys.stderr)
+            self._fast.shutdown()
+            self._slow.shutdown()
+
+    def stop(self):
+        """Encerra o serviço (pode ser chamado de qualquer thread)"""
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._stopped.set)
+
+    def refresh(self, *names):
+        """Antecipa a próxima leitura das fontes `names` (pode ser chamado de qualquer thread)"""
+        if self.loop is None or self.loop.is_closed():
+            return
+        for name in names:
+            self.loop.call_soon_threadsafe(self._refresh[name].set)
+
+    async def _wait_due(self, source):
+        """Dorme até a fonte vencer; refresh() ou stop() acordam antes"""
+        delay = source.due - self.loop.time()
+        refresh = self._refresh[source.name]
+        if delay > 0 and not refresh.is_set():
+            # asyncio.wait não engole o cancelamento como o wait_for do 3.11 pode engolir
+            waiters = [asyncio.ensure_future(refresh.wait()), asyncio.ensure_future(self._stopped.wait())]
+            try:
+                await asyncio.wait(waiters, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for waiter in waiters:
+                    waiter.cancel()
+        refresh.clear()
+
+    async def _source_task(self, source):
+        collector = self.collector
+        executor = self._slow if source.slow else self._fast
+        while not self._stopped.is_set():
+            await self._wait_due(source)
+            if self._stopped.is_set():
+                break
+            now_loop = self.loop.time()
+            source.due += source.interval
+            if source.due <= now_loop:
+                source.due = now_loop + source.interval
+
+            future = self.loop.run_in_executor(executor, source.timed_collect)
+            try:
+                if source.deadline:
+                    result = await asyncio.wait_for(asyncio.shield(future), source.deadline)
+                else:
+                    result = await future
+            except asyncio.TimeoutError:
+                source.timeouts += 1
+                print(f"Fonte '{source.name}' passou do prazo de {source.deadline}s; resultado descartado",
+                      file=sys.stderr)
+                # Não reenvia enquanto a leitura travada ocupa uma thread do pool
+                await asyncio.gather(future, return_exceptions=True)
+                continue
+            except Exception as e:
+                source.errors += 1
+                print(f"Erro na fonte '{source.name}': {e}", file=sys.stderr)
+                continue
+
+            now = time.time()
+            source.runs += 1
+            try:
+                source.apply(result, now)
+                # A amostra de CPU marca o ritmo dos históricos e da mensagem 'metrics'
+                if source.name == 'cpu':
+                    collector.record_metrics(now)
+                collector.publish(now)
+            except Exception as e:
+                # Um erro ao gravar (disco, gravação, alertas) não pode encerrar a tarefa da fonte
+                source.errors += 1
+                print(f"Erro ao aplicar a fonte '{source.name}': {e!r}", file=sys.stderr)
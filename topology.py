@@ -0,0 +1,98 @@
+import os
+
+import numpy as np
+
+# Agrupamentos de núcleos oferecidos na interface
+GROUPINGS = {'Nenhum': None, 'Socket': 'socket', 'NUMA': 'numa'}
+
+
+def parse_cpulist(text):
+    """Converte uma lista do sysfs ('0-3,8,10-11') em lista de inteiros"""
+    cpus = []
+    for part in text.strip().split(','):
+        if not part:
+            continue
+        low, _, high = part.partition('-')
+        cpus.extend(range(int(low), int(high or low) + 1))
+    return cpus
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _numa_nodes(core_count, root):
+    """Mapa núcleo -> nó NUMA lido de /sys/devices/system/node/node*/cpulist"""
+    node_dir = os.path.join(root, 'node')
+    try:
+        names = [name for name in os.listdir(node_dir) if name.startswith('node') and name[4:].isdigit()]
+    except OSError:
+        return None
+    owner = np.full(core_count, -1, dtype=np.int32)
+    for name in names:
+        text = _read(os.path.join(node_dir, name, 'cpulist'))
+        if text is None:
+            continue
+        cpus = [cpu for cpu in parse_cpulist(text) if cpu < core_count]
+        owner[cpus] = int(name[4:])
+    return owner
+
+
+def _sockets(core_count, root):
+    """Mapa núcleo -> socket lido de cpu*/topology/physical_package_id"""
+    owner = np.full(core_count, -1, dtype=np.int32)
+    for cpu in range(core_count):
+        text = _read(os.path.join(root, 'cpu', f'cpu{cpu}', 'topology', 'physical_package_id'))
+        if text is not None and text.strip().lstrip('-').isdigit():
+            owner[cpu] = int(text)
+    return owner
+
+
+class CoreGroups:
+    """Núcleos agrupados por socket ou nó NUMA, em ordem contígua por grupo.
+
+    `order` reordena as linhas de uma matriz núcleos x tempo para que cada
+    grupo ocupe uma faixa contínua; `starts` marca o início de cada faixa,
+    o que permite agregar todos os grupos de uma vez com np.add.reduceat.
+    """
+
+    def __init__(self, labels, owner):
+        self.labels = labels
+        self.order = np.argsort(owner, kind='stable')
+        sorted_owner = owner[self.order]
+        self.starts = np.flatnonzero(np.r_[True, sorted_owner[1:] != sorted_owner[:-1]]) \
+            if len(owner) else np.zeros(0, dtype=np.intp)
+        self.sizes = np.diff(np.r_[self.starts, len(owner)])
+
+    def __len__(self):
+        return len(self.labels)
+
+    def means(self, data):
+        """Média de cada grupo para uma matriz (núcleos, tempo) já reordenada por `order`"""
+        if not data.shape[-1]:
+            return np.zeros((len(self), 0), dtype=np.float32)
+        return np.add.reduceat(data, self.starts, axis=0) / self.sizes[:, None]
+
+
+def core_groups(core_count, level=None, root='/sys/devices/system'):
+    """Agrupa os núcleos por 'socket' ou 'numa'; sem topologia disponível, um único grupo"""
+    owner = None
+    if level == 'numa':
+        owner = _numa_nodes(core_count, root)
+        prefix = 'Nó'
+    elif level == 'socket':
+        owner = _sockets(core_count, root)
+        prefix = 'Socket'
+
+    if owner is None or (owner < 0).all():
+        return CoreGroups(['CPU'], np.zeros(core_count, dtype=np.int32))
+
+    # Núcleos sem informação (offline, sysfs incompleto) vão para o último grupo
+    unknown = owner.max() + 1
+    owner[owner < 0] = unknown
+    labels = [f'{prefix} {i}' if i != unknown else 'Outros' for i in np.unique(owner)]
+    return CoreGroups(labels, owner)
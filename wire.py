@@ -0,0 +1,384 @@
+"""Codificação binária das amostras enviadas pelos agentes da frota (ver fleet.py).
+
+Cada quadro na conexão é `varint tamanho + payload`; o primeiro byte do
+payload é o tipo. HELLO leva um JSON com a versão do protocolo, o host, o
+número de núcleos e o relógio do agente. Os valores são quantizados para
+inteiros (SCALES, PROCESS_SCALES) e enviados como varints zigzag: um
+quadro completo (KEYFRAME, PROCESSES) a cada `keyframe_interval` quadros
+e, entre eles, diferenças contra o quadro anterior (DELTA, PROCESS_DELTA),
+que em regime estável cabem quase todas em um byte por valor.
+
+Formato da versão 2 (todos os inteiros em varint; "zz" = zigzag):
+  KEYFRAME       n_escalares n_núcleos zz(tempo ms) zz(escalares...) zz(núcleos...)
+  DELTA          zz(diferenças na mesma ordem do último KEYFRAME)
+  PROCESSES      n zz(PIDs ordenados, cada um menos o anterior) zz(colunas...) nomes
+  PROCESS_DELTA  n_saíram n_entraram n_ficaram zz(PIDs que saíram) zz(PIDs que entraram)
+                 zz(colunas dos que entraram) zz(diferenças das colunas dos que ficaram) nomes
+Colunas vão uma após a outra (todas as CPUs, depois todas as memórias...);
+nomes são `varint tamanho + UTF-8`. Um KEYFRAME com mais escalares do que o
+decodificador conhece é aceito (os extras são ignorados), então canais novos
+podem ser acrescentados ao fim de SCALES sem mudar a versão.
+"""
+import json
+
+import numpy as np
+
+WIRE_VERSION = 2
+
+HELLO, KEYFRAME, DELTA, PROCESSES, PROCESS_DELTA = 1, 2, 3, 4, 5
+
+# Canais escalares da amostra e a escala de quantização (valor * escala -> inteiro). Percentuais
+# com 0,1 de resolução: a mesma do Dashboard (e do psutil para memória e disco)
+SCALES = (
+    ('cpu', 10), ('memory', 10), ('disk', 10), ('network', 10),
+    ('disk_read', 10), ('disk_write', 10), ('net_sent', 10), ('net_recv', 10),
+    ('memory_used_gb', 1000), ('memory_total_gb', 1000), ('disk_used_gb', 1000), ('disk_total_gb', 1000),
+    ('process_count', 1),
+)
+SCALE_KEYS = tuple(key for key, _ in SCALES)
+SCALE_FACTORS = np.array([scale for _, scale in SCALES], dtype=np.float64)
+CORE_SCALE = 10
+# Tempo em milissegundos
+TIME_SCALE = 1000
+
+# Colunas do ProcessStore enviadas por processo (rss em KB)
+PROCESS_SCALES = (('cpu', 10), ('mem_pct', 100), ('rss', 1 / 1024), ('threads', 1))
+PROCESS_FACTORS = np.array([scale for _, scale in PROCESS_SCALES], dtype=np.float64)
+
+KEYFRAME_INTERVAL = 60
+
+# Maior quadro aceito: limita o que o receptor guarda por conexão à espera de um quadro completo
+MAX_FRAME = 4 * 1024 * 1024
+# Bytes do prefixo de tamanho de um quadro de até MAX_FRAME
+MAX_PREFIX = (MAX_FRAME.bit_length() + 6) // 7
+
+
+def zigzag(n):
+    return (n << 1) ^ (n >> 63)
+
+
+def unzigzag(n):
+    return (n >> 1) ^ -(n & 1)
+
+
+def write_varint(out, n):
+    """Acrescenta o inteiro não negativo `n` a `out` (bytearray) em base 128"""
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def read_varint(data, pos):
+    """Lê um varint de `data` a partir de `pos`; devolve (valor, próxima posição)"""
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def pack_varints(values):
+    """Codifica um array de inteiros com sinal como varints zigzag, sem laço por valor"""
+    values = np.asarray(values, dtype=np.int64)
+    u = ((values << 1) ^ (values >> 63)).view(np.uint64)
+    top = int(u.max()) if len(u) else 0
+    if top < 0x80:
+        return u.astype(np.uint8).tobytes()  # caso comum dos deltas: um byte por valor
+    # Matriz valores x grupos de 7 bits; cada valor usa os grupos até o último não nulo
+    groups = (top.bit_length() + 6) // 7
+    parts = u[:, None] >> np.arange(0, 7 * groups, 7, dtype=np.uint64)
+    used = parts != 0
+    used[:, 0] = True
+    out = (parts & np.uint64(0x7F)).astype(np.uint8)
+    out[:, :-1] |= used[:, 1:].view(np.uint8) << 7  # bit de continuação se o próximo grupo é usado
+    return out[used].tobytes()
+
+
+def unpack_varints(data, pos, count):
+    """Lê `count` varints zigzag de `data` a partir de `pos`; devolve (array int64, próxima posição)"""
+    if count == 0:
+        return np.zeros(0, dtype=np.int64), pos
+    raw = np.frombuffer(data, dtype=np.uint8, count=min(len(data) - pos, count * 10), offset=pos)
+    if len(raw) >= count and raw[:count].max() < 0x80:
+        u = raw[:count].astype(np.int64)  # todos de um byte
+        return (u >> 1) ^ -(u & 1), pos + count
+    ends = np.flatnonzero(raw < 0x80)[:count]
+    if len(ends) < count:
+        raise ValueError("quadro truncado")
+    used = int(ends[-1]) + 1
+    starts = np.empty(count, dtype=np.int64)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    group = np.arange(used) - np.repeat(starts, ends - starts + 1)
+    parts = (raw[:used] & 0x7F).astype(np.uint64) << (7 * group).astype(np.uint64)
+    u = np.add.reduceat(parts, starts)
+    return (u >> np.uint64(1)).astype(np.int64) ^ -(u & np.uint64(1)).astype(np.int64), pos + used
+
+
+def quantize(values, scale, out):
+    """Grava em `out` (int64) `values * scale` arredondado; NaN e infinitos viram 0"""
+    scaled = np.multiply(values, scale, dtype=np.float64)
+    invalid = ~np.isfinite(scaled)
+    if invalid.any():
+        scaled[invalid] = 0
+    out[:] = np.rint(scaled)
+
+
+def frame(payload):
+    """Prefixa o payload com seu tamanho (varint)"""
+    out = bytearray()
+    write_varint(out, len(payload))
+    return bytes(out) + payload
+
+
+def split_frames(buffer, max_size=MAX_FRAME):
+    """Separa os quadros completos de `buffer` (bytearray); devolve (payloads, bytes consumidos).
+
+    Levanta ValueError para um quadro declarado maior que `max_size` (ou um
+    prefixo de tamanho que não termina): o chamador deve fechar a conexão.
+    """
+    payloads = []
+    pos = 0
+    end = len(buffer)
+    while pos < end:
+        prefix = buffer[pos:pos + MAX_PREFIX]
+        try:
+            size, used = read_varint(prefix, 0)
+        except IndexError:
+            if len(prefix) == MAX_PREFIX:
+                raise ValueError("prefixo de tamanho do quadro inválido") from None
+            break  # tamanho ainda incompleto
+        if size > max_size:
+            raise ValueError(f"quadro de {size} bytes acima do limite de {max_size}")
+        start = pos + used
+        if start + size > end:
+            break
+        payloads.append(bytes(buffer[start:start + size]))
+        pos = start + size
+    return payloads, pos
+
+
+def hello(host, cores, interval, now):
+    return bytes([HELLO]) + json.dumps({'version': WIRE_VERSION, 'host': host, 'cores': cores,
+                                        'interval': interval, 'time': now}).encode()
+
+
+def parse_hello(payload):
+    info = json.loads(payload[1:])
+    if info.get('version') != WIRE_VERSION:
+        raise ValueError(f"versão do protocolo {info.get('version')} não suportada (esperada {WIRE_VERSION})")
+    return info
+
+
+def gaps(pids):
+    """PIDs ordenados -> cada um menos o anterior (o primeiro fica absoluto)"""
+    out = pids.copy()
+    out[1:] -= pids[:-1]
+    return out
+
+
+def write_names(out, names):
+    for name in names:
+        data = name.encode('utf-8', 'replace')
+        write_varint(out, len(data))
+        out += data
+
+
+def read_names(data, pos, count):
+    names = []
+    for _ in range(count):
+        size, pos = read_varint(data, pos)
+        if pos + size > len(data):
+            raise ValueError("quadro truncado")
+        names.append(bytes(data[pos:pos + size]).decode('utf-8', 'replace'))
+        pos += size
+    return names, pos
+
+
+class SampleEncoder:
+    """Codifica amostras ('metrics' + contagem de processos) em KEYFRAMEs e DELTAs"""
+
+    def __init__(self, keyframe_interval=KEYFRAME_INTERVAL):
+        self.keyframe_interval = keyframe_interval
+        self.reset()
+
+    def reset(self):
+        """Próximo quadro sai como KEYFRAME (nova conexão)"""
+        self._previous = None
+        self._count = 0
+
+    @staticmethod
+    def quantize(ts, metrics):
+        """Vetor int64: tempo em ms, escalares de SCALES e núcleos"""
+        cores = np.asarray(metrics.get('cores', ()), dtype=np.float64)
+        n = len(SCALES)
+        values = np.empty(1 + n + len(cores), dtype=np.int64)
+        values[0] = round(ts * TIME_SCALE)
+        quantize([metrics.get(key, 0.0) for key in SCALE_KEYS], SCALE_FACTORS, values[1:1 + n])
+        quantize(cores, CORE_SCALE, values[1 + n:])
+        return values
+
+    def encode(self, ts, metrics):
+        values = self.quantize(ts, metrics)
+        previous = self._previous
+        out = bytearray()
+        if previous is None or len(previous) != len(values) or self._count % self.keyframe_interval == 0:
+            out.append(KEYFRAME)
+            write_varint(out, len(SCALES))
+            write_varint(out, len(values) - 1 - len(SCALES))
+            out += pack_varints(values)
+        else:
+            out.append(DELTA)
+            out += pack_varints(values - previous)
+        self._previous = values
+        self._count += 1
+        return bytes(out)
+
+
+class SampleDecoder:
+    """Inverso do SampleEncoder; DELTAs antes do primeiro KEYFRAME são descartados (None)"""
+
+    def __init__(self):
+        self._previous = None
+        self._scalars = 0
+
+    def decode(self, payload):
+        """Devolve (tempo, metrics) com os escalares de SCALES e 'cores' (array float64)"""
+        kind = payload[0]
+        if kind == KEYFRAME:
+            scalars, pos = read_varint(payload, 1)
+            cores, pos = read_varint(payload, pos)
+            values, _ = unpack_varints(payload, pos, 1 + scalars + cores)
+            self._scalars = scalars
+        elif kind == DELTA and self._previous is not None:
+            deltas, _ = unpack_varints(payload, 1, len(self._previous))
+            values = self._previous + deltas
+        else:
+            return None
+        self._previous = values
+
+        known = min(self._scalars, len(SCALES))
+        scaled = values[1:1 + known] / SCALE_FACTORS[:known]
+        metrics = dict.fromkeys(SCALE_KEYS, 0.0)
+        metrics.update(zip(SCALE_KEYS, scaled.tolist()))
+        metrics['cores'] = values[1 + self._scalars:] / CORE_SCALE
+        return values[0] / TIME_SCALE, metrics
+
+
+class ProcessEncoder:
+    """Codifica tabelas de processos (PID, colunas de PROCESS_SCALES, nome) em PROCESSES e PROCESS_DELTAs.
+
+    O estado anterior fica ordenado por PID; o delta lista os PIDs que saíram
+    e entraram e manda só as diferenças das colunas dos que ficaram. Um PID
+    reaproveitado com outro nome conta como saída e entrada.
+    """
+
+    def __init__(self, keyframe_interval=KEYFRAME_INTERVAL):
+        self.keyframe_interval = keyframe_interval
+        self.reset()
+
+    def reset(self):
+        self._pids = None
+        self._count = 0
+
+    @staticmethod
+    def quantize(store, rows):
+        """(pids ordenados, colunas int64 n x len(PROCESS_SCALES), nomes) das linhas `rows` do ProcessStore"""
+        columns = store.columns
+        pids = columns['pid'][rows]
+        order = np.argsort(pids, kind='stable')
+        rows = np.asarray(rows)[order]
+        values = np.column_stack([columns[key][rows].astype(np.float64) for key, _ in PROCESS_SCALES])
+        values = np.rint(values * PROCESS_FACTORS).astype(np.int64)
+        return pids[order].astype(np.int64), values, [store.text('name', i) for i in rows]
+
+    def encode(self, store, rows=None):
+        """Codifica as linhas `rows` (padrão: todas) de um ProcessStore"""
+        if rows is None:
+            rows = np.arange(len(store))
+        pids, values, names = self.quantize(store, rows)
+        out = bytearray()
+        if self._pids is None or self._count % self.keyframe_interval == 0:
+            out.append(PROCESSES)
+            write_varint(out, len(pids))
+            out += pack_varints(np.concatenate((gaps(pids), values.T.ravel())))
+            write_names(out, names)
+        else:
+            previous, previous_names = self._pids, self._names
+            # Os dois lados estão ordenados por PID: uma busca binária acha quem ficou
+            where = np.searchsorted(previous, pids)
+            found = where < len(previous)
+            found[found] = previous[where[found]] == pids[found]
+            new = np.flatnonzero(found)
+            old = where[new]
+            renamed = [k for k, (i, j) in enumerate(zip(old.tolist(), new.tolist()))
+                       if previous_names[i] != names[j]]
+            if renamed:
+                new, old = np.delete(new, renamed), np.delete(old, renamed)
+            present = np.zeros(len(previous), dtype=bool)
+            present[old] = True
+            gone = previous[~present]
+            added = np.ones(len(pids), dtype=bool)
+            added[new] = False
+            out.append(PROCESS_DELTA)
+            write_varint(out, len(gone))
+            write_varint(out, int(added.sum()))
+            write_varint(out, len(new))
+            out += pack_varints(np.concatenate((
+                gaps(gone), gaps(pids[added]),
+                values[added].T.ravel(), (values[new] - self._values[old]).T.ravel())))
+            write_names(out, [names[i] for i in np.flatnonzero(added).tolist()])
+        self._pids, self._values, self._names = pids, values, names
+        self._count += 1
+        return bytes(out)
+
+
+class ProcessDecoder:
+    """Inverso do ProcessEncoder; PROCESS_DELTAs antes do primeiro PROCESSES são descartados (None)"""
+
+    def __init__(self):
+        self._pids = None
+
+    def decode(self, payload):
+        """Devolve (pids, colunas {chave: array float64}, nomes) ordenados por PID"""
+        kind = payload[0]
+        width = len(PROCESS_SCALES)
+        if kind == PROCESSES:
+            count, pos = read_varint(payload, 1)
+            ints, pos = unpack_varints(payload, pos, count * (1 + width))
+            pids = np.cumsum(ints[:count])
+            values = ints[count:].reshape(width, count).T
+            names, _ = read_names(payload, pos, count)
+        elif kind == PROCESS_DELTA and self._pids is not None:
+            gone, pos = read_varint(payload, 1)
+            added, pos = read_varint(payload, pos)
+            kept, pos = read_varint(payload, pos)
+            ints, pos = unpack_varints(payload, pos, gone + added * (1 + width) + kept * width)
+            new_names, _ = read_names(payload, pos, added)
+            removed = np.cumsum(ints[:gone])
+            where = np.searchsorted(self._pids, removed)
+            if len(self._pids) - gone != kept or (where >= len(self._pids)).any() or \
+                    (self._pids[where] != removed).any():
+                raise ValueError("delta de processos não corresponde ao estado anterior")
+            keep = np.ones(len(self._pids), dtype=bool)
+            keep[where] = False
+            added_pids = np.cumsum(ints[gone:gone + added])
+            pos = gone + added
+            added_values = ints[pos:pos + added * width].reshape(width, added).T
+            pos += added * width
+            kept_values = self._values[keep] + ints[pos:].reshape(width, kept).T
+            pids = np.concatenate((self._pids[keep], added_pids))
+            order = np.argsort(pids, kind='stable')
+            pids = pids[order]
+            values = np.concatenate((kept_values, added_values))[order]
+            names = [name for name, k in zip(self._names, keep.tolist()) if k] + new_names
+            names = [names[i] for i in order.tolist()]
+        else:
+            return None
+        self._pids, self._values, self._names = pids, values, names
+        columns = {key: values[:, i] / scale for i, (key, scale) in enumerate(PROCESS_SCALES)}
+        return pids, columns, names